@@ -0,0 +1,277 @@
+import os
+import time
+import random
+import threading
+
+import telemetry
+from minutes_chunker import estimate_tokens
+
+DEFAULT_RPM = 50                 # 1分あたりのリクエスト数
+DEFAULT_TPM = 30000              # 1分あたりの入力トークン数
+DEFAULT_MAX_CONCURRENCY = 8      # プロセス全体での同時リクエスト数
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_BASE_DELAY = 1.0
+DEFAULT_MAX_DELAY = 60.0
+
+# 再試行する HTTP ステータス（429: レート制限, 529: 過負荷, 5xx: 一時的な障害）
+RETRYABLE_STATUSES = (408, 409, 429, 500, 502, 503, 504, 529)
+RETRYABLE_ERRORS = ("APIConnectionError", "APITimeoutError", "ConnectionError", "TimeoutError")
+
+
+class TokenBucket:
+    """1分あたりの上限を秒単位で補充するトークンバケット
+
+    reserve は不足分を前借りして待ち時間を返すため、待っている呼び出し同士で
+    順番が入れ替わらない。
+    """
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount=1):
+        """amount を確保し、確保できるまでの待ち時間（秒）を返す"""
+        amount = min(float(amount), self.capacity)  # 上限を超える要求で詰まらないようにする
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= amount
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def adjust(self, amount):
+        """見積もりと実際の差分を反映する（正なら追加消費、負なら返却）"""
+        with self._lock:
+            self.tokens = min(self.capacity, self.tokens - amount)
+
+
+def _request_tokens(params):
+    """リクエストの入力トークン数を概算（system とメッセージ本文）"""
+    texts = []
+    system = params.get("system")
+    if isinstance(system, str):
+        texts.append(system)
+    elif isinstance(system, list):
+        texts.extend(block.get("text", "") for block in system if isinstance(block, dict))
+    for message in params.get("messages", []):
+        content = message.get("content")
+        if isinstance(content, str):
+            texts.append(content)
+        elif isinstance(content, list):
+            texts.extend(block.get("text", "") for block in content if isinstance(block, dict))
+    return sum(estimate_tokens(text) for text in texts)
+
+
+def _retry_after(error):
+    """例外のレスポンスヘッダーから retry-after（秒）を取り出す"""
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        from email.utils import parsedate_to_datetime
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+
+def _is_offline(func):
+    """通信しないクライアント（offline 属性が真）のメソッドかどうか"""
+    return bool(getattr(getattr(func, "__self__", None), "offline", False))
+
+
+def is_retryable(error):
+    """一時的な失敗（レート制限・過負荷・接続断）かどうか"""
+    status = getattr(error, "status_code", None)
+    if status is not None:
+        return status in RETRYABLE_STATUSES
+    return type(error).__name__ in RETRYABLE_ERRORS
+
+
+class APIScheduler:
+    """全エントリーポイントで共有するAPIリクエストのスケジューラ
+
+    - requests/min と input tokens/min のトークンバケットで送信ペースを調整
+    - プロセス全体の同時リクエスト数を上限で制限
+    - 429/529/5xx・接続エラーは retry-after を優先し、なければ指数バックオフ+ジッターで再試行
+    - 429 を受けたら retry-after の間は他のリクエストも送信を止める
+
+    各試行はテレメトリに記録される（attempt, queued に試行回数と待ち時間）。
+    SDK側の自動再試行と重複しないよう、クライアントは max_retries=0 で作成する。
+    """
+
+    def __init__(self, rpm=None, tpm=None, max_concurrency=None, max_retries=None,
+                 base_delay=DEFAULT_BASE_DELAY, max_delay=DEFAULT_MAX_DELAY):
+        self.requests = TokenBucket(rpm or int(os.getenv("MCP_RPM", DEFAULT_RPM)))
+        self.tokens = TokenBucket(tpm or int(os.getenv("MCP_TPM", DEFAULT_TPM)))
+        self.max_concurrency = max_concurrency or int(os.getenv("MCP_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY))
+        self.max_retries = max_retries if max_retries is not None else int(
+            os.getenv("MCP_MAX_RETRIES", DEFAULT_MAX_RETRIES))
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        self._lock = threading.Lock()
+        self._paused_until = 0.0
+
+    def _reserve(self, estimate):
+        """送信までに待つべき秒数（レート制限による全体停止を含む）"""
+        wait = max(self.requests.reserve(1), self.tokens.reserve(estimate))
+        with self._lock:
+            pause = self._paused_until - time.monotonic()
+        return max(wait, pause, 0.0)
+
+    def _settle(self, response, estimate):
+        """実際の入力トークン数でバケットを補正"""
+        usage = getattr(response, "usage", None)
+        if usage is None:
+            return
+        actual = sum(getattr(usage, name, None) or 0 for name in (
+            "input_tokens", "cache_creation_input_tokens", "cache_read_input_tokens"))
+        self.tokens.adjust(actual - min(estimate, self.tokens.capacity))
+
+    def _retry_delay(self, error, attempt):
+        """再試行までの待ち時間（再試行しない場合はNone）"""
+        if attempt >= self.max_retries or not is_retryable(error):
+            return None
+        if getattr(error, "stream_started", False):
+            return None  # ストリーミングで表示を始めた後のエラー（再試行すると出力が重複する）
+        delay = _retry_after(error)
+        if delay is None:
+            delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        if getattr(error, "status_code", None) == 429:
+            with self._lock:
+                self._paused_until = max(self._paused_until, time.monotonic() + delay)
+        return delay
+
+    def _report_retry(self, label, error, delay, attempt):
+        status = getattr(error, "status_code", None)
+        reason = f"HTTP {status}" if status else type(error).__name__
+        print(f"⏳ [{label}] {reason} - {delay:.1f}秒後に再試行 ({attempt + 1}/{self.max_retries})")
+
+    def _invoke(self, label, invoke, params, offline=False):
+        """同期版の試行ループ。invoke() は (usage を持つレスポンス, 戻り値, 追加記録) を返す"""
+        model = params.get("model")
+        if offline:
+            return self._invoke_offline(label, invoke, model)
+        estimate = _request_tokens(params)
+        attempt = 0
+        while True:
+            queued = self._reserve(estimate)
+            if queued:
+                time.sleep(queued)
+            with self._slots:
+                started = time.perf_counter()
+                try:
+                    response, result, extra = invoke()
+                except Exception as e:
+                    telemetry.record(label, model, time.perf_counter() - started, error=e,
+                                     attempt=attempt + 1, queued=round(queued, 3))
+                    delay = self._retry_delay(e, attempt)
+                    if delay is None:
+                        raise
+                    error = e
+                else:
+                    latency = extra.pop("latency", time.perf_counter() - started)
+                    telemetry.record(label, model, latency, response,
+                                     attempt=attempt + 1, queued=round(queued, 3), **extra)
+                    self._settle(response, estimate)
+                    return result
+            self._report_retry(label, error, delay, attempt)
+            time.sleep(delay)
+            attempt += 1
+
+    def _invoke_offline(self, label, invoke, model):
+        """カセット再生など通信しない呼び出し（レート制限・同時実行数・再試行の対象外）"""
+        started = time.perf_counter()
+        response, result, extra = invoke()
+        latency = extra.pop("latency", time.perf_counter() - started)
+        telemetry.record(label, model, latency, response, replayed=True, **extra)
+        return result
+
+    def call(self, label, func, **params):
+        """func(**params) をレート制限・再試行付きで実行してレスポンスを返す"""
+        def invoke():
+            response = func(**params)
+            return response, response, {}
+        return self._invoke(label, invoke, params, offline=_is_offline(func))
+
+    def call_stream(self, label, func, client, params, **kwargs):
+        """streaming.stream_message 形式の関数を実行し (message, ttft, total) を返す
+
+        再試行は接続時に返されるエラー（429/529など）を想定しており、テキストやツール呼び出しを
+        表示し始めた後のエラー（stream_started）は再試行せずにそのまま送出する。
+        """
+        def invoke():
+            message, ttft, total = func(client, params, **kwargs)
+            extra = {"latency": total, "ttft": round(ttft, 4) if ttft is not None else None}
+            return message, (message, ttft, total), extra
+        return self._invoke(label, invoke, params, offline=getattr(client, "offline", False))
+
+    async def _acquire_slot(self):
+        # threading のセマフォをイベントループを止めずに取得する
+        import asyncio
+        while not self._slots.acquire(blocking=False):
+            await asyncio.sleep(0.05)
+
+    async def call_async(self, label, func, **params):
+        """call の非同期版（func はコルーチン関数）"""
+        import asyncio
+        model = params.get("model")
+        if _is_offline(func):
+            started = time.perf_counter()
+            response = await func(**params)
+            telemetry.record(label, model, time.perf_counter() - started, response, replayed=True)
+            return response
+        estimate = _request_tokens(params)
+        attempt = 0
+        while True:
+            queued = self._reserve(estimate)
+            if queued:
+                await asyncio.sleep(queued)
+            await self._acquire_slot()
+            started = time.perf_counter()
+            try:
+                response = await func(**params)
+            except Exception as e:
+                telemetry.record(label, model, time.perf_counter() - started, error=e,
+                                 attempt=attempt + 1, queued=round(queued, 3))
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                self._report_retry(label, e, delay, attempt)
+            else:
+                telemetry.record(label, model, time.perf_counter() - started, response,
+                                 attempt=attempt + 1, queued=round(queued, 3))
+                self._settle(response, estimate)
+                return response
+            finally:
+                self._slots.release()
+            await asyncio.sleep(delay)
+            attempt += 1
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """プロセス内で共有するスケジューラ（環境変数の設定で初回に生成）"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = APIScheduler()
+        return _scheduler
@@ -0,0 +1,93 @@
+"""Markdown→Word描画のマイクロベンチマーク
+
+従来の行ごとの startswith/re.match ループと、tokenize + DocxBlockRenderer を
+同じ合成議事録で比較し、lines/sec を表示する。
+
+    python benchmarks/bench_markdown_render.py [--lines 4000] [--repeat 3]
+"""
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docx import Document
+from docx_renderer import new_minutes_document, render_markdown_lines
+from markdown_blocks import tokenize
+
+
+def synthetic_minutes(line_count):
+    """見出し・箇条書き・番号付きリスト・表・太字を含む合成議事録"""
+    lines = ["# 第1回 定例会議 議事録", "- **日時**: 2025年6月10日 10:00-11:00", ""]
+    section = 0
+    while len(lines) < line_count:
+        section += 1
+        lines += [
+            f"## 議題{section}: 進捗確認",
+            f"- 担当者から**重要な**報告 {section}",
+            f"  - 補足事項 `item-{section}`",
+            f"1. 次のステップ {section}",
+            "| 担当 | 内容 | 期限 |",
+            "|---|---|---|",
+            f"| 田中 | 資料作成 {section} | 6/{section % 28 + 1} |",
+            f"通常の発言テキスト {section}。詳細は[資料](https://example.com/{section})を参照。",
+            "",
+        ]
+    return lines[:line_count]
+
+
+def legacy_render(doc, lines):
+    """変更前の generate_word_manually の描画ループ"""
+    current_heading_level = 1
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith('#'):
+            level = len(line) - len(line.lstrip('#'))
+            heading_text = line.lstrip('#').strip()
+            doc.add_heading(heading_text, level)
+            current_heading_level = level
+        elif line.startswith('- ') or line.startswith('* '):
+            item_text = line[2:].strip()
+            paragraph = doc.add_paragraph(item_text)
+            paragraph.style = 'List Bullet'
+        elif re.match(r'^\d+\.', line):
+            item_text = re.sub(r'^\d+\.\s*', '', line)
+            paragraph = doc.add_paragraph(item_text)
+            paragraph.style = 'List Number'
+        else:
+            doc.add_paragraph(line)
+
+
+def measure(label, func, lines, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(lines)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    rate = len(lines) / best
+    print(f"  {label:<28} {best * 1000:9.1f}ms  {rate:12,.0f} lines/sec")
+    return rate
+
+
+def main():
+    args = sys.argv[1:]
+    line_count = int(args[args.index("--lines") + 1]) if "--lines" in args else 4000
+    repeat = int(args[args.index("--repeat") + 1]) if "--repeat" in args else 3
+    lines = synthetic_minutes(line_count)
+
+    print(f"📏 Markdown描画ベンチマーク ({line_count}行, ベスト/{repeat}回)")
+    print("-"*60)
+    legacy = measure("従来ループ (python-docx API)", lambda ls: legacy_render(Document(), ls), lines, repeat)
+    measure("tokenize のみ", lambda ls: sum(1 for _ in tokenize(ls)), lines, repeat)
+    current = measure("tokenize + DocxBlockRenderer",
+                      lambda ls: render_markdown_lines(new_minutes_document(), ls), lines, repeat)
+    print("-"*60)
+    print(f"  速度比: {current / legacy:.1f}倍")
+
+
+if __name__ == "__main__":
+    main()
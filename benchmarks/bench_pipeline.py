@@ -0,0 +1,160 @@
+"""API呼び出しを含む経路のオフラインベンチマーク
+
+FakeAnthropic（一定の待ち時間 ± ジッターで定型応答を返すクライアント）に差し替えて、
+CLI（execute_use_case）・バッチ（run_batch）・ヘッドレスデモ・Markdown→Word変換
+（process_markdown_to_word）の各経路を N 並行で実行し、以下を表示する。
+
+- 1操作あたりのエンドツーエンドのレイテンシ（p50 / p95）
+- スループット（操作/秒）
+- パイプライン自身のオーバーヘッド（実測時間の合計 − フェイクの待ち時間の合計）/ 操作数
+
+レート制限で待たないよう、スケジューラの上限は十分大きな値に設定して計測する。
+
+    python benchmarks/bench_pipeline.py [--latency 0.2] [--jitter 0.05] [--concurrency 1,4,8]
+                                        [--ops 16] [--paths cli,batch,demo,convert] [--lines 400]
+"""
+import os
+import json
+import sys
+import time
+import tempfile
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# スケジューラ・テレメトリは初回利用時に環境変数を読むため、importより前に設定する
+os.environ.setdefault("MCP_RPM", "1000000")
+os.environ.setdefault("MCP_TPM", "1000000000")
+os.environ.setdefault("MCP_MAX_CONCURRENCY", "1024")
+os.environ.setdefault("MCP_TELEMETRY", "0")
+
+from fake_client import FakeAnthropic, FakeAsyncAnthropic
+from major_mcp_connect import MCPServerDirectory, DEMO_CASES
+from markdown_to_word_mcp import MarkdownToWordMCP
+from telemetry import percentile
+from bench_markdown_render import synthetic_minutes
+
+PATHS = ("cli", "batch", "demo", "convert")
+
+
+@contextlib.contextmanager
+def quiet():
+    """計測対象の表示を捨てる"""
+    with open(os.devnull, "w", encoding="utf-8") as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def timed(func, *args):
+    started = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - started
+
+
+def bench_cli(clients, concurrency, ops, workdir):
+    """execute_use_case を N 本のスレッドから呼ぶ（各操作のレイテンシを返す）"""
+    directory = MCPServerDirectory(use_cache=False, health_check=False, client=clients[0])
+    cases = [DEMO_CASES[i % len(DEMO_CASES)] for i in range(ops)]
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(lambda case: timed(directory.execute_use_case, *case), cases))
+
+
+def bench_batch(clients, concurrency, ops, workdir):
+    """マニフェスト ops 件を run_batch で処理（各ジョブのレイテンシを返す）"""
+    manifest = os.path.join(workdir, "jobs.jsonl")
+    output = os.path.join(workdir, "jobs.results.ndjson")
+    with open(manifest, "w", encoding="utf-8") as f:
+        for i in range(ops):
+            server_set, use_case, topic = DEMO_CASES[i % len(DEMO_CASES)]
+            f.write(json.dumps({"id": f"job{i}", "server_set": server_set,
+                                "use_case": use_case, "topic": topic}, ensure_ascii=False) + "\n")
+    directory = MCPServerDirectory(use_cache=False, health_check=False, async_client=clients[1])
+    directory.run_batch(manifest, output, concurrency=concurrency)
+    with open(output, encoding="utf-8") as f:
+        return [json.loads(line)["latency"] for line in f]
+
+
+def bench_demo(clients, concurrency, ops, workdir):
+    """ヘッドレスデモ（DEMO_CASES の件数で固定、ops は使わない）"""
+    directory = MCPServerDirectory(use_cache=False, health_check=False, async_client=clients[1])
+    return [record["latency"] for record in directory.run_demo_headless(concurrency)]
+
+
+def bench_convert(clients, concurrency, ops, workdir, lines=400):
+    """合成議事録の process_markdown_to_word を N 並行（プランを呼び、確信度が低ければ分析も呼ぶ）"""
+    source = os.path.join(workdir, "minutes.md")
+    with open(source, "w", encoding="utf-8") as f:
+        f.write("\n".join(synthetic_minutes(lines)) + "\n")
+    converter = MarkdownToWordMCP(client=clients[0])
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(lambda _: timed(converter.process_markdown_to_word, source), range(ops)))
+
+
+BENCHES = {"cli": bench_cli, "batch": bench_batch, "demo": bench_demo, "convert": bench_convert}
+
+
+def run(path, concurrency, ops, latency, jitter, lines):
+    """1経路を計測して結果の辞書を返す"""
+    clients = (FakeAnthropic(latency, jitter, seed=0), FakeAsyncAnthropic(latency, jitter, seed=0))
+    bench = BENCHES[path]
+    with tempfile.TemporaryDirectory() as workdir:
+        cwd = os.getcwd()
+        os.chdir(workdir)  # 変換経路が出力するファイルを一時ディレクトリに置く
+        try:
+            started = time.perf_counter()
+            with quiet():
+                if path == "convert":
+                    latencies = bench(clients, concurrency, ops, workdir, lines)
+                else:
+                    latencies = bench(clients, concurrency, ops, workdir)
+            wall = time.perf_counter() - started
+        finally:
+            os.chdir(cwd)
+    calls = sum(client.calls for client in clients)
+    simulated = sum(client.simulated for client in clients)
+    return {
+        "path": path,
+        "concurrency": concurrency,
+        "ops": len(latencies),
+        "calls": calls,
+        "wall": wall,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "throughput": len(latencies) / wall if wall else 0.0,
+        "overhead_ms": (sum(latencies) - simulated) / max(1, len(latencies)) * 1000,
+    }
+
+
+def main():
+    args = sys.argv[1:]
+    latency = float(args[args.index("--latency") + 1]) if "--latency" in args else 0.2
+    jitter = float(args[args.index("--jitter") + 1]) if "--jitter" in args else 0.05
+    ops = int(args[args.index("--ops") + 1]) if "--ops" in args else 16
+    lines = int(args[args.index("--lines") + 1]) if "--lines" in args else 400
+    levels = [int(value) for value in (
+        args[args.index("--concurrency") + 1] if "--concurrency" in args else "1,4,8").split(",")]
+    paths = (args[args.index("--paths") + 1] if "--paths" in args else ",".join(PATHS)).split(",")
+    unknown = [path for path in paths if path not in BENCHES]
+    if unknown:
+        print(f"❌ 不明な経路: {', '.join(unknown)}（{', '.join(PATHS)} から選択）")
+        sys.exit(1)
+
+    print(f"🧪 オフラインパイプラインベンチマーク（フェイク応答 {latency}±{jitter}秒, {ops}操作）")
+    print("="*84)
+    print(f"{'経路':<9} {'並行':>4} {'操作':>5} {'API':>5} {'全体':>8} {'p50':>8} {'p95':>8} "
+          f"{'操作/秒':>8} {'オーバーヘッド':>8}")
+    print("-"*84)
+    for path in paths:
+        for concurrency in levels:
+            result = run(path, concurrency, ops, latency, jitter, lines)
+            print(f"{result['path']:<9} {result['concurrency']:>4} {result['ops']:>5} {result['calls']:>5} "
+                  f"{result['wall']:>7.2f}s {result['p50']:>7.3f}s {result['p95']:>7.3f}s "
+                  f"{result['throughput']:>8.2f} {result['overhead_ms']:>9.1f}ms/op")
+    print("-"*84)
+    print("💡 オーバーヘッド = (各操作の実測時間の合計 − フェイクの待ち時間の合計) / 操作数")
+    print("   並行時はスケジューラ・スレッドの待ちを含む。convert は1操作にAPI呼び出しとプランのローカル実行を含む")
+
+
+if __name__ == "__main__":
+    main()
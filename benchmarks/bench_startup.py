@@ -0,0 +1,89 @@
+"""CLI起動時間のベンチマーク
+
+モジュールのimport時間と、表示だけのサブコマンドで最初の出力が得られるまでの
+時間（time-to-first-output）をサブプロセスで計測する。--max-ms を指定すると
+いずれかが上限を超えた場合に終了コード1を返すため、CIでの退行検知に使える。
+
+    python benchmarks/bench_startup.py [--repeat 5] [--max-ms 500]
+"""
+import os
+import sys
+import time
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = ("major_mcp_connect", "markdown_to_word_mcp", "mcp_service")
+
+# API呼び出しを伴わないサブコマンド
+COMMANDS = (
+    ("major_mcp_connect.py", "list"),
+    ("major_mcp_connect.py", "cases"),
+    ("major_mcp_connect.py", "help"),
+    ("major_mcp_connect.py", "microsoft_guide"),
+    ("major_mcp_connect.py", "examples"),
+    ("mcp_service.py", "help"),
+)
+
+
+def measure_import(module):
+    """新しいインタプリタで module のimportにかかる時間（秒）"""
+    code = (
+        "import time; started = time.perf_counter(); "
+        f"import {module}; print(time.perf_counter() - started)"
+    )
+    output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True,
+                            capture_output=True, text=True).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def measure_first_output(script, command):
+    """プロセス起動から最初の1バイトが出力されるまでの時間（秒）"""
+    env = dict(os.environ, PYTHONUNBUFFERED="1")
+    started = time.perf_counter()
+    process = subprocess.Popen([sys.executable, script, command], cwd=ROOT, env=env,
+                               stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    process.stdout.read(1)
+    elapsed = time.perf_counter() - started
+    process.stdout.read()
+    process.wait()
+    return elapsed
+
+
+def best_of(func, repeat, *args):
+    return min(func(*args) for _ in range(repeat))
+
+
+def main():
+    args = sys.argv[1:]
+    repeat = int(args[args.index("--repeat") + 1]) if "--repeat" in args else 5
+    max_ms = float(args[args.index("--max-ms") + 1]) if "--max-ms" in args else None
+
+    failures = []
+
+    def report(label, seconds):
+        ms = seconds * 1000
+        over = max_ms is not None and ms > max_ms
+        if over:
+            failures.append(label)
+        print(f"  {label:<40} {ms:8.1f}ms{'  ❌' if over else ''}")
+
+    print(f"🚀 CLI起動ベンチマーク (ベスト/{repeat}回)")
+    print("-"*60)
+    print("📦 import時間:")
+    for module in MODULES:
+        report(f"import {module}", best_of(measure_import, repeat, module))
+    print("⏱️  最初の出力までの時間:")
+    for script, command in COMMANDS:
+        report(f"{script} {command}", best_of(measure_first_output, repeat, script, command))
+    print("-"*60)
+
+    if failures:
+        print(f"❌ 上限 {max_ms:.0f}ms を超えました: {', '.join(failures)}")
+        sys.exit(1)
+    if max_ms is not None:
+        print(f"✅ すべて {max_ms:.0f}ms 以内です")
+
+
+if __name__ == "__main__":
+    main()
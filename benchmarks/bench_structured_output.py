@@ -0,0 +1,242 @@
+"""構造分析・プラン生成の自由記述出力とスキーマ付き出力（tool_use）の比較
+
+同じ合成議事録について、ステージごとの入力・出力トークン数を従来のMarkdownレポート
+形式と構造化JSON形式で求め、出力トークン ÷ 生成速度から推定したレイテンシを表示する。
+従来形式の出力は、構造化出力と同じ内容を従来の見出し構成で書いたものとして組み立てる。
+
+実際のAPIでの計測値は、変換後に `python telemetry.py stats` のラベル
+analysis / analysis_chunk / plan / word_mcp で確認できる。
+
+    python benchmarks/bench_structured_output.py [--lines 400] [--tps 60] [--ttft 0.8]
+"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from minutes_analyzer import analyze_minutes
+from minutes_chunker import estimate_tokens, format_merged_analysis, merge_partial_analyses
+from structured_output import ANALYSIS_TOOL, PLAN_TOOL, compact_json, plan_context, format_plan
+from markdown_to_word_mcp import DOCUMENT_REFERENCE
+from bench_markdown_render import synthetic_minutes
+
+LEGACY_ANALYSIS_PROMPT = f"""
+{DOCUMENT_REFERENCE}を分析し、Word文書化のための構造情報を抽出してください。
+
+以下の形式で分析結果を出力してください：
+
+## 📋 議事録情報
+- 会議タイトル:
+- 開催日時:
+- 参加者:
+- 会議時間:
+
+## 📝 主要セクション
+1. セクション名とその内容の要約
+2. セクション名とその内容の要約
+3. ...
+
+## 🎯 重要ポイント
+- 決定事項の数:
+- アクションアイテムの数:
+- 議論点の数:
+
+## 📄 Word文書構成提案
+1. 表紙の内容
+2. 目次構成
+3. 本文のレイアウト提案
+4. 付録の必要性
+
+Wordテンプレートとして最適な文書構造を提案してください。
+"""
+
+LEGACY_PROPOSAL = """
+## 📄 Word文書構成提案
+1. 表紙の内容: 会議タイトル・開催日時・参加者を中央揃えで配置し、下部に記録者を記載
+2. 目次構成: 「会議概要」「議事内容」「決定事項」「アクションアイテム」の4章構成とし、議題ごとに小見出しを設定
+3. 本文のレイアウト提案: 見出し1は14pt太字、本文は11ptで行間1.5。決定事項とアクションアイテムは担当・期限の列を持つ表にまとめる
+4. 付録の必要性: 参考資料のリンク一覧を付録として末尾に添付することを推奨
+"""
+
+LEGACY_PLAN_PROMPT = """
+以下のMarkdown議事録とその分析結果を基に、Word MCPサーバーで実行する具体的なWord文書生成プランを作成してください：
+
+## 元のMarkdown議事録:
+{source}
+
+## 構造分析結果:
+{analysis}
+
+以下の形式で、Word MCPサーバーで実行可能なコマンド形式の手順を提案してください：
+
+## 🏗️ Word文書生成手順
+
+### Step 1: 文書作成・基本設定
+```
+create_document: "議事録_[会議名]_[日付].docx"
+set_page_margins: {{"top": 2.5, "bottom": 2.5, "left": 3.0, "right": 2.5}}
+set_font_default: {{"name": "游明朝", "size": 11}}
+```
+
+### Step 2: 表紙作成
+```
+add_title: "[会議タイトル]"
+add_subtitle: "議事録"
+add_meeting_info: "開催日時: [日時] | 場所: [場所]"
+add_page_break
+```
+
+### Step 3: 本文構造作成
+```
+add_heading1: "1. 会議概要"
+add_table: 会議基本情報テーブル
+add_heading1: "2. 議事内容"
+...
+```
+
+### Step 4: 内容挿入
+- 各セクションの具体的な内容挿入方法
+- 表・リストの作成方法
+- フォーマット指定
+
+### Step 5: 仕上げ
+- ヘッダー・フッター設定
+- ページ番号追加
+- 目次自動生成
+
+実際にWord MCPで実行可能な、段階的な手順を提案してください。
+"""
+
+STRUCTURED_ANALYSIS_PROMPT = f"{DOCUMENT_REFERENCE}から、Word文書化に必要な構造情報を抽出してください。"
+
+STRUCTURED_PLAN_PROMPT = """Markdown議事録と構造分析結果（JSON）を基に、Word MCPサーバーで実行するWord文書生成プランを作成してください。
+表紙の後に会議概要（meeting_table）と議事内容（minutes）を置き、既定値はA4・余白 上下2.5/左3.0/右2.5cm・游明朝11ptです。
+
+## 元のMarkdown議事録:
+{source}
+
+## 構造分析結果:
+{analysis}"""
+
+WORD_PROMPT = """
+{reference}とWord文書生成プランを基に、Word MCPサーバーのツールを使って実際にWord文書を生成してください：
+
+## 生成プラン:
+{plan}
+"""
+
+
+def sample_analysis(lines):
+    """合成議事録のローカル解析結果に、LLMが付ける程度の要約を足した構造分析結果（論点はスキーマの上限まで）"""
+    analysis = analyze_minutes(lines).to_structured()
+    for section in analysis["sections"]:
+        section["summary"] = f"{section['title']}について担当者から報告があり、次のステップを確認した。"
+    analysis["discussion_points"] = analysis["discussion_points"][:5]
+    return merge_partial_analyses([analysis])
+
+
+def sample_plan(analysis):
+    """構造分析結果から組み立てた生成プラン（PLAN_TOOL のスキーマ）"""
+    meeting = analysis["meeting"]
+    return {
+        "file_name": f"議事録_{meeting['title']}_{meeting['date'][:10]}.docx",
+        "margins_cm": {"top": 2.5, "bottom": 2.5, "left": 3.0, "right": 2.5},
+        "font": {"name": "游明朝", "size": 11},
+        "cover": {"title": meeting["title"], "subtitle": "議事録",
+                  "meeting_info": f"開催日時: {meeting['date']} | 場所: {meeting['location']}"},
+        "outline": [{"heading": "1. 会議概要", "content": "meeting_table"},
+                    {"heading": "2. 議事内容", "content": "minutes"},
+                    {"heading": "3. 決定事項", "content": "decisions_table"},
+                    {"heading": "4. アクションアイテム", "content": "action_items_table"}],
+        "finishing": {"header": meeting["title"], "footer": "社外秘", "page_numbers": True, "toc": True},
+    }
+
+
+def legacy_plan_text(plan, analysis):
+    """従来形式（5ステップのMarkdown）で同じプランを書いた出力（Step 3 は議題ごとの見出しも列挙）"""
+    steps = format_plan(plan).split("\n")[1:]
+    headings = [step for step in steps if step.startswith("add_heading")]
+    headings[2:2] = [f"add_heading2: \"{section['title']}\"" for section in analysis["sections"]]
+    return "\n".join([
+        "## 🏗️ Word文書生成手順", "",
+        "### Step 1: 文書作成・基本設定", "```", *steps[:3], "```", "",
+        "### Step 2: 表紙作成", "```", *steps[3:7], "```", "",
+        "### Step 3: 本文構造作成", "```", *headings, "```", "",
+        "### Step 4: 内容挿入",
+        "- 各議題の箇条書きは add_bullet_list で挿入し、担当・期限を含む行は add_table で表にする",
+        "- 決定事項は太字、アクションアイテムは担当者名を括弧書きで付記する", "",
+        "### Step 5: 仕上げ",
+        "- ヘッダーに会議名、フッターに「社外秘」を設定",
+        "- フッター中央にページ番号を追加",
+        "- 表紙の後に目次を自動生成",
+    ])
+
+
+def stage_rows(analysis, plan, source):
+    """(ステージ, 従来の入力, 従来の出力, 構造化の入力, 構造化の出力) のトークン数"""
+    tools = lambda tool: estimate_tokens(compact_json(tool))
+    legacy_analysis = format_merged_analysis(analysis) + LEGACY_PROPOSAL
+    legacy_plan = legacy_plan_text(plan, analysis)
+    return [
+        ("analysis",
+         estimate_tokens(LEGACY_ANALYSIS_PROMPT), estimate_tokens(legacy_analysis),
+         estimate_tokens(STRUCTURED_ANALYSIS_PROMPT) + tools(ANALYSIS_TOOL), estimate_tokens(compact_json(analysis))),
+        ("plan",
+         estimate_tokens(LEGACY_PLAN_PROMPT.format(source=source, analysis=legacy_analysis)),
+         estimate_tokens(legacy_plan),
+         estimate_tokens(STRUCTURED_PLAN_PROMPT.format(source=source, analysis=compact_json(plan_context(analysis))))
+         + tools(PLAN_TOOL),
+         estimate_tokens(compact_json(plan))),
+        ("word_mcp",
+         estimate_tokens(WORD_PROMPT.format(reference=DOCUMENT_REFERENCE, plan=legacy_plan)), None,
+         estimate_tokens(WORD_PROMPT.format(reference=DOCUMENT_REFERENCE, plan=compact_json(plan))), None),
+    ]
+
+
+def _saving(before, after):
+    return f"{(before - after) / before * 100:>5.0f}%" if before else "-"
+
+
+def main():
+    args = sys.argv[1:]
+    lines = int(args[args.index("--lines") + 1]) if "--lines" in args else 400
+    tps = float(args[args.index("--tps") + 1]) if "--tps" in args else 60.0
+    ttft = float(args[args.index("--ttft") + 1]) if "--ttft" in args else 0.8
+
+    minutes = synthetic_minutes(lines)
+    analysis = sample_analysis(minutes)
+    plan = sample_plan(analysis)
+    source = f"（{DOCUMENT_REFERENCE}を参照）"
+    document_tokens = estimate_tokens("\n".join(minutes))
+
+    print(f"🧪 自由記述 vs スキーマ付き出力（合成議事録 {lines}行 ≒ {document_tokens:,}トークン, "
+          f"セクション {len(analysis['sections'])}）")
+    print("   議事録本文（system・両方式で共通）は含まない。構造化の入力にはツール定義を含む")
+    print("="*92)
+    print(f"{'ステージ':<10} {'入力 従来':>9} {'→ 構造化':>9} {'削減':>6} {'出力 従来':>9} {'→ 構造化':>9} {'削減':>6} "
+          f"{'推定 従来':>9} {'→ 構造化':>9}")
+    print("-"*92)
+    totals = [0, 0, 0.0, 0.0]
+    for stage, legacy_in, legacy_out, structured_in, structured_out in stage_rows(analysis, plan, source):
+        if legacy_out is None:
+            print(f"{stage:<10} {legacy_in:>9,} {structured_in:>9,} {_saving(legacy_in, structured_in)} "
+                  f"{'(--word-mcp 指定時のみ。出力は形式に依存しない)':>30}")
+            totals[0] += legacy_in
+            totals[1] += structured_in
+            continue
+        legacy_latency = ttft + legacy_out / tps
+        structured_latency = ttft + structured_out / tps
+        print(f"{stage:<10} {legacy_in:>9,} {structured_in:>9,} {_saving(legacy_in, structured_in)} "
+              f"{legacy_out:>9,} {structured_out:>9,} {_saving(legacy_out, structured_out)} "
+              f"{legacy_latency:>8.1f}s {structured_latency:>8.1f}s")
+        totals = [totals[0] + legacy_in + legacy_out, totals[1] + structured_in + structured_out,
+                  totals[2] + legacy_latency, totals[3] + structured_latency]
+    print("-"*92)
+    print(f"合計トークン: {totals[0]:,} → {totals[1]:,} ({_saving(totals[0], totals[1]).strip()}削減) / "
+          f"分析+プランの推定レイテンシ: {totals[2]:.1f}s → {totals[3]:.1f}s")
+    print(f"💡 推定レイテンシ = 最初のトークンまで {ttft}秒 + 出力トークン ÷ {tps:g}トークン/秒")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+import os
+import json
+import hashlib
+import threading
+from types import SimpleNamespace
+
+# record: 毎回APIを呼んで保存 / replay: 保存済みの応答だけを返す（通信しない） / auto: あれば再生、なければ記録
+CASSETTE_MODES = ("record", "replay", "auto")
+DEFAULT_CASSETTE_MODE = "replay"
+STREAM_CHUNK_CHARS = 40
+
+
+class CassetteMiss(LookupError):
+    """replay モードで対応する記録が無い"""
+
+
+def request_key(params):
+    """リクエストパラメータ全体（モデル・system・メッセージ・MCPサーバー・betas）から決まるキー"""
+    canonical = json.dumps(params, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:32]
+
+
+def to_plain(value):
+    """SDKのレスポンス（pydantic）やフェイクの SimpleNamespace をJSONにできる形に変換"""
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json", exclude_none=True)
+    if isinstance(value, SimpleNamespace):
+        value = vars(value)
+    if isinstance(value, dict):
+        return {key: to_plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_plain(item) for item in value]
+    return value
+
+
+def to_namespace(value):
+    """保存した辞書を属性アクセスできるオブジェクトに戻す（response.content[0].text など）"""
+    if isinstance(value, dict):
+        return SimpleNamespace(**{key: to_namespace(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return [to_namespace(item) for item in value]
+    return value
+
+
+class Cassette:
+    """リクエストごとに1ファイル（<キー>.json）でレスポンスを保存するディレクトリ"""
+
+    def __init__(self, directory, mode=DEFAULT_CASSETTE_MODE):
+        if mode not in CASSETTE_MODES:
+            raise ValueError(f"MCP_CASSETTE_MODE は {'/'.join(CASSETTE_MODES)} のいずれかです: {mode}")
+        self.directory = directory
+        self.mode = mode
+        self.hits = 0
+        self.recorded = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def path_for(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def load(self, params):
+        """記録済みのレスポンスを返す（record モード・未記録ならNone、replay で未記録なら CassetteMiss）"""
+        if self.mode == "record":
+            return None
+        key = request_key(params)
+        try:
+            with open(self.path_for(key), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            if self.mode == "replay":
+                raise CassetteMiss(f"カセットに記録がありません: {self.path_for(key)}（MCP_CASSETTE_MODE=record で記録）")
+            return None
+        with self._lock:
+            self.hits += 1
+        return to_namespace(entry["response"])
+
+    def save(self, params, response):
+        key = request_key(params)
+        entry = {"request": to_plain(params), "response": to_plain(response)}
+        path = self.path_for(key)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, path)
+        with self._lock:
+            self.recorded += 1
+
+
+class CassetteStream:
+    """記録済みの最終メッセージから stream イベントを組み立てて流す"""
+
+    def __init__(self, message):
+        self.message = message
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def __iter__(self):
+        for block in self.message.content:
+            if block.type == "text":
+                for start in range(0, len(block.text), STREAM_CHUNK_CHARS):
+                    yield SimpleNamespace(type="content_block_delta", delta=SimpleNamespace(
+                        type="text_delta", text=block.text[start:start + STREAM_CHUNK_CHARS]))
+            else:
+                yield SimpleNamespace(type="content_block_start", content_block=block)
+
+    def get_final_message(self):
+        return self.message
+
+
+class RecordingStream:
+    """実際の stream をそのまま流し、最終メッセージをカセットに保存する"""
+
+    def __init__(self, cassette, params, stream_manager):
+        self.cassette = cassette
+        self.params = params
+        self.stream_manager = stream_manager
+        self.stream = None
+
+    def __enter__(self):
+        self.stream = self.stream_manager.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        return self.stream_manager.__exit__(*exc_info)
+
+    def __iter__(self):
+        return iter(self.stream)
+
+    def get_final_message(self):
+        message = self.stream.get_final_message()
+        self.cassette.save(self.params, message)
+        return message
+
+
+class CassetteMessages:
+    """messages.create / stream をカセット経由にするラッパー"""
+
+    def __init__(self, cassette, inner):
+        self.cassette = cassette
+        self.inner = inner  # replay モードでは None
+        # replay モードは通信しないため、スケジューラのレート制限の対象外にする
+        self.offline = cassette.mode == "replay"
+
+    def create(self, **params):
+        response = self.cassette.load(params)
+        if response is None:
+            response = self.inner.create(**params)
+            self.cassette.save(params, response)
+        return response
+
+    def stream(self, **params):
+        message = self.cassette.load(params)
+        if message is not None:
+            return CassetteStream(message)
+        return RecordingStream(self.cassette, params, self.inner.stream(**params))
+
+
+class AsyncCassetteMessages(CassetteMessages):
+    async def create(self, **params):
+        response = self.cassette.load(params)
+        if response is None:
+            response = await self.inner.create(**params)
+            self.cassette.save(params, response)
+        return response
+
+
+class CassetteClient:
+    """client.messages / client.beta.messages をカセット経由にしたクライアント
+
+    inner_factory は記録時に初めて呼ばれるため、replay モードではSDKの読み込みも通信もしない。
+    """
+
+    def __init__(self, cassette, inner_factory, async_client=False):
+        self.cassette = cassette
+        self._inner_factory = inner_factory
+        self._inner = None
+        self.offline = cassette.mode == "replay"
+        messages_class = AsyncCassetteMessages if async_client else CassetteMessages
+        self.messages = messages_class(cassette, _LazyAttribute(self, ("messages",)))
+        self.beta = SimpleNamespace(messages=messages_class(cassette, _LazyAttribute(self, ("beta", "messages"))))
+
+    @property
+    def inner(self):
+        if self._inner is None:
+            self._inner = self._inner_factory()
+        return self._inner
+
+
+class _LazyAttribute:
+    """内側のクライアントを初回利用時に生成し、そのメソッドを返す"""
+
+    def __init__(self, client, path):
+        self.client = client
+        self.path = path
+
+    def __getattr__(self, name):
+        target = self.client.inner
+        for part in self.path:
+            target = getattr(target, part)
+        return getattr(target, name)
+
+
+_cassettes = {}
+_cassettes_lock = threading.Lock()
+
+
+def get_cassette(directory, mode):
+    """同じディレクトリ・モードのカセットはプロセス内で共有する（ヒット数の集計用）"""
+    key = (os.path.abspath(directory), mode)
+    with _cassettes_lock:
+        if key not in _cassettes:
+            _cassettes[key] = Cassette(directory, mode)
+        return _cassettes[key]
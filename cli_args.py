@@ -0,0 +1,26 @@
+import sys
+
+
+def pop_flag(args, flag):
+    """引数リストからフラグを取り除き、指定されていたかを返す"""
+    if flag in args:
+        args.remove(flag)
+        return True
+    return False
+
+
+def pop_option(args, name, default=None, cast=str):
+    """引数リストから `--name 値` を取り除いて値を返す（値が無い・変換できない場合は終了）"""
+    if name not in args:
+        return default
+    index = args.index(name)
+    if index + 1 >= len(args):
+        print(f"❌ {name} には値が必要です")
+        sys.exit(1)
+    value = args[index + 1]
+    del args[index:index + 2]
+    try:
+        return cast(value)
+    except ValueError:
+        print(f"❌ {name} の値が不正です: {value}")
+        sys.exit(1)
@@ -0,0 +1,276 @@
+from datetime import datetime
+from word_template import fill_placeholders
+from markdown_blocks import (
+    tokenize, parse_inline,
+    Heading, Paragraph, ListItem, Table, CodeBlock, Quote, Rule,
+)
+
+MEETING_TABLE_KEYS = ('会議名', '開催日時', '参加者', '記録者')
+
+
+def iter_markdown_lines(file_path):
+    """Markdownファイルを1行ずつ読み出すジェネレータ（全文を保持しない）"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            yield line.rstrip('\n')
+
+
+def iter_text_lines(text):
+    """文字列を split() でコピーせずに1行ずつ返すジェネレータ"""
+    start = 0
+    length = len(text)
+    while start < length:
+        end = text.find('\n', start)
+        if end == -1:
+            end = length
+        yield text[start:end]
+        start = end + 1
+
+
+def meeting_fields(info=None):
+    """会議情報テーブル・テンプレート差し込み用の項目"""
+    return {
+        '会議名': (info.title if info else '') or '定例会議',
+        '開催日時': (info.date if info else '') or datetime.now().strftime('%Y年%m月%d日'),
+        '参加者': '、'.join(info.participants) if info and info.participants else '(記載なし)',
+        '場所': (info.location if info else '') or '',
+        '記録者': (info.recorder if info else '') or 'AI議事録システム',
+    }
+
+
+def new_minutes_document(info=None, template=None):
+    """表紙タイトルと会議情報テーブルを持つ新しいWord文書を作成
+
+    template (WordTemplate) を渡すと、そのスタイル・ヘッダー/フッター・表紙を
+    引き継いだ複製に {{会議名}} などを差し込み、表紙の後ろに本文を追加する。
+    """
+    from docx import Document
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
+
+    fields = meeting_fields(info)
+    if template is not None:
+        doc = template.new_document()
+        fill_placeholders(doc, fields)
+    else:
+        doc = Document()
+
+    # タイトル追加（テンプレートにTitleスタイルが無い場合は標準段落）
+    title = doc.add_paragraph('会議議事録', style='Title' if 'Title' in doc.styles else None)
+    title.alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+    add_meeting_table(doc, fields)
+
+    # Markdownコンテンツをセクションごとに処理
+    doc.add_page_break()
+    return doc
+
+
+def add_meeting_table(doc, fields, keys=MEETING_TABLE_KEYS):
+    """会議情報テーブル（項目名・値の2列）を本文末尾に追加"""
+    table = doc.add_table(rows=len(keys), cols=2)
+    table.style = 'Table Grid' if 'Table Grid' in doc.styles else None
+
+    for row, key in enumerate(keys):
+        table.cell(row, 0).text = key
+        table.cell(row, 1).text = fields[key]
+    return table
+
+
+class DocxBlockRenderer:
+    """ブロックASTをpython-docx文書へ1回の走査で描画
+
+    スタイル名→スタイルIDの解決は文書ごとに1回だけ行い、段落・ランのXMLは
+    本文末尾（sectPrの直前）へ直接組み立てる。python-docx標準の
+    add_paragraph(style=...) は呼び出しのたびに全スタイルを走査するため、
+    大きな議事録ではそれが処理時間の大半を占める。
+    """
+
+    BULLET_STYLES = ('List Bullet', 'List Bullet 2', 'List Bullet 3')
+    NUMBER_STYLES = ('List Number', 'List Number 2', 'List Number 3')
+    CODE_FONT = 'Consolas'
+    CODE_HALF_POINTS = '18'  # 9pt
+    LINK_COLOR = '0563C1'
+
+    def __init__(self, doc):
+        from lxml.etree import SubElement
+        from docx.oxml.ns import qn
+
+        self.doc = doc
+        self._sub = SubElement
+        self._tags = {name: qn(name) for name in (
+            'w:p', 'w:pPr', 'w:pStyle', 'w:val', 'w:r', 'w:rPr', 'w:rFonts', 'w:ascii',
+            'w:hAnsi', 'w:b', 'w:i', 'w:u', 'w:color', 'w:sz', 'w:t', 'w:br', 'w:pBdr',
+            'w:bottom', 'w:space', 'w:hyperlink', 'r:id',
+        )}
+        self._xml_space = '{http://www.w3.org/XML/1998/namespace}space'
+        self._body = doc.element.body
+        self._sect_pr = self._body.sectPr
+        self._style_ids = {}
+        self.dispatch = {
+            Heading: self._render_heading,
+            Paragraph: self._render_paragraph,
+            ListItem: self._render_list_item,
+            Table: self._render_table,
+            CodeBlock: self._render_code,
+            Quote: self._render_quote,
+            Rule: self._render_rule,
+        }
+
+    def style_id(self, name):
+        """スタイル名からスタイルIDを引く（結果をキャッシュ、無ければNone）"""
+        try:
+            return self._style_ids[name]
+        except KeyError:
+            styles = self.doc.styles
+            style_id = styles[name].style_id if name in styles else None
+            self._style_ids[name] = style_id
+            return style_id
+
+    def render(self, blocks):
+        """ブロックのストリームを描画し、描画したブロック数を返す"""
+        dispatch = self.dispatch
+        count = 0
+        for block in blocks:
+            dispatch[block.__class__](block)
+            count += 1
+        return count
+
+    def _new_paragraph(self, style_name=None):
+        """本文末尾に w:p を追加して返す"""
+        tags = self._tags
+        p = self._body.makeelement(tags['w:p'], {})
+        if self._sect_pr is not None:
+            self._sect_pr.addprevious(p)
+        else:
+            self._body.append(p)
+        style_id = self.style_id(style_name) if style_name else None
+        if style_id:
+            p_pr = self._sub(p, tags['w:pPr'])
+            self._sub(p_pr, tags['w:pStyle']).set(tags['w:val'], style_id)
+        return p
+
+    def _add_run(self, parent, text, bold=False, italic=False, code=False, link=False):
+        tags = self._tags
+        sub = self._sub
+        r = sub(parent, tags['w:r'])
+        if bold or italic or code or link:
+            r_pr = sub(r, tags['w:rPr'])
+            if code:
+                fonts = sub(r_pr, tags['w:rFonts'])
+                fonts.set(tags['w:ascii'], self.CODE_FONT)
+                fonts.set(tags['w:hAnsi'], self.CODE_FONT)
+            if bold:
+                sub(r_pr, tags['w:b'])
+            if italic:
+                sub(r_pr, tags['w:i'])
+            if link:
+                sub(r_pr, tags['w:color']).set(tags['w:val'], self.LINK_COLOR)
+                sub(r_pr, tags['w:u']).set(tags['w:val'], 'single')
+        t = sub(r, tags['w:t'])
+        t.text = text
+        if text[:1].isspace() or text[-1:].isspace():
+            t.set(self._xml_space, 'preserve')
+        return r
+
+    def _add_inline(self, p, text, bold=False):
+        for span in parse_inline(text):
+            if span.url:
+                self._add_hyperlink(p, span.text, span.url)
+            else:
+                self._add_run(p, span.text, bold=span.bold or bold,
+                              italic=span.italic, code=span.code)
+
+    def _add_hyperlink(self, p, text, url):
+        from docx.opc.constants import RELATIONSHIP_TYPE
+
+        r_id = self.doc.part.relate_to(url, RELATIONSHIP_TYPE.HYPERLINK, is_external=True)
+        hyperlink = self._sub(p, self._tags['w:hyperlink'])
+        hyperlink.set(self._tags['r:id'], r_id)
+        self._add_run(hyperlink, text, link=True)
+
+    def _render_heading(self, block):
+        style = 'Title' if block.level == 0 else f'Heading {min(block.level, 9)}'
+        self._add_inline(self._new_paragraph(style), block.text)
+
+    def _render_paragraph(self, block):
+        self._add_inline(self._new_paragraph(), block.text)
+
+    def _render_list_item(self, block):
+        styles = self.NUMBER_STYLES if block.ordered else self.BULLET_STYLES
+        p = self._new_paragraph(styles[min(block.depth, len(styles) - 1)])
+        if block.checked is not None:
+            self._add_run(p, '☑ ' if block.checked else '☐ ')
+        self._add_inline(p, block.text)
+
+    def _render_table(self, block):
+        columns = max(len(row) for row in block.rows)
+        table = self.doc.add_table(rows=len(block.rows), cols=columns)
+        style_id = self.style_id('Table Grid')
+        if style_id:
+            table._tbl.tblStyle_val = style_id
+        # table.cell() は呼び出しごとに全セルを列挙するため、行単位で走査する
+        for row_index, (row, values) in enumerate(zip(table.rows, block.rows)):
+            for cell, value in zip(row.cells, values):
+                self._add_inline(cell.paragraphs[0]._p, value, bold=row_index == 0)
+
+    def _render_code(self, block):
+        tags = self._tags
+        p = self._new_paragraph('No Spacing')
+        for index, line in enumerate(block.lines):
+            r = self._add_run(p, line or ' ', code=True)
+            self._sub(r[0], tags['w:sz']).set(tags['w:val'], self.CODE_HALF_POINTS)
+            if index < len(block.lines) - 1:
+                self._sub(r, tags['w:br'])
+
+    def _render_quote(self, block):
+        self._add_inline(self._new_paragraph('Quote'), block.text)
+
+    def _render_rule(self, block):
+        tags = self._tags
+        p = self._new_paragraph()
+        p_pr = self._sub(p, tags['w:pPr'])
+        bottom = self._sub(self._sub(p_pr, tags['w:pBdr']), tags['w:bottom'])
+        bottom.set(tags['w:val'], 'single')
+        bottom.set(tags['w:sz'], '6')
+        bottom.set(tags['w:space'], '1')
+        bottom.set(tags['w:color'], 'auto')
+
+
+def render_markdown_lines(doc, lines):
+    """Markdownの行イテラブルを1行ずつ読みながらWord文書へ追加
+
+    lines はリストでもジェネレータでもよく、tokenize が返したブロックを
+    その場で描画する。戻り値は描画したブロック数。
+    """
+    return DocxBlockRenderer(doc).render(tokenize(lines))
+
+
+def render_markdown_file(file_path, info=None, template=None):
+    """Markdownファイルをストリーミングで読みながらWord文書を組み立てる"""
+    doc = new_minutes_document(info, template)
+    render_markdown_lines(doc, iter_markdown_lines(file_path))
+    return doc
+
+
+def merge_documents(paths, output_path):
+    """複数の .docx の本文を1つ目の文書の末尾に順に連結して保存（パートの間は改ページ）
+
+    段落・表などの本文要素だけを移すため、スタイルは1つ目の文書のものが使われる。
+    """
+    from copy import deepcopy
+    from docx import Document
+
+    merged = Document(paths[0])
+    body = merged.element.body
+    section = body.sectPr
+    for path in paths[1:]:
+        merged.add_page_break()
+        for element in Document(path).element.body:
+            if element.tag.endswith('}sectPr'):
+                continue
+            if section is not None:
+                section.addprevious(deepcopy(element))
+            else:
+                body.append(deepcopy(element))
+    merged.save(output_path)
+    return output_path
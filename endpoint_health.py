@@ -0,0 +1,248 @@
+import os
+import sys
+import json
+import time
+import threading
+from urllib.parse import urlsplit
+
+DEFAULT_HEALTH_PATH = os.path.join(
+    os.path.expanduser("~"), ".cache", "mcp_business_suite", "endpoint_health.json"
+)
+DEFAULT_HEALTH_TTL = 300          # 到達性・レイテンシの再利用期間（秒）
+DEFAULT_PROBE_TIMEOUT = 5.0       # 1URLあたりの接続～応答ヘッダー受信の上限（秒）
+DEFAULT_FAILURE_THRESHOLD = 2     # 連続失敗がこの回数に達したらサーキットを開く
+DEFAULT_COOLDOWN = 600            # サーキットを開いてから再プローブするまでの時間（秒）
+DEFAULT_PROBE_WORKERS = 8
+
+# 認証が必要なだけのサーバーは到達可能とみなす（認証はAPI側で行われる）
+REACHABLE_STATUSES = (401, 403, 405)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+def probe_url(url, timeout=DEFAULT_PROBE_TIMEOUT):
+    """SSEエンドポイントに接続し、応答ヘッダーを受け取るまでの時間を計測
+
+    SSEは接続を開いたままにするため、ボディは読まずにヘッダー受信で打ち切る。
+    戻り値は {"ok", "status", "latency", "error"}。
+    """
+    import http.client  # CLIの起動を遅くしないよう、実際にプローブする時だけ読み込む
+
+    parts = urlsplit(url)
+    connection_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+    path = parts.path or "/"
+    if parts.query:
+        path += "?" + parts.query
+
+    started = time.perf_counter()
+    conn = connection_class(parts.hostname, parts.port, timeout=timeout)
+    try:
+        conn.request("GET", path, headers={"Accept": "text/event-stream", "Cache-Control": "no-cache"})
+        response = conn.getresponse()
+        latency = time.perf_counter() - started
+        status = response.status
+    except (OSError, http.client.HTTPException) as e:
+        return {"ok": False, "status": None, "latency": None, "error": f"{type(e).__name__}: {e}"}
+    finally:
+        conn.close()
+
+    ok = status < 400 or status in REACHABLE_STATUSES
+    return {"ok": ok, "status": status, "latency": round(latency, 3),
+            "error": None if ok else f"HTTP {status}"}
+
+
+class EndpointHealth:
+    """MCPサーバーURLの到達性キャッシュとURLごとのサーキットブレーカー
+
+    プローブ結果はTTLの間ファイルに保存して使い回す。連続して失敗したURLは
+    サーキットを開いてサーバーセットから外し、クールダウン後の再プローブ
+    （half-open）で成功した時点で元に戻す。
+    """
+
+    def __init__(self, path=None, ttl=None, timeout=None,
+                 failure_threshold=DEFAULT_FAILURE_THRESHOLD, cooldown=DEFAULT_COOLDOWN,
+                 max_workers=DEFAULT_PROBE_WORKERS, probe=probe_url):
+        self.path = path or os.getenv("MCP_HEALTH_PATH", DEFAULT_HEALTH_PATH)
+        self.ttl = ttl if ttl is not None else float(os.getenv("MCP_HEALTH_TTL", DEFAULT_HEALTH_TTL))
+        self.timeout = timeout if timeout is not None else float(
+            os.getenv("MCP_PROBE_TIMEOUT", DEFAULT_PROBE_TIMEOUT))
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.max_workers = max_workers
+        self.probe = probe
+        self._lock = threading.Lock()
+        self._entries = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self._entries, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, self.path)
+
+    def state(self, url, now=None):
+        """サーキットの状態 (closed / open / half-open)"""
+        entry = self._entries.get(url)
+        if not entry or entry.get("opened_at") is None:
+            return CLOSED
+        now = now or time.time()
+        return OPEN if now - entry["opened_at"] < self.cooldown else HALF_OPEN
+
+    def _needs_probe(self, url, now):
+        entry = self._entries.get(url)
+        if entry is None:
+            return True
+        state = self.state(url, now)
+        if state == OPEN:
+            return False  # クールダウン中はプローブせずに除外
+        if state == HALF_OPEN:
+            return True
+        return now - entry["checked_at"] >= self.ttl
+
+    def _record(self, url, result, now):
+        entry = self._entries.get(url) or {"failures": 0, "opened_at": None}
+        entry.update(result)
+        entry["checked_at"] = now
+        if result["ok"]:
+            entry["failures"] = 0
+            entry["opened_at"] = None
+        else:
+            entry["failures"] = entry.get("failures", 0) + 1
+            if entry["opened_at"] is not None or entry["failures"] >= self.failure_threshold:
+                # half-open での失敗はクールダウンをやり直す
+                entry["opened_at"] = now
+        self._entries[url] = entry
+
+    def check(self, urls, force=False):
+        """URL群を並行してプローブし（TTL内・クールダウン中は省略）、URL→状態の辞書を返す"""
+        urls = list(dict.fromkeys(urls))
+        now = time.time()
+        with self._lock:
+            targets = [url for url in urls if force or self._needs_probe(url, now)]
+        if targets:
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(targets))) as executor:
+                results = list(executor.map(lambda url: self.probe(url, self.timeout), targets))
+            now = time.time()
+            with self._lock:
+                for url, result in zip(targets, results):
+                    self._record(url, result, now)
+                self._save()
+        with self._lock:
+            return {url: self.summary(url) for url in urls}
+
+    def summary(self, url):
+        entry = self._entries.get(url, {})
+        return {
+            "ok": entry.get("ok"),
+            "status": entry.get("status"),
+            "latency": entry.get("latency"),
+            "error": entry.get("error"),
+            "failures": entry.get("failures", 0),
+            "state": self.state(url),
+            "checked_at": entry.get("checked_at"),
+        }
+
+    def is_available(self, url):
+        """サーキットが開いていないか（未確認・失敗回数がしきい値未満・half-open は利用可とする）"""
+        return self.state(url) != OPEN
+
+    def filter_servers(self, servers, probe=True):
+        """サーバー定義のリストから利用できないURLを除き、(残したもの, 除外したもの) を返す
+
+        probe=False の場合は既存の記録だけで判定する（事前に check 済みの並行実行向け）。
+        """
+        urls = [server["url"] for server in servers if "url" in server]
+        if probe and urls:
+            self.check(urls)
+        kept, dropped = [], []
+        for server in servers:
+            url = server.get("url")
+            (kept if url is None or self.is_available(url) else dropped).append(server)
+        return kept, dropped
+
+    def reset(self, url=None):
+        """記録を消してサーキットを閉じる（url 省略時は全URL）"""
+        with self._lock:
+            if url is None:
+                self._entries = {}
+            else:
+                self._entries.pop(url, None)
+            self._save()
+
+
+def print_health_report(report):
+    """プローブ結果の一覧を表示"""
+    print(f"{'URL':<48} {'状態':<6} {'HTTP':>5} {'レイテンシ':>10}  サーキット")
+    print("-"*84)
+    for url, health in report.items():
+        mark = "✅" if health["ok"] else "❌"
+        status = health["status"] if health["status"] is not None else "-"
+        latency = f"{health['latency'] * 1000:.0f}ms" if health["latency"] is not None else "-"
+        print(f"{url:<48} {mark:<6} {status:>5} {latency:>10}  {health['state']}"
+              f"{' (' + health['error'] + ')' if health['error'] else ''}")
+
+
+def serve_stub(port=8790, status=200, delay=0.0):
+    """動作確認用のローカルSSEスタンドイン（ヘッダー送信後にpingイベントを流す）"""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class StubHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(delay)
+            self.send_response(status)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            try:
+                while status < 400:
+                    self.wfile.write(b"event: ping\ndata: {}\n\n")
+                    self.wfile.flush()
+                    time.sleep(1)
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), StubHandler)
+    server.daemon_threads = True
+    print(f"🧪 スタンドインSSEサーバー: http://127.0.0.1:{port}/sse (HTTP {status}, 遅延 {delay}秒)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main():
+    args = sys.argv[1:]
+    if args[:1] == ["stub"]:
+        port = int(args[args.index("--port") + 1]) if "--port" in args else 8790
+        status = int(args[args.index("--status") + 1]) if "--status" in args else 200
+        delay = float(args[args.index("--delay") + 1]) if "--delay" in args else 0.0
+        serve_stub(port, status, delay)
+    elif args[:1] == ["probe"] and len(args) > 1:
+        force = "--force" in args
+        urls = [arg for arg in args[1:] if arg != "--force"]
+        print_health_report(EndpointHealth().check(urls, force=force))
+    else:
+        print("📖 endpoint_health.py - MCPサーバーURLのヘルスチェック")
+        print("  python endpoint_health.py probe <URL>... [--force]")
+        print("  python endpoint_health.py stub [--port 8790] [--status 200] [--delay 0]")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+import os
+import json
+import time
+import random
+import asyncio
+import threading
+from types import SimpleNamespace
+
+from minutes_chunker import estimate_tokens
+
+DEFAULT_FAKE_LATENCY = 0.5   # 1回の応答にかかる秒数
+DEFAULT_FAKE_JITTER = 0.1    # ±の揺らぎ（秒）
+DEFAULT_STREAM_CHUNKS = 8
+
+
+def _prompt_text(params):
+    texts = []
+    system = params.get("system")
+    if isinstance(system, str):
+        texts.append(system)
+    elif isinstance(system, list):
+        texts.extend(block.get("text", "") for block in system if isinstance(block, dict))
+    for message in params.get("messages", []):
+        content = message.get("content")
+        texts.append(content if isinstance(content, str) else str(content))
+    if params.get("tools"):  # ツール定義も入力トークンに数えられる
+        texts.append(json.dumps(params["tools"], ensure_ascii=False))
+    return "\n".join(texts)
+
+
+def _schema_sample(schema):
+    """JSONスキーマに沿った最小限の値（配列は1要素、列挙は先頭の値）"""
+    if "enum" in schema:
+        return schema["enum"][0]
+    kind = schema.get("type")
+    if kind == "object":
+        return {name: _schema_sample(item) for name, item in schema.get("properties", {}).items()}
+    if kind == "array":
+        return [_schema_sample(schema.get("items", {}))]
+    if kind in ("integer", "number"):
+        return schema.get("minimum", 1)
+    if kind == "boolean":
+        return False
+    return "（フェイク）"
+
+
+def _forced_tool(params):
+    """tool_choice で指定されたツール定義（指定が無ければNone）"""
+    choice = params.get("tool_choice") or {}
+    if choice.get("type") != "tool":
+        return None
+    return next((tool for tool in params.get("tools") or [] if tool.get("name") == choice.get("name")), None)
+
+
+def _answers_tool_results(params):
+    """最後のメッセージがツール結果（tool_result）の返却かどうか"""
+    messages = params.get("messages") or []
+    content = messages[-1].get("content") if messages else None
+    return isinstance(content, list) and any(
+        isinstance(block, dict) and block.get("type") == "tool_result" for block in content)
+
+
+class FakeMessages:
+    """messages.create / messages.stream の代替（定型の text / mcp_tool_use ブロックを返す）
+
+    tool_choice でツールが指定された場合は、その input_schema に沿った tool_use ブロックだけを返す。
+    tools だけが渡された場合は、先頭の tool_calls 個のツールを呼ぶ tool_use ブロックを返し、
+    ツール結果が返ってきたら本文で応答する（ローカルのツール使用ループの確認用）。
+    """
+
+    def __init__(self, owner):
+        self.owner = owner
+
+    def _message(self, params):
+        owner = self.owner
+        content = []
+        for server in (params.get("mcp_servers") or [])[:owner.tool_calls]:
+            content.append(SimpleNamespace(type="mcp_tool_use", id=f"mcptoolu_fake{owner.calls}",
+                                           name=f"{server.get('name', 'mcp')}_search",
+                                           server_name=server.get("name", "mcp"), input={}))
+        prompt = _prompt_text(params)
+        tool = _forced_tool(params)
+        if tool is None and params.get("tools") and not _answers_tool_results(params):
+            tools = params["tools"][:owner.tool_calls]
+        else:
+            tools = [tool] if tool is not None else []
+        if tools:
+            inputs = [_schema_sample(item.get("input_schema", {})) for item in tools]
+            text = json.dumps(inputs, ensure_ascii=False)
+            for index, (item, tool_input) in enumerate(zip(tools, inputs)):
+                content.append(SimpleNamespace(type="tool_use", id=f"toolu_fake{owner.calls}_{index}",
+                                               name=item["name"], input=tool_input))
+        else:
+            text = owner.text or f"（フェイク応答）{prompt[-80:].strip()}"
+            content.append(SimpleNamespace(type="text", text=text))
+        return SimpleNamespace(
+            id=f"msg_fake{owner.calls}",
+            type="message",
+            role="assistant",
+            model=params.get("model"),
+            content=content,
+            stop_reason="tool_use" if tools else "end_turn",
+            usage=SimpleNamespace(input_tokens=estimate_tokens(prompt), output_tokens=estimate_tokens(text),
+                                  cache_creation_input_tokens=0, cache_read_input_tokens=0),
+        )
+
+    def create(self, **params):
+        time.sleep(self.owner.next_latency())
+        return self._message(params)
+
+    def stream(self, **params):
+        return FakeStream(self.owner, self._message(params))
+
+
+class FakeAsyncMessages(FakeMessages):
+    async def create(self, **params):
+        await asyncio.sleep(self.owner.next_latency())
+        return self._message(params)
+
+
+class FakeStream:
+    """beta.messages.stream の代替。latency の間待ってから本文を数回に分けて流す"""
+
+    def __init__(self, owner, message):
+        self.owner = owner
+        self.message = message
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def __iter__(self):
+        latency = self.owner.next_latency()
+        time.sleep(latency * 0.5)  # 最初のトークンまで
+        for block in self.message.content:
+            if block.type != "text":
+                yield SimpleNamespace(type="content_block_start", content_block=block)
+                continue
+            step = max(1, len(block.text) // DEFAULT_STREAM_CHUNKS)
+            for start in range(0, len(block.text), step):
+                time.sleep(latency * 0.5 / DEFAULT_STREAM_CHUNKS)
+                yield SimpleNamespace(type="content_block_delta",
+                                      delta=SimpleNamespace(type="text_delta", text=block.text[start:start + step]))
+
+    def get_final_message(self):
+        return self.message
+
+
+class FakeAnthropic:
+    """APIを呼ばずに応答するクライアント（ベンチマーク・オフライン動作確認用）
+
+    latency ± jitter 秒待ってから応答し、MCPサーバー指定時は tool_calls 個まで
+    mcp_tool_use ブロックを付ける。待ち時間の合計は simulated に積算されるため、
+    実測時間との差がパイプライン自身のオーバーヘッドになる。
+    """
+
+    messages_class = FakeMessages
+
+    def __init__(self, latency=None, jitter=None, text=None, tool_calls=1, seed=None):
+        self.latency = latency if latency is not None else float(
+            os.getenv("MCP_FAKE_LATENCY", DEFAULT_FAKE_LATENCY))
+        self.jitter = jitter if jitter is not None else float(os.getenv("MCP_FAKE_JITTER", DEFAULT_FAKE_JITTER))
+        self.text = text
+        self.tool_calls = tool_calls
+        self.calls = 0
+        self.simulated = 0.0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.messages = self.messages_class(self)
+        self.beta = SimpleNamespace(messages=self.messages)
+
+    def next_latency(self):
+        """次の呼び出しの待ち時間を決めて記録する"""
+        with self._lock:
+            latency = max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+            self.calls += 1
+            self.simulated += latency
+            return latency
+
+    def reset(self):
+        with self._lock:
+            self.calls = 0
+            self.simulated = 0.0
+
+
+class FakeAsyncAnthropic(FakeAnthropic):
+    """FakeAnthropic の非同期版（create がコルーチン）"""
+
+    messages_class = FakeAsyncMessages
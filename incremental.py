@@ -0,0 +1,174 @@
+import os
+import json
+import hashlib
+from collections import namedtuple
+
+from minutes_chunker import _sections, estimate_tokens
+
+# 描画処理やマニフェスト形式を変えたら上げる（古いマニフェストは全セクション再生成になる）
+MANIFEST_VERSION = 1
+# LLM分析の単位あたりの平均セクション数（境界は内容ハッシュで決める）
+DEFAULT_UNIT_SPAN = 4
+
+Section = namedtuple("Section", "index heading lines hash")
+
+
+def content_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def split_sections(lines):
+    """行イテラブルを見出し（レベル2以上）区切りのセクションに分け、内容ハッシュを付ける"""
+    sections = []
+    for path, section_lines in _sections(lines):
+        heading = " > ".join(title for _, title in path)
+        sections.append(Section(len(sections), heading, section_lines,
+                                content_hash("\n".join(section_lines))))
+    return sections
+
+
+def section_text(section):
+    return "\n".join(section.lines)
+
+
+def section_tokens(section):
+    return estimate_tokens(section_text(section))
+
+
+def analysis_units(sections, max_tokens, span=DEFAULT_UNIT_SPAN):
+    """連続するセクションをLLM分析の単位にまとめる
+
+    小さなセクションごとに1回ずつ呼び出すと回数が多すぎるため、ハッシュ値が span で
+    割り切れるセクションの後ろ（またはトークン予算を超える手前）で区切る。境界が
+    位置ではなく内容で決まるため、1か所の編集で前後の単位が組み替わることはない。
+    """
+    units = []
+    current = []
+    tokens = 0
+    for section in sections:
+        section_size = section_tokens(section)
+        if current and tokens + section_size > max_tokens:
+            units.append(current)
+            current, tokens = [], 0
+        current.append(section)
+        tokens += section_size
+        if int(section.hash[:8], 16) % span == 0:
+            units.append(current)
+            current, tokens = [], 0
+    if current:
+        units.append(current)
+    return units
+
+
+def unit_hash(unit):
+    return content_hash("\n".join(section.hash for section in unit))
+
+
+def manifest_path_for(output_path):
+    """出力 .docx と同じ場所に置くサイドカーマニフェストのパス"""
+    return f"{output_path}.sections.json"
+
+
+def template_fingerprint(template):
+    """テンプレートが変わったら描画結果を使い回さないための識別子"""
+    if template is None:
+        return None
+    return f"{template.path}:{template.mtime}"
+
+
+def load_manifest(path, template=None):
+    """マニフェストを読み込む（無い・壊れている・形式やテンプレートが違う場合は空）"""
+    empty = {"version": MANIFEST_VERSION, "template": template_fingerprint(template),
+             "document": None, "sections": {}, "analyses": {}}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return empty
+    if manifest.get("version") != MANIFEST_VERSION or manifest.get("template") != template_fingerprint(template):
+        return empty
+    return manifest
+
+
+def save_manifest(path, manifest):
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    os.replace(temp_path, path)
+
+
+def document_hash(sections, extra=""):
+    """全セクションのハッシュと会議情報（表紙に差し込む内容）から文書全体のハッシュを作る"""
+    return content_hash("\n".join([extra] + [section.hash for section in sections]))
+
+
+class SectionRenderer:
+    """セクション単位で本文XMLを描画・保存・復元する
+
+    描画したセクションの本文要素はXML文字列として保存し、次回は変更の無いセクションを
+    XMLから復元して本文末尾に追加する。ハイパーリンクの関係ID(r:id)は文書ごとに
+    異なるため、URLを保存しておき復元時に付け直す。
+    """
+
+    def __init__(self, doc):
+        from lxml import etree
+        from docx.oxml import parse_xml
+        from docx.oxml.ns import qn
+        from docx_renderer import DocxBlockRenderer
+
+        self.doc = doc
+        self._etree = etree
+        self._parse_xml = parse_xml
+        self._rid = qn("r:id")
+        self._renderer = DocxBlockRenderer(doc)
+        self._body = doc.element.body
+
+    def _append(self, element):
+        sect_pr = self._body.sectPr
+        if sect_pr is not None:
+            sect_pr.addprevious(element)
+        else:
+            self._body.append(element)
+
+    def _rendered_since(self, anchor):
+        """anchor（描画前の本文末尾の要素）より後ろに追加された本文要素"""
+        sect_pr = self._body.sectPr
+        node = anchor.getnext() if anchor is not None else (self._body[0] if len(self._body) else None)
+        elements = []
+        while node is not None and node is not sect_pr:
+            elements.append(node)
+            node = node.getnext()
+        return elements
+
+    def render(self, section):
+        """セクションを描画し、保存用の {"xml": [...], "links": {r:id: URL}} を返す"""
+        from markdown_blocks import tokenize
+
+        sect_pr = self._body.sectPr
+        anchor = sect_pr.getprevious() if sect_pr is not None else (self._body[-1] if len(self._body) else None)
+        self._renderer.render(tokenize(section.lines))
+        elements = self._rendered_since(anchor)
+        rels = self.doc.part.rels
+        links = {}
+        for element in elements:
+            for node in element.iter():
+                rid = node.get(self._rid)
+                if rid and rid in rels and rels[rid].is_external:
+                    links[rid] = rels[rid].target_ref
+        return {"xml": [self._etree.tostring(element, encoding="unicode") for element in elements],
+                "links": links}
+
+    def restore(self, rendered):
+        """保存したXMLをこの文書の本文末尾に追加する"""
+        from docx.opc.constants import RELATIONSHIP_TYPE
+
+        remap = {rid: self.doc.part.relate_to(url, RELATIONSHIP_TYPE.HYPERLINK, is_external=True)
+                 for rid, url in rendered["links"].items()}
+        for xml in rendered["xml"]:
+            element = self._parse_xml(xml)
+            if remap:
+                for node in element.iter():
+                    rid = node.get(self._rid)
+                    if rid in remap:
+                        node.set(self._rid, remap[rid])
+            self._append(element)
@@ -0,0 +1,34 @@
+import os
+
+# MCP_CLIENT=fake でAPIを呼ばないフェイククライアントに切り替える（ベンチマーク・オフライン確認用）
+CLIENT_KINDS = ("anthropic", "fake")
+
+
+def client_kind():
+    kind = os.getenv("MCP_CLIENT", "anthropic").lower()
+    return kind if kind in CLIENT_KINDS else "anthropic"
+
+
+def create_client(async_client=False):
+    """環境変数 MCP_CLIENT に応じたクライアントを生成（SDKはここで初めて読み込む）
+
+    MCP_CASSETTE にディレクトリを指定すると、応答を記録・再生するカセット経由になる
+    （MCP_CASSETTE_MODE=record / replay / auto、デフォルトは replay）。
+    再試行は api_scheduler が行うため、SDKのクライアントは max_retries=0 で作成する。
+    """
+    cassette_dir = os.getenv("MCP_CASSETTE")
+    if cassette_dir:
+        from cassette import CassetteClient, get_cassette, DEFAULT_CASSETTE_MODE
+        cassette = get_cassette(cassette_dir, os.getenv("MCP_CASSETTE_MODE", DEFAULT_CASSETTE_MODE).lower())
+        return CassetteClient(cassette, lambda: _create_inner_client(async_client), async_client)
+    return _create_inner_client(async_client)
+
+
+def _create_inner_client(async_client):
+    if client_kind() == "fake":
+        from fake_client import FakeAnthropic, FakeAsyncAnthropic
+        return FakeAsyncAnthropic() if async_client else FakeAnthropic()
+
+    import anthropic
+    client_class = anthropic.AsyncAnthropic if async_client else anthropic.Anthropic
+    return client_class(api_key=os.getenv("ANTHROPIC_API_KEY"), max_retries=0)
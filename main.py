@@ -2,6 +2,8 @@ import os
 import anthropic
 import sys
 from dotenv import load_dotenv
+from streaming import stream_message, print_stream_timing
+from api_scheduler import get_scheduler
 
 def main():
     # .envファイルから環境変数を読み込み
@@ -15,14 +17,17 @@ def main():
     # Client を初期化
     client = anthropic.Anthropic(
         api_key=api_key,
+        max_retries=0,  # 再試行は api_scheduler が行う
     )
     
     # コマンドライン引数から content を取得
-    if len(sys.argv) < 2:
-        print("使用方法: python main.py 'ユーザメッセージ'")
+    args = [arg for arg in sys.argv[1:] if arg != "--stream"]
+    stream = len(args) != len(sys.argv) - 1
+    if len(args) < 1:
+        print("使用方法: python main.py 'ユーザメッセージ' [--stream]")
         sys.exit(1)
     
-    user_content = sys.argv[1]
+    user_content = args[0]
     
     # 環境変数からMCPサーバーURLを取得（デフォルト値も設定）
     deepwiki_url = os.getenv("DEEPWIKI_API_URL", "https://mcp.deepwiki.com/sse")
@@ -36,7 +41,7 @@ def main():
         print(f"User message: {user_content}")
     
     try:
-        response = client.beta.messages.create(
+        params = dict(
             model="claude-sonnet-4-20250514",
             max_tokens=1000,
             messages=[
@@ -61,6 +66,15 @@ def main():
             betas=["mcp-client-2025-04-04"],
         )
         
+        if stream:
+            # 届いた順に表示
+            print("=== Claude の応答 ===")
+            _, ttft, total = get_scheduler().call_stream("main", stream_message, client, params, tool_prefix="tool use:")
+            print_stream_timing(ttft, total)
+            return
+        
+        response = get_scheduler().call("main", client.beta.messages.create, **params)
+        
         # レスポンス表示
         print("=== Claude の応答 ===")
         for content in response.content:
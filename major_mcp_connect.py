@@ -1,18 +1,58 @@
 import os
-import anthropic
 import sys
-from dotenv import load_dotenv
+import time
 from datetime import datetime
 import json
+import csv
+from streaming import stream_message, print_stream_timing
+from response_cache import ResponseCache, DEFAULT_CACHE_TTL, print_cache_stats
+from endpoint_health import EndpointHealth, print_health_report
+import telemetry
+from cli_args import pop_flag, pop_option
+from api_scheduler import get_scheduler
+from llm_client import create_client
+from message_batches import (
+    BATCH_COST_FACTOR, DEFAULT_POLL_INTERVAL, batch_params, custom_id_for, load_state,
+    pack_requests, result_record, save_state, wait_for_batches,
+)
+
+MODEL = "claude-sonnet-4-20250514"
+MCP_BETA = "mcp-client-2025-04-04"
+
+# ユースケースのテンプレートはトピックを含めずに system に置き、プロンプトキャッシュの対象にする
+TOPIC_REFERENCE = "（ユーザーメッセージで指定するトピック）"
+
+# 実際のビジネス課題に基づくデモ (server_set, use_case, topic)
+DEMO_CASES = [
+    ("basic", "tech_research", "Teams会議録音の音声認識精度向上技術"),
+    ("business", "backoffice_automation", "kintoneと申請書自動生成システムの連携"),
+    ("developer", "gijiroku_enhancement", "Teams VTTファイルからアクションアイテム自動抽出"),
+    ("search", "competitive_analysis", "議事録自動化ツールの市場動向"),
+    ("full", "mcp_integration", "社労士事務所向けAI業務支援システム"),
+]
+
+DEFAULT_DEMO_CONCURRENCY = 3
+DEFAULT_BATCH_CONCURRENCY = 4
+DAY = 24 * 3600
 
 class MCPServerDirectory:
     """実際に使える公開MCPサーバーの統合ディレクトリ"""
     
-    def __init__(self):
-        load_dotenv()
-        self.client = anthropic.Anthropic(
-            api_key=os.getenv("ANTHROPIC_API_KEY")
-        )
+    def __init__(self, use_cache=True, refresh=False, health_check=True, client=None, async_client=None):
+        # SDKの読み込み・.envの読み込み・クライアント生成は初回のAPI呼び出しまで遅延
+        # （list / cases / help など表示だけのコマンドを速く起動するため）
+        # client / async_client を渡すとそれを使う（ベンチマークでのフェイク差し替え用）
+        self._client = client
+        self.async_client = async_client  # ヘッドレスデモ等で初回利用時に生成
+        
+        # 同一 (モデル, プロンプト, サーバーURL) の応答をローカルに保存（初回参照時に開く）
+        self.use_cache = use_cache
+        self._cache = None
+        self.refresh = refresh  # True ならキャッシュを読まずに再取得して上書き
+        
+        # 落ちているMCPサーバーURLを実行前に除外する（--no-health-check で無効、初回参照時に読み込む）
+        self.health_check = health_check
+        self._health = None
         
         # 実際に動作する公開MCPサーバー一覧（2025年5月最新）
         self.servers = {
@@ -214,7 +254,8 @@ class MCPServerDirectory:
 
 実際に導入を検討する際の具体的な判断材料を提供してください。
                 """,
-                "servers": "search"
+                "servers": "search",
+                "cache_ttl": 3 * DAY
             },
             
             "gijiroku_enhancement": {
@@ -241,7 +282,8 @@ class MCPServerDirectory:
 
 実際に実装可能な具体的なソリューションと、段階的な導入プランを提案してください。
                 """,
-                "servers": "developer"
+                "servers": "developer",
+                "cache_ttl": 7 * DAY
             },
             
             "backoffice_automation": {
@@ -273,7 +315,8 @@ class MCPServerDirectory:
 
 費用対効果の高い実装案と、段階的な導入スケジュールを提案してください。
                 """,
-                "servers": "business"
+                "servers": "business",
+                "cache_ttl": 7 * DAY
             },
             
             "mcp_integration": {
@@ -305,7 +348,8 @@ class MCPServerDirectory:
 
 実際に構築可能なMCP統合アーキテクチャと、具体的な実装手順を提案してください。
                 """,
-                "servers": "full"
+                "servers": "full",
+                "cache_ttl": 7 * DAY
             },
             
             "competitive_analysis": {
@@ -338,7 +382,8 @@ class MCPServerDirectory:
 
 投資判断や参入戦略の検討に役立つ、データに基づいた具体的な分析結果を提供してください。
                 """,
-                "servers": "search"
+                "servers": "search",
+                "cache_ttl": 1 * DAY
             },
             
             "workflow_optimization": {
@@ -371,7 +416,8 @@ class MCPServerDirectory:
 
 具体的な改善案、期待される効果、実装優先順位を含む最適化プランを提案してください。
                 """,
-                "servers": "cloudflare"
+                "servers": "cloudflare",
+                "cache_ttl": 7 * DAY
             },
             
             "api_integration": {
@@ -404,7 +450,8 @@ class MCPServerDirectory:
 
 実装可能な連携アーキテクチャ、必要な開発工数、運用コストを含む具体的な提案をしてください。
                 """,
-                "servers": "developer"
+                "servers": "developer",
+                "cache_ttl": 7 * DAY
             }
         }
     
@@ -435,23 +482,171 @@ class MCPServerDirectory:
         print(f"\n💡 使用方法:")
         print(f"  python {sys.argv[0]} <サーバーセット> <ユースケース> '<具体的なトピック>'")
     
-    def execute_use_case(self, server_set, use_case, topic):
-        """指定されたユースケースを実行"""
+    def _resolve_use_case(self, server_set, use_case):
+        """サーバーセットとユースケースを検証して設定を返す"""
         if server_set not in self.servers:
             print(f"❌ 無効なサーバーセット: {server_set}")
             self.list_servers()
-            return
+            return None, None
         
         if use_case not in self.use_cases:
             print(f"❌ 無効なユースケース: {use_case}")
             self.list_use_cases()
-            return
+            return None, None
         
-        case_config = self.use_cases[use_case]
-        server_config = self.servers[server_set]
+        return self.use_cases[use_case], self.servers[server_set]
+    
+    def _request_params(self, case_config, server_config, topic):
+        """messages.create に渡すリクエストパラメータを生成
+
+        固定のテンプレートは cache_control 付きの system ブロックに置き、
+        トピックだけをユーザーメッセージで渡す。同じユースケース・サーバーセットの
+        2回目以降はMCPツール定義とテンプレートがキャッシュから読まれる。
+        """
+        return {
+            "model": MODEL,
+            "max_tokens": 3000,
+            "system": [{
+                "type": "text",
+                "text": case_config["prompt"].format(topic=TOPIC_REFERENCE),
+                "cache_control": {"type": "ephemeral"},
+            }],
+            "messages": [{"role": "user", "content": f"🎯 トピック: {topic}"}],
+            "mcp_servers": server_config["servers"],
+            "betas": [MCP_BETA],
+        }
+    
+    @property
+    def client(self):
+        """同期クライアントを初回利用時に生成"""
+        if self._client is None:
+            _load_env()
+            self._client = create_client()
+        return self._client
+    
+    @property
+    def cache(self):
+        """レスポンスキャッシュを初回参照時に開く（--no-cache 時は None）"""
+        if self._cache is None and self.use_cache:
+            _load_env()
+            self._cache = ResponseCache()
+        return self._cache
+    
+    @property
+    def health(self):
+        """エンドポイントのヘルス記録を初回参照時に読み込む（--no-health-check 時は None）"""
+        if self._health is None and self.health_check:
+            _load_env()
+            self._health = EndpointHealth()
+        return self._health
+    
+    def _cache_key(self, params):
+        """モデル・描画済みプロンプト・サーバーURLからキャッシュキーを生成"""
+        return ResponseCache.make_key(
+            params["model"],
+            params["system"][0]["text"] + "\n\n" + params["messages"][0]["content"],
+            [server["url"] for server in params["mcp_servers"]],
+        )
+    
+    def _cache_get(self, key):
+        """キャッシュ参照（--no-cache / --refresh 時は常にミス扱い）"""
+        if self.cache is None or self.refresh:
+            return None
+        return self.cache.get(key)
+    
+    def _cache_put(self, key, result, use_case):
+        """ユースケースごとのTTLで結果を保存"""
+        if self.cache is None:
+            return
+        ttl = self.use_cases[use_case].get("cache_ttl", DEFAULT_CACHE_TTL)
+        self.cache.put(key, result, use_case=use_case, ttl=ttl)
+    
+    def _healthy_server_config(self, server_config, probe=True, verbose=True):
+        """ヘルスチェックで落ちているURLを除いたサーバーセット設定を返す（全滅ならNone）"""
+        if self.health is None:
+            return server_config
+        kept, dropped = self.health.filter_servers(server_config["servers"], probe=probe)
+        if verbose:
+            for server in dropped:
+                health = self.health.summary(server["url"])
+                print(f"⚠️  {server['name']} を除外: {health['error']} (サーキット: {health['state']})")
+        if not kept:
+            if verbose:
+                print("❌ 利用可能なMCPサーバーがありません（python major_mcp_connect.py health で確認）")
+            return None
+        if not dropped:
+            return server_config
+        return dict(server_config, servers=kept)
+    
+    def _server_urls(self, server_sets=None):
+        """サーバーセット群に含まれる重複なしのURL一覧"""
+        keys = self.servers if server_sets is None else server_sets
+        urls = {}
+        for key in keys:
+            for server in self.servers.get(key, {}).get("servers", []):
+                if "url" in server:
+                    urls[server["url"]] = None
+        return list(urls)
+    
+    def prefetch_health(self, server_sets):
+        """並行実行の前に、使うURLをまとめて並行プローブしておく"""
+        if self.health is None:
+            return
+        urls = self._server_urls(set(server_sets))
+        report = self.health.check(urls)
+        down = [url for url, health in report.items() if not health["ok"]]
+        if down:
+            print(f"⚠️  到達できないMCPサーバーを除外: {', '.join(down)}")
+    
+    def show_health(self):
+        """登録済みの全MCPサーバーURLをプローブして表示（--refresh でTTLを無視）"""
+        health = self.health or EndpointHealth()
+        print("🩺 MCPサーバー ヘルスチェック")
+        print("="*60)
+        started = time.perf_counter()
+        report = health.check(self._server_urls(), force=self.refresh)
+        print_health_report(report)
+        print(f"\n⏱️  {time.perf_counter() - started:.2f}秒 ({len(report)} URL, TTL {health.ttl:.0f}秒)")
+    
+    def show_cache_stats(self):
+        """レスポンスキャッシュの統計を表示"""
+        if self.cache is None:
+            print("💾 キャッシュは無効です (--no-cache)")
+            return
+        print_cache_stats(self.cache.stats())
+    
+    def _print_session_cache_stats(self):
+        """今回の実行でのキャッシュヒット/ミスを表示"""
+        if self.cache is not None:
+            print(f"💾 キャッシュ: ヒット {self.cache.hits} / ミス {self.cache.misses}")
+    
+    def _collect_result(self, response):
+        """レスポンスからテキストと使用ツールを取り出す"""
+        texts = []
+        used_tools = []
+        for content in response.content:
+            if content.type == "text":
+                texts.append(content.text)
+            elif content.type == "mcp_tool_use":
+                used_tools.append(content.name)
+        return {"text": "\n".join(texts), "used_tools": used_tools}
+    
+    def execute_use_case(self, server_set, use_case, topic, stream=False):
+        """指定されたユースケースを実行（stream=True で応答を逐次表示）"""
+        case_config, server_config = self._resolve_use_case(server_set, use_case)
+        if case_config is None:
+            return None
         
-        # プロンプト生成
-        prompt = case_config["prompt"].format(topic=topic)
+        # キャッシュは設定上のサーバーセットで引く（ヒットすればヘルスチェックのプローブも不要）
+        params = self._request_params(case_config, server_config, topic)
+        cache_key = self._cache_key(params)
+        cached = self._cache_get(cache_key)
+        if cached is None:
+            healthy_config = self._healthy_server_config(server_config)
+            if healthy_config is None:
+                return None
+            if healthy_config is not server_config:
+                params = self._request_params(case_config, healthy_config, topic)
         
         print(f"🎯 {case_config['name']} 実行中...")
         print(f"📡 サーバーセット: {server_config['description']}")
@@ -459,29 +654,46 @@ class MCPServerDirectory:
         print("="*60)
         
         try:
-            response = self.client.beta.messages.create(
-                model="claude-sonnet-4-20250514",
-                max_tokens=3000,
-                messages=[{"role": "user", "content": prompt}],
-                mcp_servers=server_config["servers"],
-                betas=["mcp-client-2025-04-04"],
-            )
-            
-            print("📋 調査結果:")
-            print("="*60)
+            timing = None
+            if cached is not None:
+                print("💾 キャッシュヒット（--refresh で再取得）")
+                print("📋 調査結果:")
+                print("="*60)
+                print(cached["text"])
+                response = None
+            elif stream:
+                print("📋 調査結果:")
+                print("="*60)
+                response, ttft, total = get_scheduler().call_stream(use_case, stream_message, self.client, params)
+                timing = (ttft, total)
+            else:
+                response = get_scheduler().call(use_case, self.client.beta.messages.create, **params)
+                
+                print("📋 調査結果:")
+                print("="*60)
+                
+                for content in response.content:
+                    if content.type == "text":
+                        print(content.text)
+                    elif content.type == "mcp_tool_use":
+                        print(f"🔧 [MCP Tool] {content.name}")
             
-            used_tools = []
-            for content in response.content:
-                if content.type == "text":
-                    print(content.text)
-                elif content.type == "mcp_tool_use":
-                    used_tools.append(content.name)
-                    print(f"🔧 [MCP Tool] {content.name}")
+            if cached is not None:
+                result = cached
+            else:
+                result = self._collect_result(response)
+                self._cache_put(cache_key, result, use_case)
+            used_tools = result["used_tools"]
             
             print("\n" + "-"*40)
             print(f"✅ 使用MCPツール: {', '.join(used_tools) if used_tools else 'なし'}")
+            if response is not None:
+                telemetry.print_usage(response)
+            if timing:
+                print_stream_timing(*timing)
             print(f"⏰ 完了時刻: {datetime.now().strftime('%H:%M:%S')}")
             print("-"*40)
+            return result
             
         except Exception as e:
             print(f"❌ エラー発生: {e}")
@@ -489,23 +701,355 @@ class MCPServerDirectory:
             print("1. .envファイルでANTHROPIC_API_KEYが設定されているか確認")
             print("2. インターネット接続を確認")
             print("3. 別のサーバーセットで試行")
+            return None
     
-    def run_demo(self):
+    def _get_async_client(self):
+        """非同期クライアントを初回利用時に生成"""
+        if self.async_client is None:
+            _load_env()
+            self.async_client = create_client(async_client=True)
+        return self.async_client
+    
+    async def execute_use_case_async(self, server_set, use_case, topic):
+        """ユースケースを非同期で実行し、表示せずに結果を返す"""
+        record = {
+            "server_set": server_set,
+            "use_case": use_case,
+            "topic": topic,
+            "text": "",
+            "used_tools": [],
+            "status": "ok",
+            "error": None,
+            "latency": 0.0,
+            "cached": False,
+            "usage": None,
+        }
+        if server_set not in self.servers or use_case not in self.use_cases:
+            record["status"] = "error"
+            record["error"] = f"無効な指定: {server_set} / {use_case}"
+            return record
+        
+        case_config = self.use_cases[use_case]
+        server_config = self.servers[server_set]
+        params = self._request_params(case_config, server_config, topic)
+        cache_key = self._cache_key(params)  # 設定上のサーバーセットで引く（除外の有無で変わらない）
+        started = time.perf_counter()
+        try:
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                record.update(cached)
+                record["cached"] = True
+            else:
+                # 並行実行前に prefetch_health 済みのため、ここではプローブしない
+                healthy_config = self._healthy_server_config(server_config, probe=False, verbose=False)
+                if healthy_config is None:
+                    record["status"] = "error"
+                    record["error"] = f"利用可能なMCPサーバーがありません: {server_set}"
+                    return record
+                if healthy_config is not server_config:
+                    params = self._request_params(case_config, healthy_config, topic)
+                response = await get_scheduler().call_async(
+                    use_case, self._get_async_client().beta.messages.create, **params)
+                result = self._collect_result(response)
+                self._cache_put(cache_key, result, use_case)
+                record.update(result)
+                record["usage"] = telemetry.usage_of(response)
+        except Exception as e:
+            record["status"] = "error"
+            record["error"] = f"{type(e).__name__}: {e}"
+        record["latency"] = round(time.perf_counter() - started, 3)
+        return record
+    
+    async def _run_demo_async(self, demos, concurrency):
+        """デモを同時実行数を制限しながら並行実行"""
+        import asyncio
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def run_one(server_set, use_case, topic):
+            async with semaphore:
+                return await self.execute_use_case_async(server_set, use_case, topic)
+        
+        return await asyncio.gather(
+            *(run_one(server_set, use_case, topic) for server_set, use_case, topic in demos)
+        )
+    
+    def run_demo_headless(self, concurrency=DEFAULT_DEMO_CONCURRENCY):
+        """入力待ちなしでデモを並行実行し、結果を順番に表示（スモークテスト用）"""
+        import asyncio
+        concurrency = max(1, concurrency)
+        print("🎪 MCP実用デモ（ヘッドレスモード）")
+        print(f"⚙️  同時実行数: {concurrency} / デモ数: {len(DEMO_CASES)}")
+        print("="*60)
+        
+        self.prefetch_health(server_set for server_set, _, _ in DEMO_CASES)
+        started = time.perf_counter()
+        results = asyncio.run(self._run_demo_async(DEMO_CASES, concurrency))
+        wall_time = time.perf_counter() - started
+        
+        for i, record in enumerate(results, 1):
+            print(f"\n🎯 実用デモ {i}/{len(results)}: {record['topic']}")
+            print(f"💡 ユースケース: {self.use_cases[record['use_case']]['name']}")
+            print(f"🔧 使用サーバー: {self.servers[record['server_set']]['description']}")
+            print("-"*50)
+            if record["status"] == "ok":
+                print(record["text"])
+                tools = record["used_tools"]
+                print(f"✅ 使用MCPツール: {', '.join(tools) if tools else 'なし'}")
+            else:
+                print(f"❌ エラー発生: {record['error']}")
+            print(f"⏱️  レイテンシ: {record['latency']:.2f}秒")
+            usage = record["usage"]
+            if usage:
+                print(f"🧮 キャッシュ書込 {usage['cache_creation_input_tokens']:,} / "
+                      f"キャッシュ読込 {usage['cache_read_input_tokens']:,} トークン")
+        
+        failed = sum(1 for record in results if record["status"] != "ok")
+        total_latency = sum(record["latency"] for record in results)
+        print("\n" + "="*60)
+        print("📊 デモ結果サマリー")
+        print("="*60)
+        for i, record in enumerate(results, 1):
+            mark = "✅" if record["status"] == "ok" else "❌"
+            print(f"  {mark} {i}. {record['server_set']}/{record['use_case']}: {record['latency']:.2f}秒")
+        print(f"\n⏱️  全体所要時間: {wall_time:.2f}秒 (逐次実行換算: {total_latency:.2f}秒)")
+        print(f"{'🎉' if not failed else '⚠️ '} 成功: {len(results) - failed}/{len(results)}")
+        self._print_session_cache_stats()
+        return results
+    
+    def run_batch(self, manifest_path, output_path=None, concurrency=DEFAULT_BATCH_CONCURRENCY, resume=False):
+        """マニフェストのジョブを共有クライアントで並行実行し、NDJSONに逐次書き出す"""
+        import asyncio
+        jobs = load_manifest(manifest_path)
+        if jobs is None:
+            return None
+        
+        if output_path is None:
+            output_path = os.path.splitext(manifest_path)[0] + ".results.ndjson"
+        
+        done_ids = load_completed_job_ids(output_path) if resume else set()
+        pending = [job for job in jobs if job["id"] not in done_ids]
+        concurrency = max(1, concurrency)
+        
+        print("📦 バッチ実行")
+        print(f"📄 マニフェスト: {manifest_path} ({len(jobs)}件)")
+        print(f"💾 出力: {output_path}")
+        if resume:
+            print(f"⏭️  完了済みスキップ: {len(jobs) - len(pending)}件")
+        print(f"⚙️  同時実行数: {concurrency}")
+        print("="*60)
+        
+        self.prefetch_health(job["server_set"] for job in pending)
+        started = time.perf_counter()
+        with open_ndjson_output(output_path, append=resume) as output:
+            summary = asyncio.run(self._run_batch_async(pending, output, concurrency))
+        wall_time = time.perf_counter() - started
+        
+        print("\n" + "="*60)
+        print(f"✅ 成功: {summary['ok']}件 / ❌ 失敗: {summary['error']}件")
+        print(f"⏱️  全体所要時間: {wall_time:.2f}秒")
+        if pending:
+            print(f"🚀 スループット: {len(pending) / wall_time:.2f}件/秒")
+        self._print_session_cache_stats()
+        return summary
+    
+    async def _run_batch_async(self, jobs, output, concurrency):
+        """ワーカー数を制限したキューでジョブを処理"""
+        import asyncio
+        queue = asyncio.Queue()
+        for job in jobs:
+            queue.put_nowait(job)
+        summary = {"ok": 0, "error": 0}
+        total = len(jobs)
+        
+        async def worker():
+            while True:
+                try:
+                    job = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                record = await self.execute_use_case_async(
+                    job["server_set"], job["use_case"], job["topic"]
+                )
+                record = {"id": job["id"], **record,
+                          "finished_at": datetime.now().isoformat(timespec="seconds")}
+                # 完了したジョブから即座に書き出す（中断時も再開可能にする）
+                output.write(json.dumps(record, ensure_ascii=False) + "\n")
+                output.flush()
+                summary[record["status"]] += 1
+                mark = "✅" if record["status"] == "ok" else "❌"
+                done = summary["ok"] + summary["error"]
+                print(f"{mark} [{done}/{total}] {job['id']}: {job['use_case']} "
+                      f"'{job['topic']}' ({record['latency']:.2f}秒)")
+        
+        await asyncio.gather(*(worker() for _ in range(min(concurrency, total))))
+        return summary
+
+    def run_sweep(self, manifest_path, output_path=None, poll_interval=DEFAULT_POLL_INTERVAL, resume=False):
+        """マニフェストのジョブを Message Batches API でまとめて投入し、完了後にNDJSONへ書き出す
+
+        料金は通常の半額だが結果が揃うまで最大24時間かかるため、急がない大量の調査向け。
+        投入したバッチIDは <出力>.state.json に保存し、--resume で再投入せずに回収を再開する
+        （未投入の状態で --resume した場合は batch と同じく成功済みジョブをスキップする）。
+        """
+        jobs = load_manifest(manifest_path)
+        if jobs is None:
+            return None
+
+        if output_path is None:
+            output_path = os.path.splitext(manifest_path)[0] + ".sweep.ndjson"
+        state_path = f"{output_path}.state.json"
+        state = load_state(state_path)
+        if state is not None and not resume:
+            print(f"⚠️  未回収のバッチがあります: {state_path}")
+            print("💡 --resume で回収を再開するか、ファイルを削除してから再投入してください")
+            return None
+
+        print("📬 バッチスイープ（Message Batches API）")
+        print(f"📄 マニフェスト: {manifest_path} ({len(jobs)}件)")
+        print(f"💾 出力: {output_path}")
+        print(f"⏲️  ポーリング間隔: {poll_interval}秒")
+        print("="*60)
+
+        summary = {"ok": 0, "error": 0}
+        started = time.perf_counter()
+        if state is None:
+            done_ids = load_completed_job_ids(output_path) if resume else set()
+            pending = [job for job in jobs if job["id"] not in done_ids]
+            if resume:
+                print(f"⏭️  完了済みスキップ: {len(jobs) - len(pending)}件")
+            self.prefetch_health(job["server_set"] for job in pending)
+            with open_ndjson_output(output_path, append=resume) as output:
+                state = self._submit_sweep(pending, output, summary, state_path)
+        else:
+            print(f"⏭️  投入済みバッチを再開: {', '.join(state['batches'])}")
+
+        if state["batches"]:
+            scheduler = get_scheduler()
+            batches = wait_for_batches(
+                lambda batch_id: scheduler.call("batch_poll", self.client.beta.messages.batches.retrieve,
+                                                message_batch_id=batch_id),
+                state["batches"], poll_interval)
+            with open_ndjson_output(output_path) as output:
+                self._collect_sweep(state, batches, output, summary)
+            os.remove(state_path)
+
+        print("\n" + "="*60)
+        print(f"✅ 成功: {summary['ok']}件 / ❌ 失敗: {summary['error']}件")
+        print(f"⏱️  全体所要時間: {time.perf_counter() - started:.2f}秒")
+        self._print_session_cache_stats()
+        return summary
+
+    def _write_sweep_record(self, output, record, summary):
+        record["finished_at"] = datetime.now().isoformat(timespec="seconds")
+        output.write(json.dumps(record, ensure_ascii=False) + "\n")
+        output.flush()
+        summary[record["status"]] += 1
+        mark = "✅" if record["status"] == "ok" else "❌"
+        note = " (キャッシュ)" if record.get("cached") else ""
+        print(f"{mark} {record['id']}: {record['use_case']} '{record['topic']}'{note}")
+
+    def _submit_sweep(self, jobs, output, summary, state_path):
+        """キャッシュ済み・無効なジョブは即座に書き出し、残りをバッチとして投入して状態を返す
+
+        状態はバッチを1つ投入するたびに state_path へ保存する（途中の投入が失敗しても、
+        投入済みのバッチは --resume で回収でき、再投入・二重課金にならない）。
+        """
+        entries = []
+        mapping = {}
+        for index, job in enumerate(jobs, 1):
+            record = {**job, "text": "", "used_tools": [], "status": "ok", "error": None,
+                      "cached": False, "usage": None, "batch_id": None}
+            if job["server_set"] not in self.servers or job["use_case"] not in self.use_cases:
+                record["status"] = "error"
+                record["error"] = f"無効な指定: {job['server_set']} / {job['use_case']}"
+                self._write_sweep_record(output, record, summary)
+                continue
+
+            case_config, server_config = self.use_cases[job["use_case"]], self.servers[job["server_set"]]
+            params = self._request_params(case_config, server_config, job["topic"])
+            cache_key = self._cache_key(params)  # 設定上のサーバーセットで引く（除外の有無で変わらない）
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                record.update(cached)
+                record["cached"] = True
+                self._write_sweep_record(output, record, summary)
+                continue
+
+            healthy_config = self._healthy_server_config(server_config, probe=False, verbose=False)
+            if healthy_config is None:
+                record["status"] = "error"
+                record["error"] = f"利用可能なMCPサーバーがありません: {job['server_set']}"
+                self._write_sweep_record(output, record, summary)
+                continue
+            if healthy_config is not server_config:
+                params = self._request_params(case_config, healthy_config, job["topic"])
+
+            custom_id = custom_id_for(job["id"], index)
+            if custom_id in mapping:  # id が重複している場合
+                custom_id = f"job-{index}"
+            mapping[custom_id] = {**job, "cache_key": cache_key}
+            entries.append((custom_id, batch_params(params)))
+
+        state = {"created_at": datetime.now().isoformat(timespec="seconds"), "batches": [], "jobs": {}}
+        packed = pack_requests(entries)
+        for index, requests in enumerate(packed):
+            try:
+                batch = get_scheduler().call("batch_create", self.client.beta.messages.batches.create,
+                                             requests=requests, betas=[MCP_BETA])
+            except Exception as e:
+                remaining = sum(len(rest) for rest in packed[index:])
+                print(f"❌ バッチ投入エラー: {e}")
+                print(f"💡 未投入の{remaining}件は、投入済みバッチの回収後に --resume で再投入されます")
+                break
+            state["batches"].append(batch.id)
+            state["jobs"].update({request["custom_id"]: mapping[request["custom_id"]] for request in requests})
+            save_state(state_path, state)
+            print(f"📤 バッチ投入: {batch.id} ({len(requests)}件)")
+        return state
+
+    def _collect_sweep(self, state, batches, output, summary):
+        """終了したバッチの結果をジョブidに戻して書き出し、成功分はキャッシュに保存"""
+        pending = dict(state["jobs"])
+        for batch_id in state["batches"]:
+            batch = batches[batch_id]
+            turnaround = (batch.ended_at - batch.created_at).total_seconds() if batch.ended_at else 0.0
+            results = get_scheduler().call("batch_results", self.client.beta.messages.batches.results,
+                                           message_batch_id=batch_id, betas=[MCP_BETA])
+            for entry in results:
+                custom_id, status, message, error = result_record(entry)
+                job = pending.pop(custom_id, None)
+                if job is None:
+                    continue
+                cache_key = job.pop("cache_key")
+                record = {**job, "text": "", "used_tools": [], "status": status, "error": error,
+                          "cached": False, "usage": None, "batch_id": batch_id}
+                if message is not None:
+                    result = self._collect_result(message)
+                    self._cache_put(cache_key, result, job["use_case"])
+                    record.update(result)
+                    record["usage"] = telemetry.usage_of(message)
+                    telemetry.record(f"{job['use_case']}:batch", message.model, turnaround, message,
+                                     cost_factor=BATCH_COST_FACTOR, batch_id=batch_id)
+                self._write_sweep_record(output, record, summary)
+
+        for job in pending.values():
+            job.pop("cache_key", None)
+            self._write_sweep_record(output, {**job, "text": "", "used_tools": [], "status": "error",
+                                              "error": "バッチ結果に含まれていません", "cached": False,
+                                              "usage": None, "batch_id": None}, summary)
+
+    def run_demo(self, headless=False, concurrency=DEFAULT_DEMO_CONCURRENCY):
         """実用性を体感できるデモンストレーション実行"""
+        if headless:
+            return self.run_demo_headless(concurrency)
+        
         print("🎪 MCP実用デモンストレーション - 実際のビジネス課題を解決")
         print("="*60)
         
-        demos = [
-            # 実際のビジネス課題に基づくデモ
-            ("basic", "tech_research", "Teams会議録音の音声認識精度向上技術"),
-            ("business", "backoffice_automation", "kintoneと申請書自動生成システムの連携"),
-            ("developer", "gijiroku_enhancement", "Teams VTTファイルからアクションアイテム自動抽出"),
-            ("search", "competitive_analysis", "議事録自動化ツールの市場動向"),
-            ("full", "mcp_integration", "社労士事務所向けAI業務支援システム"),
-        ]
+        demos = DEMO_CASES
         
         for i, (server_set, use_case, topic) in enumerate(demos, 1):
-            print(f"\n🎯 実用デモ {i}/5: {topic}")
+            print(f"\n🎯 実用デモ {i}/{len(demos)}: {topic}")
             print(f"💡 ユースケース: {self.use_cases[use_case]['name']}")
             print(f"🔧 使用サーバー: {self.servers[server_set]['description']}")
             print("-"*50)
@@ -559,22 +1103,102 @@ class MCPServerDirectory:
             else:
                 print("❌ 無効な選択です")
 
+def _load_env():
+    """.envを読み込む（APIキー・キャッシュ設定を使う直前に呼ぶ）"""
+    from dotenv import load_dotenv
+    load_dotenv()
+
+def load_manifest(manifest_path):
+    """CSV/JSONLマニフェストからジョブ一覧を読み込み
+
+    各ジョブは server_set, use_case, topic を持ち、id が無い場合は行番号を使用する。
+    """
+    required = ("server_set", "use_case", "topic")
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            if manifest_path.lower().endswith(".csv"):
+                rows = list(csv.DictReader(f))
+            else:
+                rows = [json.loads(line) for line in f if line.strip()]
+    except FileNotFoundError:
+        print(f"❌ マニフェストが見つかりません: {manifest_path}")
+        return None
+    except (json.JSONDecodeError, csv.Error) as e:
+        print(f"❌ マニフェスト読み込みエラー: {e}")
+        return None
+    
+    jobs = []
+    for index, row in enumerate(rows, 1):
+        missing = [key for key in required if not row.get(key)]
+        if missing:
+            print(f"❌ マニフェスト {index}行目: {', '.join(missing)} がありません")
+            return None
+        jobs.append({
+            "id": str(row.get("id") or index),
+            "server_set": row["server_set"].strip(),
+            "use_case": row["use_case"].strip(),
+            "topic": row["topic"].strip(),
+        })
+    return jobs
+
+def load_completed_job_ids(output_path):
+    """既存のNDJSON出力から成功済みジョブのidを集める"""
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # 中断時の書きかけ行は無視
+            if record.get("status") == "ok":
+                done.add(str(record.get("id")))
+    return done
+
+def open_ndjson_output(output_path, append=True):
+    """NDJSON出力を開く（追記時は、中断で書きかけになった最終行を改行で閉じてから追記する）"""
+    if append and os.path.exists(output_path) and os.path.getsize(output_path):
+        with open(output_path, "rb+") as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                f.write(b"\n")
+    return open(output_path, "a" if append else "w", encoding="utf-8")
+
 def main():
-    mcp_dir = MCPServerDirectory()
+    args = sys.argv[1:]
+    use_cache = not pop_flag(args, "--no-cache")
+    refresh = pop_flag(args, "--refresh")
+    health_check = not pop_flag(args, "--no-health-check")
+    mcp_dir = MCPServerDirectory(use_cache=use_cache, refresh=refresh, health_check=health_check)
     
-    if len(sys.argv) == 1:
+    headless = pop_flag(args, "--headless")
+    resume = pop_flag(args, "--resume")
+    stream = pop_flag(args, "--stream")
+    concurrency = pop_option(args, "--concurrency", None, int)
+    output_path = pop_option(args, "--output")
+    poll_interval = pop_option(args, "--poll", DEFAULT_POLL_INTERVAL, float)
+    
+    if len(args) == 0:
         # 引数なしの場合は対話モード
         mcp_dir.interactive_mode()
-    elif len(sys.argv) == 2:
-        command = sys.argv[1]
+    elif len(args) == 1:
+        command = args[0]
         if command == "list":
             mcp_dir.list_servers()
         elif command == "cases":
             mcp_dir.list_use_cases()
         elif command == "demo":
-            mcp_dir.run_demo()
+            mcp_dir.run_demo(headless=headless,
+                             concurrency=concurrency or DEFAULT_DEMO_CONCURRENCY)
         elif command == "interactive":
             mcp_dir.interactive_mode()
+        elif command == "cache":
+            mcp_dir.show_cache_stats()
+        elif command == "health":
+            mcp_dir.show_health()
+        elif command == "stats":
+            telemetry.main(["stats"])
         elif command == "examples":
             show_examples()
         elif command == "microsoft_guide":
@@ -584,9 +1208,15 @@ def main():
         else:
             print("❌ 無効なコマンドです")
             show_help()
-    elif len(sys.argv) == 4:
-        server_set, use_case, topic = sys.argv[1], sys.argv[2], sys.argv[3]
-        mcp_dir.execute_use_case(server_set, use_case, topic)
+    elif len(args) == 2 and args[0] == "batch":
+        mcp_dir.run_batch(args[1], output_path,
+                          concurrency=concurrency or DEFAULT_BATCH_CONCURRENCY,
+                          resume=resume)
+    elif len(args) == 2 and args[0] == "sweep":
+        mcp_dir.run_sweep(args[1], output_path, poll_interval=poll_interval, resume=resume)
+    elif len(args) == 3:
+        server_set, use_case, topic = args
+        mcp_dir.execute_use_case(server_set, use_case, topic, stream=stream)
     else:
         print("❌ 引数の数が正しくありません")
         show_help()
@@ -745,6 +1375,12 @@ def show_help():
     print("📋 基本コマンド:")
     print("  python major_mcp_connect.py                          # 対話モード")
     print("  python major_mcp_connect.py demo                     # 実用デモ実行")
+    print("  python major_mcp_connect.py demo --headless          # デモを入力待ちなしで並行実行")
+    print("  python major_mcp_connect.py batch <マニフェスト>     # CSV/JSONLのジョブを一括実行")
+    print("  python major_mcp_connect.py sweep <マニフェスト>     # Message Batches APIで投入（半額・非同期）")
+    print("  python major_mcp_connect.py cache                    # レスポンスキャッシュ統計")
+    print("  python major_mcp_connect.py health                   # MCPサーバーの到達性・レイテンシ")
+    print("  python major_mcp_connect.py stats                    # API呼び出しのレイテンシ・トークン・コスト")
     print("  python major_mcp_connect.py list                     # 利用可能サーバー一覧")
     print("  python major_mcp_connect.py cases                    # ユースケース一覧")
     print("  python major_mcp_connect.py examples                 # 使用例表示")
@@ -756,6 +1392,18 @@ def show_help():
     print("  python major_mcp_connect.py <サーバー> <ユースケース> '<トピック>'")
     print()
     
+    print("⚙️  オプション:")
+    print(f"  --headless         demo を対話なしで並行実行（スモークテスト向け）")
+    print(f"  --concurrency N    同時実行数（demo: {DEFAULT_DEMO_CONCURRENCY} / batch: {DEFAULT_BATCH_CONCURRENCY}）")
+    print(f"  --output PATH      batch / sweep の結果NDJSON（デフォルト: <マニフェスト>.results.ndjson / .sweep.ndjson）")
+    print(f"  --resume           batch で成功済みジョブをスキップして再開 / sweep で投入済みバッチの回収を再開")
+    print(f"  --poll SEC         sweep のバッチ状態の確認間隔（デフォルト: {DEFAULT_POLL_INTERVAL}秒）")
+    print(f"  --stream           直接実行時に応答をストリーミング表示")
+    print(f"  --no-cache         レスポンスキャッシュを使わない")
+    print(f"  --refresh          キャッシュを無視して再取得し、結果で上書き（health ではTTLを無視）")
+    print(f"  --no-health-check  実行前のMCPサーバー到達性チェックを行わない")
+    print()
+    
     print("🚀 利用可能サーバーセット:")
     print("  basic      - 基本機能（DeepWikiのみ、確実に動作）")
     print("  search     - 検索・リサーチ特化")
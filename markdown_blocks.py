@@ -0,0 +1,209 @@
+import re
+from collections import namedtuple
+
+# ブロックAST（行の並びから1パスで生成する軽量なノード）
+Heading = namedtuple("Heading", "level text")
+Paragraph = namedtuple("Paragraph", "text")
+ListItem = namedtuple("ListItem", "ordered depth text checked")
+Table = namedtuple("Table", "rows")
+CodeBlock = namedtuple("CodeBlock", "language lines")
+Quote = namedtuple("Quote", "text")
+Rule = namedtuple("Rule", "")
+
+# インライン要素 (テキスト, 太字, 斜体, コード, リンクURL)
+Span = namedtuple("Span", "text bold italic code url")
+
+# tokenize 内部でのみ使う状態遷移用ノード
+_FenceStart = namedtuple("_FenceStart", "fence language")
+_TableStart = namedtuple("_TableStart", "cells")
+
+HEADING_PATTERN = re.compile(r'^(#{1,6})\s*(.*?)\s*#*\s*$')
+BULLET_PATTERN = re.compile(r'^([ \t]*)[-*+]\s+(?:\[([ xX])\]\s+)?(.*)$')
+ORDERED_PATTERN = re.compile(r'^([ \t]*)\d+[.)](?!\d)\s*(?:\[([ xX])\]\s+)?(.*)$')
+RULE_PATTERN = re.compile(r'^\s*([-*_])(?:\s*\1){2,}\s*$')
+FENCE_PATTERN = re.compile(r'^\s*(`{3,}|~{3,})\s*([\w+-]*)')
+TABLE_SEPARATOR_PATTERN = re.compile(r'^\s*\|?\s*:?-+:?\s*(?:\|\s*:?-+:?\s*)*\|?\s*$')
+QUOTE_PATTERN = re.compile(r'^\s*>\s?(.*)$')
+INLINE_MARKERS = re.compile(r'[*_`\[]')
+INLINE_PATTERN = re.compile(
+    r'(?P<bold>\*\*|__)(?P<bold_text>.+?)(?P=bold)'
+    r'|(?P<code_mark>`+)(?P<code_text>.+?)(?P=code_mark)'
+    r'|\[(?P<link_text>[^\]]+)\]\((?P<link_url>[^)\s]+)(?:\s+"[^"]*")?\)'
+    r'|\*(?![\s*])(?P<star_text>.+?)(?<!\s)\*'
+    r'|(?<!\w)_(?![\s_])(?P<underscore_text>.+?)(?<!\s)_(?!\w)'
+)
+
+
+def _indent_width(indent):
+    return len(indent.expandtabs(4))
+
+
+def _checked(mark):
+    if mark is None:
+        return None
+    return mark in "xX"
+
+
+def _split_row(line):
+    row = line.strip()
+    if row.startswith("|"):
+        row = row[1:]
+    if row.endswith("|"):
+        row = row[:-1]
+    return [cell.strip() for cell in row.split("|")]
+
+
+def tokenize(lines):
+    """Markdownの行イテラブルをブロックASTのストリームに変換
+
+    各行を1回だけ見て分類する。表とコードブロックだけはブロックの終わりまで
+    バッファし、それ以外は行を受け取った時点でブロックを返す。
+    """
+    fence = None
+    code_language = ""
+    code_lines = []
+    table_rows = []
+    list_indents = []  # 現在のリストのインデント幅のスタック
+
+    for raw_line in lines:
+        line = raw_line.rstrip("\r\n")
+
+        # コードブロック内は終端フェンスまでそのまま保持
+        if fence is not None:
+            if line.strip().startswith(fence):
+                yield CodeBlock(code_language, code_lines)
+                fence = None
+                code_lines = []
+            else:
+                code_lines.append(line)
+            continue
+
+        stripped = line.strip()
+
+        # 表は連続する | 行をまとめる
+        if table_rows:
+            if stripped.startswith("|") or ("|" in stripped and TABLE_SEPARATOR_PATTERN.match(stripped)):
+                if not TABLE_SEPARATOR_PATTERN.match(stripped):
+                    table_rows.append(_split_row(stripped))
+                continue
+            yield Table(table_rows)
+            table_rows = []
+
+        if not stripped:
+            continue
+
+        block = _classify(line, stripped)
+        if block.__class__ is _FenceStart:
+            list_indents = []
+            fence, code_language = block
+            continue
+        if block.__class__ is _TableStart:
+            list_indents = []
+            table_rows = [block.cells]
+            continue
+        if block.__class__ is ListItem:
+            # インデント幅（ListItem.depth に一時的に格納）をネストの深さに変換
+            width = block.depth
+            while list_indents and width < list_indents[-1]:
+                list_indents.pop()
+            if not list_indents or width > list_indents[-1]:
+                list_indents.append(width)
+            block = block._replace(depth=len(list_indents) - 1)
+        else:
+            list_indents = []
+        yield block
+
+    if fence is not None:
+        yield CodeBlock(code_language, code_lines)
+    if table_rows:
+        yield Table(table_rows)
+
+
+def _heading(line, stripped):
+    match = HEADING_PATTERN.match(stripped)
+    level = len(match.group(1))
+    return Heading(level, match.group(2))
+
+
+def _dash(line, stripped):
+    if RULE_PATTERN.match(stripped):
+        return Rule()
+    match = BULLET_PATTERN.match(line)
+    if match:
+        return ListItem(False, _indent_width(match.group(1)), match.group(3), _checked(match.group(2)))
+    return Paragraph(stripped)
+
+
+def _digit(line, stripped):
+    match = ORDERED_PATTERN.match(line)
+    if match:
+        return ListItem(True, _indent_width(match.group(1)), match.group(3), _checked(match.group(2)))
+    return Paragraph(stripped)
+
+
+def _fence(line, stripped):
+    match = FENCE_PATTERN.match(stripped)
+    if match:
+        return _FenceStart(match.group(1)[:3], match.group(2))
+    return Paragraph(stripped)
+
+
+def _table(line, stripped):
+    return _TableStart(_split_row(stripped))
+
+
+def _quote(line, stripped):
+    return Quote(QUOTE_PATTERN.match(stripped).group(1))
+
+
+def _underscore(line, stripped):
+    if RULE_PATTERN.match(stripped):
+        return Rule()
+    return Paragraph(stripped)
+
+
+# 行頭の1文字で分類関数を引く（該当なしは段落）
+LINE_DISPATCH = {
+    "#": _heading,
+    "-": _dash,
+    "*": _dash,
+    "+": _dash,
+    "_": _underscore,
+    "`": _fence,
+    "~": _fence,
+    "|": _table,
+    ">": _quote,
+}
+LINE_DISPATCH.update({digit: _digit for digit in "0123456789"})
+
+
+def _classify(line, stripped):
+    handler = LINE_DISPATCH.get(stripped[0])
+    if handler is None:
+        return Paragraph(stripped)
+    return handler(line, stripped)
+
+
+def parse_inline(text):
+    """インライン書式（**太字**, *斜体*, `コード`, [リンク](URL)）をSpanのリストに分解"""
+    if not INLINE_MARKERS.search(text):
+        return [Span(text, False, False, False, None)]
+
+    spans = []
+    position = 0
+    for match in INLINE_PATTERN.finditer(text):
+        if match.start() > position:
+            spans.append(Span(text[position:match.start()], False, False, False, None))
+        if match.group("bold"):
+            spans.append(Span(match.group("bold_text"), True, False, False, None))
+        elif match.group("code_mark"):
+            spans.append(Span(match.group("code_text"), False, False, True, None))
+        elif match.group("link_text"):
+            spans.append(Span(match.group("link_text"), False, False, False, match.group("link_url")))
+        else:
+            italic_text = match.group("star_text") or match.group("underscore_text")
+            spans.append(Span(italic_text, False, True, False, None))
+        position = match.end()
+    if position < len(text):
+        spans.append(Span(text[position:], False, False, False, None))
+    return spans
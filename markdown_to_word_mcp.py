@@ -1,18 +1,53 @@
 import os
-import anthropic
+import sys
+import glob
 import json
 from dotenv import load_dotenv
 from datetime import datetime
-import re
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from stage_graph import StageGraph, print_stage_report
+from minutes_analyzer import analyze_minutes, MinutesAnalysis, CONFIDENCE_THRESHOLD
+from docx_renderer import (
+    iter_markdown_lines, iter_text_lines, new_minutes_document, meeting_fields,
+    render_markdown_lines, render_markdown_file, merge_documents,
+)
+from word_template import load_template
+from api_scheduler import get_scheduler
+from llm_client import create_client
+from telemetry import print_usage
+from cli_args import pop_option
+from minutes_chunker import (
+    MinutesChunk, chunk_minutes, outline_text, merge_partial_analyses,
+    format_merged_analysis, estimate_tokens, DEFAULT_CHUNK_TOKENS,
+)
+from structured_output import (
+    ANALYSIS_TOOL, ANALYSIS_MAX_TOKENS, PLAN_TOOL, tool_params, tool_input, compact_json, plan_context, format_plan,
+)
+from plan_executor import PlanExecutor, default_plan
+from incremental import (
+    SectionRenderer, split_sections, analysis_units, unit_hash, document_hash,
+    manifest_path_for, load_manifest, save_manifest,
+)
+
+DEFAULT_CHUNK_WORKERS = 4
+DOCUMENT_REFERENCE = "system に示したMarkdown議事録"
 
 class MarkdownToWordMCP:
     """Markdownファイルの議事録をWord MCPでWord文書化するシステム"""
     
-    def __init__(self):
+    def __init__(self, template_path=None, client=None):
         load_dotenv()
-        self.client = anthropic.Anthropic(
-            api_key=os.getenv("ANTHROPIC_API_KEY")
-        )
+        self._client = client  # --no-mcp ではSDKを読み込まない（初回のAPI呼び出しで生成）
+        
+        # 企業テンプレート(.docx)はプロセス内で1度だけ解析して使い回す
+        template_path = template_path or os.getenv("WORD_TEMPLATE_PATH")
+        self.template = load_template(template_path) if template_path else None
+        
+        # 長い議事録は見出し単位のチャンクに分けてLLMを並行呼び出しする
+        self.chunk_tokens = int(os.getenv("MCP_CHUNK_TOKENS", DEFAULT_CHUNK_TOKENS))
+        self.chunk_workers = int(os.getenv("MCP_CHUNK_WORKERS", DEFAULT_CHUNK_WORKERS))
         
         # Word MCP サーバー設定（ローカル実行）
         self.word_mcp_servers = [
@@ -25,6 +60,13 @@ class MarkdownToWordMCP:
             }
         ]
     
+    @property
+    def client(self):
+        """クライアントを初回利用時に生成（MCP_CLIENT=fake ならフェイク）"""
+        if self._client is None:
+            self._client = create_client()
+        return self._client
+    
     def read_markdown_minutes(self, file_path):
         """Markdownファイルの議事録を読み込み"""
         try:
@@ -41,115 +83,174 @@ class MarkdownToWordMCP:
             print(f"❌ ファイル読み込みエラー: {e}")
             return None
     
+    def check_markdown_source(self, file_path):
+        """Markdownファイルの存在とサイズを確認（本文は読み込まない。VTTなら発言録Markdownに変換）"""
+        if not os.path.isfile(file_path):
+            print(f"❌ ファイルが見つかりません: {file_path}")
+            raise FileNotFoundError(file_path)
+        file_path = self.ingest_if_vtt(file_path)
+        size = os.path.getsize(file_path)
+        print(f"✅ Markdownファイル確認: {file_path} ({size:,}バイト)")
+        return file_path
+    
+    def ingest_if_vtt(self, file_path):
+        """VTT字幕は話者ごとの発言録Markdownに圧縮し、そのパスを返す（それ以外はそのまま）"""
+        if not file_path.lower().endswith(".vtt"):
+            return file_path
+        from vtt_ingest import ingest_vtt, print_ingest_report
+        
+        transcript_path, stats = ingest_vtt(file_path)
+        print_ingest_report(file_path, transcript_path, stats)
+        return transcript_path
+    
+    def analyze_markdown_locally(self, markdown_content):
+        """Markdown議事録をローカルで解析（LLM不要・ミリ秒オーダー）"""
+        return self._report_local_analysis(analyze_minutes(iter_text_lines(markdown_content)))
+    
+    def analyze_markdown_file_locally(self, markdown_file_path):
+        """Markdownファイルを1行ずつ読みながらローカル解析"""
+        return self._report_local_analysis(analyze_minutes(iter_markdown_lines(markdown_file_path)))
+    
+    def _report_local_analysis(self, info):
+        print(f"🧮 ローカル構造解析完了 (信頼度: {info.confidence:.2f}, "
+              f"セクション: {len(info.sections)}, 決定事項: {len(info.decisions)}, "
+              f"アクション: {len(info.action_items)})")
+        return info
+    
+    def analyze_with_fallback(self, markdown_content, local_info):
+        """ローカル解析の信頼度が低い場合のみLLMで構造分析"""
+        if local_info.confidence >= CONFIDENCE_THRESHOLD:
+            print("⏭️  ローカル解析の信頼度が十分なため、LLM構造分析を省略")
+            return local_info.to_structured()
+        return self.analyze_markdown_structure(markdown_content)
+    
+    def _chunks(self, markdown_content):
+        """議事録をトークン予算内のチャンクに分割（予算内なら1チャンク）"""
+        return chunk_minutes(iter_text_lines(markdown_content), self.chunk_tokens)
+    
+    def _map_chunks(self, chunks, func, label):
+        """チャンクごとに func を並行実行し、結果を文書順に返す（失敗したチャンクは None）"""
+        print(f"🧩 {label}: {len(chunks)}チャンクを並行処理 (最大{self.chunk_workers}並列)")
+        started = time.perf_counter()
+        
+        def run(chunk):
+            chunk_started = time.perf_counter()
+            try:
+                return func(chunk), time.perf_counter() - chunk_started, None
+            except Exception as e:
+                return None, time.perf_counter() - chunk_started, e
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(self.chunk_workers, len(chunks)))) as executor:
+            outcomes = list(executor.map(run, chunks))
+        
+        for chunk, (_, elapsed, error) in zip(chunks, outcomes):
+            status = f"❌ {error}" if error else "✅"
+            print(f"  チャンク{chunk.index + 1} ({chunk.tokens:,}トークン): {elapsed:.2f}秒 {status}")
+        print(f"⏱️  {label} 合計: {time.perf_counter() - started:.2f}秒 "
+              f"(最長チャンク: {max(elapsed for _, elapsed, _ in outcomes):.2f}秒)")
+        return [result for result, _, _ in outcomes]
+    
     def analyze_markdown_structure(self, markdown_content):
-        """Markdown議事録の構造を分析"""
-        prompt = f"""
-以下のMarkdown議事録を分析し、Word文書化のための構造情報を抽出してください：
-
-{markdown_content}
-
-以下の形式で分析結果を出力してください：
-
-## 📋 議事録情報
-- 会議タイトル: 
-- 開催日時: 
-- 参加者: 
-- 会議時間: 
-
-## 📝 主要セクション
-1. セクション名とその内容の要約
-2. セクション名とその内容の要約
-3. ...
-
-## 🎯 重要ポイント
-- 決定事項の数: 
-- アクションアイテムの数: 
-- 議論点の数: 
-
-## 📄 Word文書構成提案
-1. 表紙の内容
-2. 目次構成
-3. 本文のレイアウト提案
-4. 付録の必要性
-
-Wordテンプレートとして最適な文書構造を提案してください。
-"""
+        """Markdown議事録の構造を分析（長文はチャンクごとに並行分析して統合）
+        
+        分析結果は自由記述ではなく ANALYSIS_TOOL のスキーマに沿った辞書で受け取り、
+        プラン生成・ローカル描画がそのまま項目を参照する。
+        """
+        chunks = self._chunks(markdown_content)
+        if len(chunks) > 1:
+            return self._analyze_chunks(chunks)
+        
+        prompt = f"{DOCUMENT_REFERENCE}から、Word文書化に必要な構造情報を抽出してください。"
         
         try:
-            response = self.client.messages.create(
+            response = get_scheduler().call(
+                "analysis", self.client.messages.create,
                 model="claude-sonnet-4-20250514",
-                max_tokens=2000,
-                messages=[{"role": "user", "content": prompt}]
+                max_tokens=ANALYSIS_MAX_TOKENS,
+                system=self._document_system(markdown_content),
+                messages=[{"role": "user", "content": prompt}],
+                **tool_params(ANALYSIS_TOOL)
             )
             
-            analysis = response.content[0].text
+            analysis = merge_partial_analyses([tool_input(response, ANALYSIS_TOOL)])
             print("📊 Markdown構造分析完了")
+            print_usage(response)
             return analysis
             
         except Exception as e:
             print(f"❌ 分析エラー: {e}")
             return None
     
+    def _analyze_chunks(self, chunks):
+        """チャンクを並行分析し、部分結果を1つの構造に統合（map-reduce）"""
+        partials = self._map_chunks(chunks, lambda chunk: self._analyze_chunk(chunk, len(chunks)), "構造分析")
+        succeeded = [partial for partial in partials if partial is not None]
+        if not succeeded:
+            print("❌ 分析エラー: すべてのチャンクの分析に失敗しました")
+            return None
+        analysis = merge_partial_analyses(succeeded)
+        print(f"📊 Markdown構造分析完了 ({len(succeeded)}/{len(chunks)}チャンクを統合)")
+        return analysis
+    
+    def _analyze_chunk(self, chunk, total):
+        """1チャンク分の構造情報をスキーマ付きで抽出"""
+        prompt = f"""以下は長いMarkdown議事録の一部（{chunk.index + 1}/{total}）です。この部分に含まれる情報だけを抽出してください。
+
+{chunk.text}"""
+        response = get_scheduler().call(
+            "analysis_chunk", self.client.messages.create,
+            model="claude-sonnet-4-20250514",
+            max_tokens=ANALYSIS_MAX_TOKENS,
+            messages=[{"role": "user", "content": prompt}],
+            **tool_params(ANALYSIS_TOOL)
+        )
+        return tool_input(response, ANALYSIS_TOOL)
+    
+    def _document_system(self, markdown_content):
+        """議事録全文を cache_control 付きの system ブロックにする
+
+        分析・プラン・Word MCP実行で同じ先頭部分になるため、2回目以降の呼び出しと
+        同じ文書の再処理では議事録部分がプロンプトキャッシュから読まれる。
+        """
+        return [{
+            "type": "text",
+            "text": f"以下は処理対象のMarkdown議事録です。\n\n<minutes>\n{markdown_content}\n</minutes>",
+            "cache_control": {"type": "ephemeral"},
+        }]
+    
+    def _plan_source(self, markdown_content):
+        """プラン生成に渡す (system, 議事録欄の本文)（長文は全体の見出しアウトラインに置き換える）"""
+        chunks = self._chunks(markdown_content)
+        if len(chunks) <= 1:
+            return self._document_system(markdown_content), f"（{DOCUMENT_REFERENCE}を参照）"
+        outline = f"（長文のため見出しアウトラインのみ。全{len(chunks)}パートに分けて生成します）\n{outline_text(chunks)}"
+        return None, outline
+    
     def generate_word_document_plan(self, markdown_content, analysis):
-        """Word文書生成プランを作成"""
-        prompt = f"""
-以下のMarkdown議事録とその分析結果を基に、Word MCPサーバーで実行する具体的なWord文書生成プランを作成してください：
+        """Word文書生成プランを作成（PLAN_TOOL のスキーマに沿った辞書）"""
+        system, source = self._plan_source(markdown_content)
+        prompt = f"""Markdown議事録と構造分析結果（JSON）を基に、Word MCPサーバーで実行するWord文書生成プランを作成してください。
+表紙の後に会議概要（meeting_table）と議事内容（minutes）を置き、既定値はA4・余白 上下2.5/左3.0/右2.5cm・游明朝11ptです。
 
 ## 元のMarkdown議事録:
-{markdown_content[:1000]}...
+{source}
 
 ## 構造分析結果:
-{analysis}
-
-以下の形式で、Word MCPサーバーで実行可能なコマンド形式の手順を提案してください：
-
-## 🏗️ Word文書生成手順
-
-### Step 1: 文書作成・基本設定
-```
-create_document: "議事録_[会議名]_[日付].docx"
-set_page_margins: {"top": 2.5, "bottom": 2.5, "left": 3.0, "right": 2.5}
-set_font_default: {"name": "游明朝", "size": 11}
-```
-
-### Step 2: 表紙作成
-```
-add_title: "[会議タイトル]"
-add_subtitle: "議事録"
-add_meeting_info: "開催日時: [日時] | 場所: [場所]"
-add_page_break
-```
-
-### Step 3: 本文構造作成
-```
-add_heading1: "1. 会議概要"
-add_table: 会議基本情報テーブル
-add_heading1: "2. 議事内容"
-...
-```
-
-### Step 4: 内容挿入
-- 各セクションの具体的な内容挿入方法
-- 表・リストの作成方法
-- フォーマット指定
-
-### Step 5: 仕上げ
-- ヘッダー・フッター設定
-- ページ番号追加
-- 目次自動生成
-
-実際にWord MCPで実行可能な、段階的な手順を提案してください。
-"""
+{compact_json(plan_context(analysis))}"""
         
         try:
-            response = self.client.messages.create(
+            response = get_scheduler().call(
+                "plan", self.client.messages.create,
                 model="claude-sonnet-4-20250514",
                 max_tokens=3000,
-                messages=[{"role": "user", "content": prompt}]
+                messages=[{"role": "user", "content": prompt}],
+                **tool_params(PLAN_TOOL),
+                **({"system": system} if system else {})
             )
             
-            plan = response.content[0].text
+            plan = tool_input(response, PLAN_TOOL)
             print("📋 Word文書生成プラン作成完了")
+            print_usage(response)
             return plan
             
         except Exception as e:
@@ -157,15 +258,16 @@ add_heading1: "2. 議事内容"
             return None
     
     def execute_word_generation_with_mcp(self, markdown_content, generation_plan):
-        """Word MCPサーバーを使ってWord文書を生成"""
+        """Word MCPサーバーを使ってWord文書を生成（長文はパートごとに並行生成）"""
+        chunks = self._chunks(markdown_content)
+        if len(chunks) > 1:
+            return self._execute_word_generation_chunks(chunks, generation_plan)
+        
         prompt = f"""
-以下のMarkdown議事録とWord文書生成プランを基に、Word MCPサーバーのツールを使って実際にWord文書を生成してください：
-
-## Markdown議事録:
-{markdown_content}
+{DOCUMENT_REFERENCE}とWord文書生成プランを基に、Word MCPサーバーのツールを使って実際にWord文書を生成してください：
 
-## 生成プラン:
-{generation_plan}
+## 生成プラン（JSON）:
+{compact_json(generation_plan)}
 
 Word MCPサーバーの以下のようなツールを使用して、段階的にWord文書を作成してください：
 - create_document
@@ -179,27 +281,10 @@ Word MCPサーバーの以下のようなツールを使用して、段階的に
 """
         
         try:
-            # 注意: 実際のWord MCPサーバーが動作している場合のみ有効
-            response = self.client.beta.messages.create(
-                model="claude-sonnet-4-20250514",
-                max_tokens=3000,
-                messages=[{"role": "user", "content": prompt}],
-                mcp_servers=self.word_mcp_servers,  # Word MCPサーバー
-                betas=["mcp-client-2025-04-04"],
-            )
-            
-            result = ""
-            used_tools = []
-            
-            for content in response.content:
-                if content.type == "text":
-                    result += content.text
-                elif content.type == "mcp_tool_use":
-                    used_tools.append(content.name)
-                    print(f"🔧 [Word MCP] {content.name}")
-            
+            result, used_tools, response = self._run_word_mcp(prompt, self._document_system(markdown_content))
             print(f"✅ Word文書生成完了")
             print(f"🛠️  使用ツール: {', '.join(used_tools)}")
+            print_usage(response)
             return result, used_tools
             
         except Exception as e:
@@ -207,78 +292,157 @@ Word MCPサーバーの以下のようなツールを使用して、段階的に
             print("💡 Word MCPサーバーが起動していることを確認してください")
             return None, []
     
+    def _execute_word_generation_chunks(self, chunks, generation_plan):
+        """チャンクごとに別ファイルのパートを並行生成し、1つの文書に連結する
+        
+        パートのファイル名は実行ごとに一意にする（同時実行・再実行で上書きし合わない）。
+        1つでもパートが失敗した場合は欠けた文書を返さず、代替手段（ローカル描画）に任せる。
+        """
+        total = len(chunks)
+        run_name = f"議事録_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+        part_paths = [f"{run_name}_part{index + 1:02d}.docx" for index in range(total)]
+        
+        def generate_part(chunk):
+            prompt = f"""
+以下は長いMarkdown議事録のパート{chunk.index + 1}/{total}です。Word文書生成プランに従い、
+Word MCPサーバーのツールでこのパートだけを含むWord文書を生成し、
+"{part_paths[chunk.index]}" として保存してください。
+{"表紙と会議情報はこのパートに含めてください。" if chunk.index == 0 else "表紙は不要です。本文の続きとして見出しから始めてください。"}
+
+## Markdown議事録（パート{chunk.index + 1}/{total}）:
+{chunk.text}
+
+## 生成プラン（JSON）:
+{compact_json(generation_plan)}
+
+完成したファイルのパスを教えてください。
+"""
+            text, used_tools, _ = self._run_word_mcp(prompt)
+            return text, used_tools
+        
+        outcomes = self._map_chunks(chunks, generate_part, "Word MCP生成")
+        failed = sum(1 for outcome in outcomes if outcome is None)
+        if failed:
+            print(f"❌ Word MCP実行エラー: {failed}/{total}パートの生成に失敗しました")
+            print("💡 Word MCPサーバーが起動していることを確認してください")
+            return None, []
+        
+        result = "\n\n".join(text for text, _ in outcomes)
+        used_tools = [tool for _, tools in outcomes for tool in tools]
+        # stdio のサーバーはこのプロセスと同じ作業ディレクトリに保存するため、ローカルで連結できる
+        if all(os.path.isfile(path) for path in part_paths):
+            try:
+                result = merge_documents(part_paths, f"{run_name}.docx")
+                for path in part_paths:
+                    os.remove(path)
+            except Exception as e:
+                print(f"❌ パートの連結エラー: {e}")
+                return None, []
+            print(f"✅ Word文書生成完了 ({total}パートを連結: {result})")
+        else:
+            print(f"✅ Word文書生成完了 ({total}パート: {run_name}_partNN.docx)")
+        print(f"🛠️  使用ツール: {', '.join(used_tools)}")
+        return result, used_tools
+    
+    def _run_word_mcp(self, prompt, system=None):
+        """Word MCPサーバーのツールで生成し、(テキスト, 使用ツール, 最後のレスポンス) を返す
+        
+        stdio のサーバーはAPI側のMCPコネクタからは起動できないため、ローカルで1度だけ起動した
+        常駐セッション（stdio_mcp_bridge）に対してツール使用ループを回す。
+        """
+        server = self.word_mcp_servers[0]
+        if server["type"] == "stdio":
+            from stdio_mcp_bridge import get_session, run_tool_loop
+            text, used_tools, responses = run_tool_loop(
+                "word_mcp", self.client, get_session(server),
+                [{"role": "user", "content": prompt}],
+                model="claude-sonnet-4-20250514",
+                max_tokens=3000,
+                **({"system": system} if system else {})
+            )
+            return text, used_tools, responses[-1]
+        
+        # URLで公開されたMCPサーバーはAPI側のMCPコネクタから呼び出す
+        response = get_scheduler().call(
+            "word_mcp", self.client.beta.messages.create,
+            model="claude-sonnet-4-20250514",
+            max_tokens=3000,
+            messages=[{"role": "user", "content": prompt}],
+            mcp_servers=self.word_mcp_servers,  # Word MCPサーバー
+            betas=["mcp-client-2025-04-04"],
+            **({"system": system} if system else {})
+        )
+        
+        result = ""
+        used_tools = []
+        
+        for content in response.content:
+            if content.type == "text":
+                result += content.text
+            elif content.type == "mcp_tool_use":
+                used_tools.append(content.name)
+        return result, used_tools, response
+    
+    def execute_plan_locally(self, markdown_file_path, info, analysis, plan):
+        """生成プランをpython-docxで直接実行し、(文書, 保存用ファイル名) を返す（API呼び出しなし）
+        
+        プランが無い・実行できない場合は既定のプランで組み立てる。
+        """
+        if plan is None:
+            print("💡 生成プランが無いため、既定のプランで組み立てます")
+            plan = default_plan(info)
+        started = time.perf_counter()
+        
+        def render(current_plan):
+            return PlanExecutor(lambda: iter_markdown_lines(markdown_file_path), info, analysis,
+                                self.template).execute(current_plan)
+        
+        try:
+            try:
+                doc, file_name = render(plan)
+            except ValueError as e:
+                print(f"⚠️  {e}")
+                print("💡 既定のプランで組み立てます")
+                doc, file_name = render(default_plan(info))
+        except ImportError:
+            print("❌ python-docxがインストールされていません")
+            print("💡 インストール: pip install python-docx")
+            return None
+        except Exception as e:
+            print(f"❌ Word文書生成エラー: {e}")
+            return None
+        print(f"🧱 生成プランをローカルで実行: {time.perf_counter() - started:.2f}秒")
+        return doc, file_name
+    
     def generate_word_manually(self, markdown_content, analysis, plan):
         """Word MCPが利用できない場合の代替手段"""
+        doc = self.build_word_document(markdown_content, analysis, plan)
+        if doc is None:
+            return None
+        return self.save_word_document(doc)
+    
+    def build_word_document(self, markdown_content, analysis, plan):
+        """python-docxでWord文書をメモリ上に組み立てる（保存はしない）
+
+        analysis に MinutesAnalysis を渡すと会議情報テーブルを抽出結果で埋める。
+        render_markdown_lines は行を受け取りながら描画するため、本文を行リストに複製しない。
+        """
         print("🔄 Word MCP代替モード - python-docxで直接生成")
-        
+        info = analysis if isinstance(analysis, MinutesAnalysis) else None
+        return self._render_document(
+            lambda: render_markdown_lines(new_minutes_document(info, self.template),
+                                          iter_text_lines(markdown_content))
+        )
+    
+    def build_word_document_from_file(self, markdown_file_path, info=None):
+        """Markdownファイルを1行ずつ読みながらWord文書を組み立てる（全文を保持しない）"""
+        print("🔄 Word MCP代替モード - python-docxで直接生成（ストリーミング）")
+        return self._render_document(lambda: render_markdown_file(markdown_file_path, info, self.template))
+    
+    def _render_document(self, render):
+        """描画処理を実行し、失敗時はメッセージを表示してNoneを返す"""
         try:
-            from docx import Document
-            from docx.shared import Inches, Pt
-            from docx.enum.text import WD_ALIGN_PARAGRAPH
-            
-            # 新しいWord文書作成
-            doc = Document()
-            
-            # タイトル追加
-            title = doc.add_heading('会議議事録', 0)
-            title.alignment = WD_ALIGN_PARAGRAPH.CENTER
-            
-            # 会議情報テーブル
-            table = doc.add_table(rows=4, cols=2)
-            table.style = 'Table Grid'
-            
-            table.cell(0, 0).text = '会議名'
-            table.cell(0, 1).text = '定例会議'  # Markdownから抽出
-            table.cell(1, 0).text = '開催日時'
-            table.cell(1, 1).text = datetime.now().strftime('%Y年%m月%d日')
-            table.cell(2, 0).text = '参加者'
-            table.cell(2, 1).text = '(Markdownから抽出)'
-            table.cell(3, 0).text = '記録者'
-            table.cell(3, 1).text = 'AI議事録システム'
-            
-            # Markdownコンテンツをセクションごとに処理
-            doc.add_page_break()
-            
-            # Markdownをパース
-            lines = markdown_content.split('\n')
-            current_heading_level = 1
-            
-            for line in lines:
-                line = line.strip()
-                if not line:
-                    continue
-                
-                # 見出し処理
-                if line.startswith('#'):
-                    level = len(line) - len(line.lstrip('#'))
-                    heading_text = line.lstrip('#').strip()
-                    doc.add_heading(heading_text, level)
-                    current_heading_level = level
-                
-                # リスト処理
-                elif line.startswith('- ') or line.startswith('* '):
-                    item_text = line[2:].strip()
-                    paragraph = doc.add_paragraph(item_text)
-                    paragraph.style = 'List Bullet'
-                
-                # 番号付きリスト
-                elif re.match(r'^\d+\.', line):
-                    item_text = re.sub(r'^\d+\.\s*', '', line)
-                    paragraph = doc.add_paragraph(item_text)
-                    paragraph.style = 'List Number'
-                
-                # 通常のパラグラフ
-                else:
-                    doc.add_paragraph(line)
-            
-            # ファイル保存
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f'議事録_{timestamp}.docx'
-            doc.save(filename)
-            
-            print(f"✅ Word文書を生成しました: {filename}")
-            return filename
-            
+            return render()
         except ImportError:
             print("❌ python-docxがインストールされていません")
             print("💡 インストール: pip install python-docx")
@@ -287,80 +451,355 @@ Word MCPサーバーの以下のようなツールを使用して、段階的に
             print(f"❌ Word文書生成エラー: {e}")
             return None
     
-    def process_markdown_to_word(self, markdown_file_path, use_mcp=True):
-        """Markdown議事録をWord文書に変換する完全プロセス"""
+    def save_word_document(self, doc, filename=None):
+        """組み立て済みのWord文書を保存（ファイル名の指定が無ければ日時から決める）"""
+        try:
+            filename = filename or f"議事録_{datetime.now().strftime('%Y%m%d_%H%M%S')}.docx"
+            doc.save(filename)
+            
+            print(f"✅ Word文書を生成しました: {filename}")
+            return filename
+        except Exception as e:
+            print(f"❌ Word文書保存エラー: {e}")
+            return None
+    
+    def build_pipeline(self, markdown_file_path, use_mcp=True):
+        """変換処理のステージグラフを構築
+
+        source ─┬─ local_info ─────────┬─ local_word
+                └─ markdown ── analysis ┴─ plan ─┬─ plan_word
+                                                 └─ mcp_word
+        （analysis は local_info に、plan_word は source・local_info・analysis にも依存）
+
+        plan_word は生成プランをpython-docxで直接実行し、mcp_word（--word-mcp）は
+        プランをWord MCPサーバー付きのLLM呼び出しで実行する。
+        ローカル解析と描画はファイルを1行ずつ読むため、全文の読み込み（markdown）は
+        LLMステージが必要な場合にのみ行われる。use_mcp=True ではローカル描画も
+        構造分析の結果（会議情報など）を使う。プランとWord MCP実行より先に終わるため、
+        代替手段の準備が遅れることはない。
+        """
+        graph = StageGraph()
+        graph.add("source", lambda: self.check_markdown_source(markdown_file_path))
+        graph.add("local_info", lambda source: self.analyze_markdown_file_locally(source),
+                  deps=("source",))
+        graph.add("markdown", lambda source: self._require(
+            self.read_markdown_minutes(source), "Markdown読み込み失敗"), deps=("source",))
+        graph.add("analysis", lambda markdown, local_info: self.analyze_with_fallback(markdown, local_info),
+                  deps=("markdown", "local_info"))
+        # LLMでの構造分析に失敗した場合（analysis が None）はローカル解析の結果でプランを作る
+        graph.add("plan", lambda markdown, local_info, analysis: self.generate_word_document_plan(
+            markdown, analysis or local_info.to_structured()), deps=("markdown", "local_info", "analysis"))
+        graph.add("plan_word", lambda source, local_info, analysis, plan: self.execute_plan_locally(
+            source, local_info.filled_from(analysis), analysis or local_info.to_structured(), plan),
+                  deps=("source", "local_info", "analysis", "plan"))
+        graph.add("mcp_word", lambda markdown, plan: self.execute_word_generation_with_mcp(markdown, plan),
+                  deps=("markdown", "plan"))
+        # 代替手段のローカル描画はLLM呼び出しと並行して進める
+        if use_mcp:
+            graph.add("local_word", lambda source, local_info, analysis: self.build_word_document_from_file(
+                source, local_info.filled_from(analysis)), deps=("source", "local_info", "analysis"))
+        else:
+            graph.add("local_word", lambda source, local_info: self.build_word_document_from_file(source, local_info),
+                      deps=("source", "local_info"))
+        return graph
+    
+    @staticmethod
+    def _require(value, message):
+        """ステージ結果が無い場合は失敗として扱う"""
+        if not value:
+            raise RuntimeError(message)
+        return value
+    
+    def process_markdown_to_word(self, markdown_file_path, use_mcp=True, word_mcp=False, output_path=None):
+        """Markdown議事録をWord文書に変換する完全プロセス
+        
+        use_mcp=True ではLLMで分析・生成プランを作り、プランをローカルで実行する。
+        word_mcp=True のときだけプランの実行もWord MCPサーバー付きのLLM呼び出しで行う。
+        output_path を指定すると、プランのファイル名・日時による名前の代わりにそのパスへ保存する。
+        """
         print("🚀 Markdown → Word変換プロセス開始")
         print("="*60)
         
-        # Step 1: Markdownファイル読み込み
-        markdown_content = self.read_markdown_minutes(markdown_file_path)
-        if not markdown_content:
-            return None
+        # --no-mcp では分析・プランの出力を使わないため、LLM呼び出し自体を省略
+        if use_mcp and word_mcp:
+            targets = ["mcp_word", "local_word"]
+        elif use_mcp:
+            targets = ["plan_word"]
+        else:
+            targets = ["local_word"]
+        print(f"📄 Word文書生成中... (LLM: {use_mcp}, Word MCP: {use_mcp and word_mcp})")
+        
+        started = time.perf_counter()
+        results, report = self.build_pipeline(markdown_file_path, use_mcp).run(targets)
         
-        # Step 2: 構造分析
-        print("\n📊 Step 2: Markdown構造分析中...")
-        analysis = self.analyze_markdown_structure(markdown_content)
-        if analysis:
+        if results.get("analysis"):
             print("="*40)
-            print(analysis)
+            print(format_merged_analysis(merge_partial_analyses([results["analysis"]])))
+            print("="*40)
+        if results.get("plan"):
+            print("="*40)
+            print(format_plan(results["plan"]))
             print("="*40)
         
-        # Step 3: Word文書生成プラン作成
-        print("\n📋 Step 3: Word文書生成プラン作成中...")
-        plan = self.generate_word_document_plan(markdown_content, analysis)
-        if plan:
+        output = None
+        if use_mcp and not word_mcp and not results.get("plan_word") and results.get("local_info"):
+            # プランの実行に失敗した場合も、ローカル描画で文書を作る
+            print("⚠️  生成プランの実行に失敗、代替手段を使用")
+            results["local_word"] = self.build_word_document_from_file(
+                results["source"], results["local_info"].filled_from(results.get("analysis")))
+        mcp_result, _ = results.get("mcp_word") or (None, [])
+        if results.get("plan_word"):
+            doc, file_name = results["plan_word"]
+            output = self.save_word_document(doc, output_path or file_name)
+        elif mcp_result:
             print("="*40)
-            print(plan)
+            print(mcp_result)
             print("="*40)
+            output = mcp_result
+            if output_path and os.path.isfile(mcp_result):
+                os.replace(mcp_result, output_path)
+                output = output_path
+        else:
+            if use_mcp and word_mcp:
+                print("⚠️  Word MCP実行失敗、代替手段を使用")
+            doc = results.get("local_word")
+            if doc is not None:
+                output = self.save_word_document(doc, output_path)
         
-        # Step 4: Word文書生成
-        print(f"\n📄 Step 4: Word文書生成中... (MCP: {use_mcp})")
+        print_stage_report(report, time.perf_counter() - started)
+        return output
+
+    def process_markdown_to_word_incremental(self, markdown_file_path, use_mcp=True, output_path=None):
+        """変更されたセクションだけLLM分析と描画をやり直す差分変換
         
-        if use_mcp:
-            try:
-                result, tools = self.execute_word_generation_with_mcp(
-                    markdown_content, plan
-                )
-                if result:
-                    print("="*40)
-                    print(result)
-                    print("="*40)
-                    return result
+        見出し単位のセクションごとに内容ハッシュを取り、描画済みの本文XMLと
+        （数セクションずつまとめた単位の）分析結果を <出力>.sections.json に保存する。
+        Word MCPでの生成は文書全体を作り直すため使わず、本文はpython-docxで組み立てる。
+        LLM分析はローカル解析の信頼度が低い場合だけ行い（use_mcp=False では行わない）、
+        その結果でローカル解析の空の項目（会議名・参加者など）を補う。
+        """
+        print("🚀 Markdown → Word変換プロセス開始（差分モード）")
+        print("="*60)
+        started = time.perf_counter()
+        if not os.path.exists(markdown_file_path):
+            print(f"❌ ファイルが見つかりません: {markdown_file_path}")
+            return None
+        
+        output_path = output_path or batch_output_paths([markdown_file_path])[markdown_file_path]
+        markdown_file_path = self.ingest_if_vtt(markdown_file_path)
+        manifest_path = manifest_path_for(output_path)
+        manifest = load_manifest(manifest_path, self.template)
+        
+        sections = split_sections(iter_markdown_lines(markdown_file_path))
+        info = self._report_local_analysis(
+            analyze_minutes(line for section in sections for line in section.lines))
+        rendered = {section.hash: manifest["sections"][section.hash] for section in sections
+                    if section.hash in manifest["sections"]}
+        changed = {section.hash for section in sections} - set(rendered)
+        use_llm = use_mcp and info.confidence < CONFIDENCE_THRESHOLD
+        if use_mcp and not use_llm:
+            print("⏭️  ローカル解析の信頼度が十分なため、LLM構造分析を省略")
+        units = analysis_units(sections, self.chunk_tokens) if use_llm else []
+        # 空の分析結果（以前の版で保存された途中終了の応答など）は再利用せず分析し直す
+        analyses = {unit_hash(unit): manifest["analyses"][unit_hash(unit)] for unit in units
+                    if manifest["analyses"].get(unit_hash(unit))}
+        to_analyze = [unit for unit in units if unit_hash(unit) not in analyses]
+        print(f"🧩 セクション: {len(sections)} (描画: 変更 {len(changed)} / 再利用 {len(rendered)}"
+              f"{f', LLM分析: {len(to_analyze)}/{len(units)}単位' if use_llm else ''})")
+        
+        if to_analyze:
+            chunks = []
+            for index, unit in enumerate(to_analyze):
+                text = "\n".join(line for section in unit for line in section.lines)
+                chunks.append(MinutesChunk(index, [section.heading for section in unit if section.heading],
+                                           text, estimate_tokens(text)))
+            partials = self._map_chunks(chunks, lambda chunk: self._analyze_chunk(chunk, len(chunks)),
+                                        "セクション分析")
+            for unit, partial in zip(to_analyze, partials):
+                if partial:  # 失敗した単位・空の結果は保存せず次回に再分析
+                    analyses[unit_hash(unit)] = partial
+        if use_llm:
+            merged = merge_partial_analyses(
+                [analyses[unit_hash(unit)] for unit in units if unit_hash(unit) in analyses])
+            print("="*40)
+            print(format_merged_analysis(merged))
+            print("="*40)
+            info = info.filled_from(merged)
+        
+        doc_hash = document_hash(sections, json.dumps(meeting_fields(info), ensure_ascii=False))
+        if manifest["document"] == doc_hash and not to_analyze and os.path.exists(output_path):
+            print(f"✅ 変更なし: {output_path}")
+            print(f"⏱️  所要時間: {time.perf_counter() - started:.2f}秒")
+            return output_path
+        
+        render_started = time.perf_counter()
+        try:
+            doc = new_minutes_document(info, self.template)
+            renderer = SectionRenderer(doc)
+            for section in sections:
+                if section.hash in rendered:
+                    renderer.restore(rendered[section.hash])
                 else:
-                    print("⚠️  Word MCP実行失敗、代替手段を使用")
-                    use_mcp = False
-            except Exception as e:
-                print(f"⚠️  Word MCP実行エラー: {e}")
-                print("💡 代替手段を使用します")
-                use_mcp = False
+                    rendered[section.hash] = renderer.render(section)
+            doc.save(output_path)
+        except ImportError:
+            print("❌ python-docxがインストールされていません")
+            print("💡 インストール: pip install python-docx")
+            return None
+        except Exception as e:
+            print(f"❌ Word文書生成エラー: {e}")
+            return None
+        print(f"📝 Word文書組み立て: {time.perf_counter() - render_started:.2f}秒")
         
-        if not use_mcp:
-            filename = self.generate_word_manually(markdown_content, analysis, plan)
-            return filename
+        # LLM分析をしなかった実行（--no-mcp・信頼度が十分）では分析結果に触れず、次回のために残しておく
+        save_manifest(manifest_path, {**manifest, "document": doc_hash, "sections": rendered,
+                                      "analyses": analyses if use_llm else manifest["analyses"]})
+        print(f"✅ Word文書を生成しました: {output_path}")
+        print(f"⏱️  所要時間: {time.perf_counter() - started:.2f}秒")
+        return output_path
+
+def collect_markdown_files(target):
+    """ディレクトリまたはglobパターンから変換対象のMarkdownファイルを列挙"""
+    if os.path.isdir(target):
+        pattern = os.path.join(target, "*.md")
+    else:
+        pattern = target
+    return sorted(path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
+
+def is_batch_target(target):
+    """単一ファイルではなく一括変換の指定かどうか"""
+    return os.path.isdir(target) or glob.has_magic(target)
+
+def batch_output_paths(files, output_dir=None):
+    """入力ファイルごとに決定的な出力ファイル名を割り当てる
+
+    議事録_<元ファイル名>.docx とし、同名が重なる場合は _2, _3 ... を付ける。
+    """
+    assigned = {}
+    used = set()
+    for path in files:
+        directory = output_dir or os.path.dirname(path) or "."
+        stem = os.path.splitext(os.path.basename(path))[0]
+        candidate = os.path.join(directory, f"議事録_{stem}.docx")
+        suffix = 2
+        while os.path.normcase(os.path.abspath(candidate)) in used:
+            candidate = os.path.join(directory, f"議事録_{stem}_{suffix}.docx")
+            suffix += 1
+        used.add(os.path.normcase(os.path.abspath(candidate)))
+        assigned[path] = candidate
+    return assigned
+
+_worker_template = None
+
+def _init_conversion_worker(template_path):
+    """ワーカープロセス起動時にテンプレートを1度だけ解析"""
+    global _worker_template
+    _worker_template = load_template(template_path) if template_path else None
+
+def convert_markdown_file(markdown_file_path, output_path, template=None):
+    """1ファイルをLLMを使わずにWord化（プロセスプールのワーカーから呼ばれる）"""
+    started = time.perf_counter()
+    try:
+        info = analyze_minutes(iter_markdown_lines(markdown_file_path))
+        doc = render_markdown_file(markdown_file_path, info, template or _worker_template)
+        doc.save(output_path)
+        return {"source": markdown_file_path, "output": output_path, "status": "ok",
+                "error": None, "seconds": time.perf_counter() - started}
+    except Exception as e:
+        return {"source": markdown_file_path, "output": output_path, "status": "error",
+                "error": f"{type(e).__name__}: {e}", "seconds": time.perf_counter() - started}
+
+def convert_directory(target, output_dir=None, workers=None, template_path=None):
+    """ディレクトリ/globの議事録をプロセスプールで一括Word化"""
+    files = collect_markdown_files(target)
+    if not files:
+        print(f"❌ 対象のMarkdownファイルがありません: {target}")
+        return []
+    
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    outputs = batch_output_paths(files, output_dir)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(files)))
+    
+    print(f"📦 一括変換: {len(files)}ファイル / ワーカー数: {workers}")
+    print("="*60)
+    
+    started = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_conversion_worker,
+                             initargs=(template_path,)) as pool:
+        futures = [pool.submit(convert_markdown_file, path, outputs[path]) for path in files]
+        for future in as_completed(futures):
+            record = future.result()
+            results.append(record)
+            mark = "✅" if record["status"] == "ok" else "❌"
+            print(f"{mark} [{len(results)}/{len(files)}] {record['source']} ({record['seconds']:.2f}秒)")
+    elapsed = time.perf_counter() - started
+    
+    results.sort(key=lambda record: files.index(record["source"]))
+    succeeded = [record for record in results if record["status"] == "ok"]
+    failed = [record for record in results if record["status"] != "ok"]
+    
+    print("\n" + "="*60)
+    print("📊 一括変換サマリー")
+    print("="*60)
+    for record in results:
+        if record["status"] == "ok":
+            print(f"  ✅ {record['source']} → {record['output']}")
+        else:
+            print(f"  ❌ {record['source']}: {record['error']}")
+    print(f"\n✅ 成功: {len(succeeded)}件 / ❌ 失敗: {len(failed)}件")
+    print(f"⏱️  所要時間: {elapsed:.2f}秒 ({len(files) / elapsed:.2f}ファイル/秒)")
+    return results
 
 def main():
-    converter = MarkdownToWordMCP()
+    args = sys.argv[1:]
+    output_dir = pop_option(args, "--output-dir")
+    workers = pop_option(args, "--workers", None, int)
+    template_path = pop_option(args, "--template", os.getenv("WORD_TEMPLATE_PATH"))
     
-    if len(sys.argv) < 2:
+    if len(args) < 1:
         print("📖 使用方法:")
-        print("  python markdown_to_word_mcp.py <markdownファイルパス> [--no-mcp]")
+        print("  python markdown_to_word_mcp.py <markdown|VTTファイルパス> [--no-mcp | --word-mcp] [--incremental]")
+        print("  python markdown_to_word_mcp.py <ディレクトリ|'glob'> --no-mcp [--output-dir DIR] [--workers N]")
         print()
         print("📝 例:")
         print("  python markdown_to_word_mcp.py meeting_minutes.md")
         print("  python markdown_to_word_mcp.py meeting_minutes.md --no-mcp")
+        print("  python markdown_to_word_mcp.py meeting.vtt          # Teams字幕を発言録に圧縮してから変換")
+        print("  python markdown_to_word_mcp.py minutes/2025-06 --no-mcp --output-dir word/")
+        print("  python markdown_to_word_mcp.py 'minutes/**/*.md' --no-mcp")
         print()
         print("💡 オプション:")
-        print("  --no-mcp : Word MCPを使わず、python-docxで直接生成")
+        print("  --no-mcp         : LLMを使わず、python-docxで直接生成")
+        print("  --word-mcp       : 生成プランの実行もWord MCPサーバー経由で行う（デフォルトはローカル実行）")
+        print("  --incremental    : 変更されたセクションだけ分析・描画をやり直す（議事録_<名前>.docx に上書き）")
+        print("  --output-dir DIR : 一括変換時の出力先（デフォルト: 元ファイルと同じ場所）")
+        print("  --workers N      : 一括変換のプロセス数（デフォルト: CPU数）")
+        print("  --template FILE  : 企業テンプレート(.docx)を使用（環境変数 WORD_TEMPLATE_PATH でも指定可）")
         return
     
-    markdown_file = sys.argv[1]
-    use_mcp = "--no-mcp" not in sys.argv
+    markdown_file = args[0]
+    use_mcp = "--no-mcp" not in args
+    word_mcp = "--word-mcp" in args
+    incremental = "--incremental" in args
+    
+    if is_batch_target(markdown_file):
+        if use_mcp:
+            print("💡 一括変換はWord MCPを使わず、python-docxで直接生成します (--no-mcp)")
+        convert_directory(markdown_file, output_dir, workers, template_path)
+        return
+    
+    converter = MarkdownToWordMCP(template_path)
     
     print(f"🎯 対象ファイル: {markdown_file}")
-    print(f"⚙️  Word MCP使用: {use_mcp}")
+    print(f"⚙️  LLM使用: {use_mcp} / Word MCP使用: {use_mcp and word_mcp}")
     print()
     
-    result = converter.process_markdown_to_word(markdown_file, use_mcp)
+    if incremental:
+        result = converter.process_markdown_to_word_incremental(markdown_file, use_mcp)
+    else:
+        result = converter.process_markdown_to_word(markdown_file, use_mcp, word_mcp)
     
     if result:
         print(f"\n🎉 変換完了!")
@@ -369,5 +808,4 @@ def main():
         print(f"\n❌ 変換失敗")
 
 if __name__ == "__main__":
-    import sys
     main()
\ No newline at end of file
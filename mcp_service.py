@@ -0,0 +1,262 @@
+import os
+import sys
+import json
+import time
+import uuid
+import inspect
+import threading
+import http.client
+from urllib.parse import urlsplit
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from cli_args import pop_option
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_SERVICE_URL = f"http://{DEFAULT_HOST}:{DEFAULT_PORT}"
+
+
+class MCPService:
+    """MCPServerDirectory と MarkdownToWordMCP を1プロセスで常駐させるサービス
+
+    Anthropicクライアント（とその接続プール）・レスポンスキャッシュ・Wordテンプレートは
+    起動時に1度だけ用意し、以降のリクエストで使い回す。
+    """
+
+    def __init__(self, template_path=None):
+        # 重いモジュールはサーバー起動時にのみ読み込む（クライアント側は標準ライブラリのみ）
+        from major_mcp_connect import MCPServerDirectory
+        from markdown_to_word_mcp import MarkdownToWordMCP
+
+        self.directory = MCPServerDirectory()
+        self.converter = MarkdownToWordMCP(template_path)
+        self.started_at = time.time()
+        self.request_count = 0
+        self._count_lock = threading.Lock()
+        self.methods = {
+            "ping": self.ping,
+            "execute_use_case": self.execute_use_case,
+            "convert_markdown": self.convert_markdown,
+            "stats": self.stats,
+        }
+
+    def ping(self):
+        return {"pong": True, "pid": os.getpid()}
+
+    def execute_use_case(self, server_set, use_case, topic):
+        result = self.directory.execute_use_case(server_set, use_case, topic)
+        if result is None:
+            raise RuntimeError(f"ユースケースの実行に失敗しました: {server_set} / {use_case}")
+        return result
+
+    def convert_markdown(self, path, use_mcp=True, word_mcp=False, output=None):
+        """変換して出力パスを返す（output 省略時は元ファイルと同じ場所にリクエストごとに一意の名前で保存）"""
+        output = output or unique_output_path(path)
+        result = self.converter.process_markdown_to_word(path, use_mcp, word_mcp, output)
+        if not result:
+            raise RuntimeError(f"変換に失敗しました: {path}")
+        if os.path.exists(result):
+            result = os.path.abspath(result)
+        return {"output": result}
+
+    def stats(self):
+        stats = {
+            "pid": os.getpid(),
+            "uptime": round(time.time() - self.started_at, 1),
+            "requests": self.request_count,
+        }
+        if self.directory.cache is not None:
+            stats["cache"] = self.directory.cache.stats()
+        return stats
+
+    def dispatch(self, request):
+        """JSON-RPC 2.0 のリクエスト1件を処理してレスポンスを返す"""
+        with self._count_lock:
+            self.request_count += 1
+        if not isinstance(request, dict) or not isinstance(request.get("method"), str):
+            return _rpc_error(request.get("id") if isinstance(request, dict) else None,
+                              -32600, "method（文字列）を持つJSONオブジェクトではありません")
+        request_id = request.get("id")
+        method = self.methods.get(request["method"])
+        if method is None:
+            return _rpc_error(request_id, -32601, f"未知のメソッド: {request['method']}")
+        params = request.get("params") or {}
+        args, kwargs = ((), params) if isinstance(params, dict) else (params, {})
+        # 引数の対応付けだけを事前に確かめ、メソッド内部の TypeError はパラメータ不正と区別する
+        try:
+            if not isinstance(params, (dict, list)):
+                raise TypeError("params はオブジェクトか配列で指定してください")
+            inspect.signature(method).bind(*args, **kwargs)
+        except TypeError as e:
+            return _rpc_error(request_id, -32602, f"パラメータが不正です: {e}")
+        started = time.perf_counter()
+        try:
+            result = method(*args, **kwargs)
+        except Exception as e:
+            return _rpc_error(request_id, -32000, f"{type(e).__name__}: {e}")
+        return {"jsonrpc": "2.0", "id": request_id, "result": result,
+                "server_time": round(time.perf_counter() - started, 4)}
+
+
+def unique_output_path(path):
+    """同時に届いた変換リクエストが同じファイルに書き込まないよう、一意な出力パスを作る"""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    name = f"議事録_{stem}_{time.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}.docx"
+    return os.path.join(os.path.dirname(os.path.abspath(path)), name)
+
+
+def _rpc_error(request_id, code, message):
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+
+class _RPCHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive でクライアントとの接続も使い回す
+    service = None
+
+    def do_POST(self):
+        if self.path != "/rpc":
+            self._send(404, _rpc_error(None, -32601, "POST /rpc のみ対応しています"))
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError as e:
+            self._send(400, _rpc_error(None, -32700, f"JSONの解析に失敗しました: {e}"))
+            return
+        self._send(200, self.service.dispatch(request))
+
+    def _send(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        print(f"📨 {self.address_string()} {format % args}")
+
+
+def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, template_path=None):
+    """常駐サーバーを起動（Ctrl+Cで停止）"""
+    print("🛰️  MCPサービス起動中...")
+    started = time.perf_counter()
+    _RPCHandler.service = MCPService(template_path)
+    server = ThreadingHTTPServer((host, port), _RPCHandler)
+    server.daemon_threads = True
+    print(f"✅ 起動完了 ({time.perf_counter() - started:.2f}秒): http://{host}:{port}/rpc")
+    print("💡 メソッド: " + ", ".join(_RPCHandler.service.methods))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 MCPサービスを停止しました")
+    finally:
+        server.server_close()
+
+
+class ServiceClient:
+    """常駐サービスへのJSON-RPCクライアント（標準ライブラリのみ・接続を使い回す）"""
+
+    def __init__(self, url=None, timeout=600):
+        parts = urlsplit(url or os.getenv("MCP_SERVICE_URL", DEFAULT_SERVICE_URL))
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.timeout = timeout
+        self._conn = None
+        self._next_id = 0
+
+    def call(self, method, **params):
+        """メソッドを呼び出し、(結果, サーバー処理時間) を返す"""
+        self._next_id += 1
+        body = json.dumps({"jsonrpc": "2.0", "id": self._next_id, "method": method,
+                           "params": params}, ensure_ascii=False).encode("utf-8")
+        for attempt in range(2):
+            if self._conn is None:
+                self._conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            try:
+                self._conn.request("POST", "/rpc", body, {"Content-Type": "application/json"})
+                response = json.loads(self._conn.getresponse().read())
+                break
+            except (ConnectionError, http.client.HTTPException):
+                # サーバー側で切断された keep-alive 接続は1度だけ張り直す
+                self._conn.close()
+                self._conn = None
+                if attempt:
+                    raise
+        if "error" in response:
+            raise RuntimeError(response["error"]["message"])
+        return response["result"], response.get("server_time")
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+def show_usage():
+    print("📖 mcp_service.py - 常駐サービスモード")
+    print("="*60)
+    print("🛰️  サーバー:")
+    print("  python mcp_service.py serve [--port 8765] [--template corporate.docx]")
+    print()
+    print("💻 クライアント:")
+    print("  python mcp_service.py ping")
+    print("  python mcp_service.py stats")
+    print("  python mcp_service.py run <サーバーセット> <ユースケース> '<トピック>'")
+    print("  python mcp_service.py convert <markdownファイル> [--no-mcp | --word-mcp]")
+    print()
+    print(f"💡 接続先は環境変数 MCP_SERVICE_URL で変更できます（デフォルト: {DEFAULT_SERVICE_URL}）")
+
+
+def main():
+    args = sys.argv[1:]
+    if not args or args[0] in ("help", "-h", "--help"):
+        show_usage()
+        return
+
+    command = args[0]
+    if command == "serve":
+        port = pop_option(args, "--port", DEFAULT_PORT, int)
+        host = pop_option(args, "--host", DEFAULT_HOST)
+        serve(host, port, pop_option(args, "--template", os.getenv("WORD_TEMPLATE_PATH")))
+        return
+
+    client = ServiceClient()
+    started = time.perf_counter()
+    try:
+        if command == "ping":
+            result, server_time = client.call("ping")
+            print(f"🏓 pong (pid {result['pid']})")
+        elif command == "stats":
+            result, server_time = client.call("stats")
+            print(json.dumps(result, ensure_ascii=False, indent=2))
+        elif command == "run" and len(args) == 4:
+            result, server_time = client.call(
+                "execute_use_case", server_set=args[1], use_case=args[2], topic=args[3])
+            print(result["text"])
+            tools = result["used_tools"]
+            print(f"\n✅ 使用MCPツール: {', '.join(tools) if tools else 'なし'}")
+        elif command == "convert" and len(args) >= 2:
+            result, server_time = client.call(
+                "convert_markdown", path=os.path.abspath(args[1]), use_mcp="--no-mcp" not in args,
+                word_mcp="--word-mcp" in args)
+            print(f"📄 生成されたファイル: {result['output']}")
+        else:
+            show_usage()
+            return
+    except ConnectionRefusedError:
+        print("❌ サービスに接続できません。先に `python mcp_service.py serve` を起動してください")
+        sys.exit(1)
+    except RuntimeError as e:
+        print(f"❌ エラー発生: {e}")
+        sys.exit(1)
+    finally:
+        client.close()
+
+    total = time.perf_counter() - started
+    print(f"⏱️  合計: {total:.3f}秒 (サーバー処理: {server_time:.3f}秒, "
+          f"クライアント側オーバーヘッド: {total - server_time:.3f}秒)")
+
+
+if __name__ == "__main__":
+    main()
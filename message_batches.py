@@ -0,0 +1,84 @@
+import os
+import re
+import json
+import time
+
+# 1バッチあたりのリクエスト数（API上限は100,000件・256MB）
+MAX_BATCH_REQUESTS = 10000
+DEFAULT_POLL_INTERVAL = 30
+BATCH_COST_FACTOR = 0.5  # バッチは入出力とも通常料金の半額
+CUSTOM_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+
+def custom_id_for(job_id, index):
+    """ジョブidをバッチの custom_id に変換（使えない文字を含む場合は連番）"""
+    job_id = str(job_id)
+    return job_id if CUSTOM_ID_PATTERN.match(job_id) else f"job-{index}"
+
+
+def pack_requests(entries, max_requests=MAX_BATCH_REQUESTS):
+    """(custom_id, params) の列をバッチ単位のリクエストリストに分割"""
+    batches = []
+    for custom_id, params in entries:
+        if not batches or len(batches[-1]) >= max_requests:
+            batches.append([])
+        batches[-1].append({"custom_id": custom_id, "params": params})
+    return batches
+
+
+def batch_params(params):
+    """messages.create 用パラメータからバッチ内リクエストの params を作る（betas は外側で指定）"""
+    return {key: value for key, value in params.items() if key != "betas"}
+
+
+def load_state(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_state(path, state):
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(temp_path, path)
+
+
+def wait_for_batches(retrieve, batch_ids, poll_interval=DEFAULT_POLL_INTERVAL):
+    """すべてのバッチの processing_status が ended になるまでポーリングし、終了時のバッチを返す
+
+    retrieve(batch_id) はバッチオブジェクトを返す関数（スケジューラ経由の再試行付きを想定）。
+    """
+    pending = list(batch_ids)
+    batches = {}
+    started = time.perf_counter()
+    while pending:
+        for batch_id in list(pending):
+            batch = retrieve(batch_id)
+            counts = batch.request_counts
+            done = counts.succeeded + counts.errored + counts.canceled + counts.expired
+            total = done + counts.processing
+            print(f"⏳ {batch_id}: {batch.processing_status} {done}/{total} "
+                  f"(成功 {counts.succeeded} / 失敗 {counts.errored + counts.canceled + counts.expired}) "
+                  f"[{time.perf_counter() - started:.0f}秒経過]")
+            if batch.processing_status == "ended":
+                batches[batch_id] = batch
+                pending.remove(batch_id)
+        if pending:
+            time.sleep(poll_interval)
+    return batches
+
+
+def result_record(entry):
+    """バッチ結果1件を (custom_id, status, message, error) に変換"""
+    result = entry.result
+    if result.type == "succeeded":
+        return entry.custom_id, "ok", result.message, None
+    if result.type == "errored":
+        error = getattr(result, "error", None)
+        detail = getattr(error, "error", None)
+        message = getattr(detail, "message", None) or getattr(detail, "type", None) or "errored"
+        return entry.custom_id, "error", None, f"{getattr(detail, 'type', 'error')}: {message}"
+    return entry.custom_id, "error", None, result.type  # canceled / expired
@@ -0,0 +1,253 @@
+import re
+from dataclasses import dataclass, field, asdict, replace
+
+# この値以上ならLLMによる構造分析を省略する
+CONFIDENCE_THRESHOLD = 0.6
+
+HEADING_PATTERN = re.compile(r'^(#{1,6})\s+(.*?)\s*#*$')
+KEY_VALUE_PATTERN = re.compile(
+    r'^(?:[-*+]\s+)?(?:\*\*|__)?(?P<key>[^:：*_|]{1,12}?)(?:\*\*|__)?\s*[:：]\s*(?:\*\*|__)?\s*(?P<value>.+?)\s*$'
+)
+FENCE_PATTERN = re.compile(r'^(`{3,}|~{3,})')
+TABLE_ROW_PATTERN = re.compile(r'^\|(.+)\|\s*$')
+TABLE_SEPARATOR_PATTERN = re.compile(r'^\|?[\s:|-]+\|?\s*$')
+LIST_ITEM_PATTERN = re.compile(r'^(?:[-*+]|\d+[.)])\s+(?:\[(?P<check>[ xX])\]\s*)?(?P<text>.+)$')
+DATE_PATTERN = re.compile(
+    r'\d{4}\s*[年/.-]\s*\d{1,2}\s*[月/.-]\s*\d{1,2}\s*日?(?:\s*[（(][^)）]*[)）])?(?:\s*\d{1,2}:\d{2}(?:\s*[-~〜～]\s*\d{1,2}:\d{2})?)?'
+)
+TIME_RANGE_PATTERN = re.compile(r'(\d{1,2}):(\d{2})\s*[-~〜～]\s*(\d{1,2}):(\d{2})')
+PARTICIPANT_SPLIT_PATTERN = re.compile(r'\s*[、,，/／・]\s*|\s{2,}')
+
+FIELD_KEYS = {
+    "date": ("日時", "開催日時", "日付", "開催日", "日程", "date"),
+    "location": ("場所", "会場", "開催場所", "location"),
+    "participants": ("参加者", "出席者", "参加メンバー", "メンバー", "attendees", "participants"),
+    "duration": ("会議時間", "時間", "所要時間", "duration"),
+    "recorder": ("記録者", "書記", "作成者"),
+}
+
+SECTION_KINDS = (
+    ("participants", ("参加者", "出席者", "参加メンバー", "attendees")),
+    ("decisions", ("決定事項", "決定", "合意事項", "decisions")),
+    ("action_items", ("アクションアイテム", "アクション", "todo", "宿題", "タスク", "次回までの")),
+    ("discussion", ("議題", "議論", "討議", "協議", "論点", "検討事項", "agenda", "discussion")),
+)
+
+
+@dataclass
+class MinutesAnalysis:
+    """gijiroku-san形式Markdown議事録の構造情報"""
+    title: str = ""
+    date: str = ""
+    location: str = ""
+    duration: str = ""
+    recorder: str = ""
+    participants: list = field(default_factory=list)
+    sections: list = field(default_factory=list)
+    decisions: list = field(default_factory=list)
+    action_items: list = field(default_factory=list)
+    discussion_points: list = field(default_factory=list)
+    confidence: float = 0.0
+
+    def to_dict(self):
+        return asdict(self)
+
+    def to_structured(self):
+        """後続プロンプトに渡すための構造分析結果（LLMの構造分析と同じスキーマ）"""
+        return {
+            "meeting": {"title": self.title, "date": self.date, "participants": list(self.participants),
+                        "duration": self.duration, "location": self.location},
+            "sections": [{"title": section["title"]} for section in self.sections],
+            "decisions": list(self.decisions),
+            "action_items": list(self.action_items),
+            "discussion_points": list(self.discussion_points),
+        }
+
+    def filled_from(self, structured):
+        """空の項目を構造分析結果（to_structured と同じ形の辞書）で補った複製"""
+        structured = structured or {}
+        meeting = structured.get("meeting") or {}
+        filled = replace(self, participants=list(self.participants), decisions=list(self.decisions),
+                         action_items=list(self.action_items), discussion_points=list(self.discussion_points))
+        for name in ("title", "date", "duration", "location"):
+            if not getattr(filled, name) and meeting.get(name):
+                setattr(filled, name, meeting[name])
+        if not filled.participants:
+            filled.participants = list(meeting.get("participants") or [])
+        for name in ("decisions", "action_items", "discussion_points"):
+            if not getattr(filled, name):
+                setattr(filled, name, list(structured.get(name) or []))
+        return filled
+
+
+def _field_for_key(key):
+    key = key.strip().lower()
+    for name, keys in FIELD_KEYS.items():
+        if key in keys:
+            return name
+    return None
+
+
+def _section_kind(title):
+    lowered = title.lower()
+    for kind, keywords in SECTION_KINDS:
+        if any(keyword in lowered for keyword in keywords):
+            return kind
+    return None
+
+
+def _split_participants(value):
+    return [name for name in PARTICIPANT_SPLIT_PATTERN.split(value.strip()) if name]
+
+
+def _strip_inline(text):
+    return re.sub(r'(\*\*|__|`)', '', text).strip()
+
+
+def analyze_minutes(lines):
+    """Markdown議事録の行を1回走査して構造情報を抽出
+
+    lines は文字列全体ではなく行のイテラブル（ファイルオブジェクトも可）を受け取る。
+    コードブロック内の行（# で始まるコメントなど）は見出し・項目として扱わない。
+    決定事項・アクションアイテムなどの下の字下げした箇条書きは、親の項目の続きとして扱う。
+    """
+    result = MinutesAnalysis()
+    current_kind = None
+    current_section = None
+    table_header_seen = False
+    fence = None
+    item_indent = None  # 直前に追加した項目の字下げ（字下げがこれより深い箇条書きは続き）
+
+    for raw_line in lines:
+        line = raw_line.strip()
+        if fence is not None:
+            if line.startswith(fence):
+                fence = None
+            continue
+        fence_match = FENCE_PATTERN.match(line)
+        if fence_match:
+            fence = fence_match.group(1)[:3]
+            continue
+        if not line:
+            continue
+
+        heading = HEADING_PATTERN.match(line)
+        if heading:
+            level = len(heading.group(1))
+            text = _strip_inline(heading.group(2))
+            if level == 1 and not result.title:
+                result.title = text
+                if not result.date:
+                    date = DATE_PATTERN.search(text)
+                    if date:
+                        result.date = date.group(0)
+                current_kind = None
+                current_section = None
+                continue
+            current_section = {"title": text, "level": level, "items": 0}
+            result.sections.append(current_section)
+            current_kind = _section_kind(text)
+            table_header_seen = False
+            item_indent = None
+            continue
+
+        table_row = TABLE_ROW_PATTERN.match(line)
+        if table_row:
+            if TABLE_SEPARATOR_PATTERN.match(line):
+                continue
+            cells = [_strip_inline(cell) for cell in table_row.group(1).split("|")]
+            if not table_header_seen:
+                # 先頭行は見出し行。ただしキー/値形式の会議情報テーブルも拾う
+                table_header_seen = True
+                if current_kind is not None:
+                    continue
+            if len(cells) >= 2:
+                name = _field_for_key(cells[0])
+                if name and not getattr(result, name):
+                    value = cells[1]
+                    setattr(result, name, _split_participants(value) if name == "participants" else value)
+                    continue
+            if current_kind in ("decisions", "action_items", "discussion"):
+                _append_item(result, current_kind, " / ".join(cell for cell in cells if cell))
+                if current_section:
+                    current_section["items"] += 1
+            item_indent = None
+            continue
+
+        list_item = LIST_ITEM_PATTERN.match(line)
+        item_text = _strip_inline(list_item.group("text")) if list_item else None
+
+        key_value = KEY_VALUE_PATTERN.match(line)
+        if key_value:
+            name = _field_for_key(_strip_inline(key_value.group("key")))
+            if name and not getattr(result, name):
+                value = _strip_inline(key_value.group("value"))
+                setattr(result, name, _split_participants(value) if name == "participants" else value)
+                continue
+
+        indent = len(raw_line.expandtabs(4)) - len(raw_line.expandtabs(4).lstrip())
+        if list_item and current_kind in ("decisions", "action_items", "discussion") \
+                and item_indent is not None and indent > item_indent:
+            _extend_last_item(result, current_kind, item_text)
+        elif list_item:
+            if current_section:
+                current_section["items"] += 1
+            if current_kind == "participants":
+                result.participants.extend(_split_participants(item_text))
+            elif current_kind in ("decisions", "action_items", "discussion"):
+                _append_item(result, current_kind, item_text)
+                item_indent = indent
+            elif list_item.group("check") is not None:
+                # セクション外のチェックボックスもアクションアイテムとして扱う
+                result.action_items.append(item_text)
+
+        if not result.date:
+            date = DATE_PATTERN.search(line)
+            if date:
+                result.date = date.group(0)
+
+    if not result.duration and result.date:
+        result.duration = _duration_from_time_range(result.date)
+    result.confidence = _confidence(result)
+    return result
+
+
+def _duration_from_time_range(text):
+    """「10:00-11:30」のような時間帯から会議時間を求める"""
+    match = TIME_RANGE_PATTERN.search(text)
+    if not match:
+        return ""
+    start_h, start_m, end_h, end_m = (int(value) for value in match.groups())
+    minutes = (end_h * 60 + end_m) - (start_h * 60 + start_m)
+    return f"{minutes}分" if minutes > 0 else ""
+
+
+def _append_item(result, kind, text):
+    if kind == "decisions":
+        result.decisions.append(text)
+    elif kind == "action_items":
+        result.action_items.append(text)
+    else:
+        result.discussion_points.append(text)
+
+
+def _extend_last_item(result, kind, text):
+    """直前の項目に字下げした子項目の内容を続ける"""
+    if kind == "decisions":
+        items = result.decisions
+    elif kind == "action_items":
+        items = result.action_items
+    else:
+        items = result.discussion_points
+    items[-1] = f"{items[-1]} / {text}"
+
+
+def _confidence(result):
+    """抽出できた項目から信頼度(0.0-1.0)を算出"""
+    score = 0.0
+    score += 0.2 if result.title else 0.0
+    score += 0.2 if result.date else 0.0
+    score += 0.2 if result.participants else 0.0
+    score += 0.2 if len(result.sections) >= 2 else 0.0
+    score += 0.2 if result.decisions or result.action_items else 0.0
+    return round(score, 2)
@@ -0,0 +1,197 @@
+import re
+import json
+from collections import namedtuple
+
+DEFAULT_CHUNK_TOKENS = 6000
+
+# レベル2以上の見出しで分割する（レベル1のタイトルは冒頭のチャンクに含まれる）
+HEADING_PATTERN = re.compile(r'^(#{1,6})\s+(.*?)\s*#*\s*$')
+FENCE_PATTERN = re.compile(r'^\s*(`{3,}|~{3,})')
+JSON_OBJECT_PATTERN = re.compile(r'\{.*\}', re.DOTALL)
+
+MinutesChunk = namedtuple("MinutesChunk", "index headings text tokens")
+
+
+def estimate_tokens(text):
+    """トークン数の概算（ASCIIは約4文字で1トークン、日本語などは1文字1トークン）"""
+    ascii_count = sum(1 for char in text if char < '\x80')
+    return (ascii_count + 3) // 4 + (len(text) - ascii_count)
+
+
+def _sections(lines):
+    """行イテラブルを (見出しパス, 行リスト) のセクション列に分ける（コードブロック内の#は無視）"""
+    path = []
+    section = []
+    fence = None
+    for raw_line in lines:
+        line = raw_line.rstrip("\r\n")
+        if fence is not None:
+            if line.strip().startswith(fence):
+                fence = None
+            section.append(line)
+            continue
+        fence_match = FENCE_PATTERN.match(line)
+        if fence_match:
+            fence = fence_match.group(1)[:3]
+            section.append(line)
+            continue
+        heading = HEADING_PATTERN.match(line)
+        if heading and len(heading.group(1)) >= 2:
+            if section:
+                yield list(path), section
+            level = len(heading.group(1))
+            path = [item for item in path if item[0] < level] + [(level, heading.group(2))]
+            section = [line]
+            continue
+        section.append(line)
+    if section:
+        yield list(path), section
+
+
+def _split_oversized(lines, max_tokens):
+    """予算を超える1セクションを行の境界で分割（空行の位置を優先）"""
+    piece = []
+    tokens = 0
+    last_blank = None
+    for line in lines:
+        line_tokens = estimate_tokens(line) + 1
+        if piece and tokens + line_tokens > max_tokens:
+            cut = last_blank + 1 if last_blank else len(piece)
+            yield piece[:cut]
+            piece = piece[cut:]
+            tokens = sum(estimate_tokens(item) + 1 for item in piece)
+            last_blank = None
+        if not line.strip():
+            last_blank = len(piece)
+        piece.append(line)
+        tokens += line_tokens
+    if piece:
+        yield piece
+
+
+def chunk_minutes(lines, max_tokens=DEFAULT_CHUNK_TOKENS):
+    """Markdown議事録を見出し単位でトークン予算内のチャンクに分割
+
+    隣り合うセクションは予算内で1チャンクにまとめ、1セクションだけで予算を
+    超える場合は行の境界で分割する。分割されたセクションの2つ目以降には
+    見出しを付け直し、各チャンク単独でも文脈が分かるようにする。
+    """
+    chunks = []
+    buffer = []
+    buffer_tokens = 0
+    buffer_headings = []
+
+    def flush():
+        nonlocal buffer, buffer_tokens, buffer_headings
+        if buffer and any(line.strip() for line in buffer):
+            text = "\n".join(buffer)
+            chunks.append(MinutesChunk(len(chunks), buffer_headings, text, estimate_tokens(text)))
+        buffer, buffer_tokens, buffer_headings = [], 0, []
+
+    for path, section in _sections(lines):
+        heading = " > ".join(title for _, title in path)
+        section_tokens = sum(estimate_tokens(line) + 1 for line in section)
+        if section_tokens > max_tokens:
+            flush()
+            for part_index, part in enumerate(_split_oversized(section, max_tokens)):
+                if part_index and path:
+                    part = [f"{'#' * path[-1][0]} {path[-1][1]}（続き）"] + part
+                buffer, buffer_tokens, buffer_headings = part, 0, [heading] if heading else []
+                flush()
+            continue
+        if buffer and buffer_tokens + section_tokens > max_tokens:
+            flush()
+        buffer.extend(section)
+        buffer_tokens += section_tokens
+        if heading:
+            buffer_headings.append(heading)
+    flush()
+    return chunks
+
+
+def outline_text(chunks):
+    """チャンクの見出しから文書全体のアウトラインを作る（プラン生成用の要約入力）"""
+    lines = []
+    for chunk in chunks:
+        for heading in chunk.headings or ["(冒頭)"]:
+            line = f"- {heading}"
+            if not lines or lines[-1] != line:  # 分割されたセクションは1行にまとめる
+                lines.append(line)
+    return "\n".join(lines)
+
+
+def parse_partial_analysis(text):
+    """チャンク分析の応答からJSONを取り出す（失敗時は空の結果）"""
+    match = JSON_OBJECT_PATTERN.search(text or "")
+    if match:
+        try:
+            data = json.loads(match.group(0))
+            if isinstance(data, dict):
+                return data
+        except json.JSONDecodeError:
+            pass
+    return {}
+
+
+def _unique(items):
+    seen = set()
+    result = []
+    for item in items:
+        key = item if isinstance(item, str) else json.dumps(item, ensure_ascii=False, sort_keys=True)
+        if item and key not in seen:
+            seen.add(key)
+            result.append(item)
+    return result
+
+
+def merge_partial_analyses(partials):
+    """チャンクごとの分析結果を文書順に1つの構造へまとめる"""
+    meeting = {"title": "", "date": "", "participants": [], "duration": "", "location": ""}
+    merged = {"meeting": meeting, "sections": [], "decisions": [], "action_items": [], "discussion_points": []}
+    for partial in partials:
+        info = partial.get("meeting") or {}
+        for key in ("title", "date", "duration", "location"):
+            if not meeting[key] and info.get(key):
+                meeting[key] = info[key]
+        participants = info.get("participants") or []
+        if isinstance(participants, str):
+            participants = [participants]
+        meeting["participants"].extend(participants)
+        for key in ("sections", "decisions", "action_items", "discussion_points"):
+            merged[key].extend(partial.get(key) or [])
+    meeting["participants"] = _unique(meeting["participants"])
+    for key in ("decisions", "action_items", "discussion_points"):
+        merged[key] = _unique(merged[key])
+    return merged
+
+
+def format_merged_analysis(merged):
+    """統合した分析結果を、単一プロンプトでの構造分析と同じ見出し構成のテキストにする"""
+    meeting = merged["meeting"]
+    lines = [
+        "## 📋 議事録情報",
+        f"- 会議タイトル: {meeting['title'] or '不明'}",
+        f"- 開催日時: {meeting['date'] or '不明'}",
+        f"- 参加者: {'、'.join(meeting['participants']) if meeting['participants'] else '不明'}",
+        f"- 会議時間: {meeting['duration'] or '不明'}",
+        "",
+        "## 📝 主要セクション",
+    ]
+    for i, section in enumerate(merged["sections"], 1):
+        if isinstance(section, dict):
+            summary = section.get("summary", "")
+            lines.append(f"{i}. {section.get('title', '')}" + (f": {summary}" if summary else ""))
+        else:
+            lines.append(f"{i}. {section}")
+    lines += [
+        "",
+        "## 🎯 重要ポイント",
+        f"- 決定事項の数: {len(merged['decisions'])}",
+        f"- アクションアイテムの数: {len(merged['action_items'])}",
+        f"- 議論点の数: {len(merged['discussion_points'])}",
+    ]
+    for title, key in (("決定事項", "decisions"), ("アクションアイテム", "action_items")):
+        if merged[key]:
+            lines += ["", f"### {title}"]
+            lines.extend(f"- {item}" for item in merged[key])
+    return "\n".join(lines)
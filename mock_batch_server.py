@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Message Batches API のローカルモック
+
+major_mcp_connect.py sweep をAPIキー・課金なしで動作確認するためのサーバー。
+ANTHROPIC_BASE_URL をこのサーバーに向けると、SDKのバッチ作成・状態確認・結果取得が
+ここで処理される。バッチは作成から --delay 秒後に ended になる。
+
+    python mock_batch_server.py --port 8791 --delay 5 --fail-rate 0.1
+    ANTHROPIC_BASE_URL=http://127.0.0.1:8791 ANTHROPIC_API_KEY=dummy \\
+        python major_mcp_connect.py sweep jobs.csv --poll 2
+"""
+
+import sys
+import json
+import time
+import random
+import threading
+from datetime import datetime, timezone
+from urllib.parse import urlparse
+
+from minutes_chunker import estimate_tokens
+
+BATCHES_PATH = "/v1/messages/batches"
+
+
+def _timestamp(seconds):
+    return datetime.fromtimestamp(seconds, timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def _request_text(params):
+    texts = [block.get("text", "") for block in params.get("system") or [] if isinstance(block, dict)]
+    if isinstance(params.get("system"), str):
+        texts = [params["system"]]
+    for message in params.get("messages", []):
+        content = message.get("content")
+        texts.append(content if isinstance(content, str) else json.dumps(content, ensure_ascii=False))
+    return "\n".join(texts)
+
+
+def mock_result(request, fail_rate=0.0):
+    """バッチ内リクエスト1件の結果行を作る（custom_id ごとに成否は固定）"""
+    custom_id = request["custom_id"]
+    params = request.get("params", {})
+    if random.Random(custom_id).random() < fail_rate:
+        return {"custom_id": custom_id, "result": {"type": "errored", "error": {
+            "type": "error", "error": {"type": "overloaded_error", "message": "mock failure"}}}}
+
+    prompt = _request_text(params)
+    text = f"（モック応答）{params.get('messages', [{}])[0].get('content', '')}"
+    content = []
+    servers = params.get("mcp_servers") or []
+    if servers:
+        content.append({"type": "mcp_tool_use", "id": f"mcptoolu_{custom_id}", "name": "search",
+                        "server_name": servers[0].get("name", "mcp"), "input": {}})
+    content.append({"type": "text", "text": text})
+    return {"custom_id": custom_id, "result": {"type": "succeeded", "message": {
+        "id": f"msg_{custom_id}",
+        "type": "message",
+        "role": "assistant",
+        "model": params.get("model", "mock"),
+        "content": content,
+        "stop_reason": "end_turn",
+        "stop_sequence": None,
+        "usage": {
+            "input_tokens": estimate_tokens(prompt),
+            "output_tokens": estimate_tokens(text),
+            "cache_creation_input_tokens": 0,
+            "cache_read_input_tokens": 0,
+        },
+    }}}
+
+
+class MockBatchStore:
+    """作成されたバッチを保持し、経過時間に応じて状態を返す"""
+
+    def __init__(self, base_url, delay=5.0, fail_rate=0.0):
+        self.base_url = base_url
+        self.delay = delay
+        self.fail_rate = fail_rate
+        self.batches = {}
+        self._lock = threading.Lock()
+
+    def create(self, requests):
+        with self._lock:
+            batch_id = f"msgbatch_mock{len(self.batches) + 1:04d}"
+            self.batches[batch_id] = {
+                "created": time.time(),
+                "results": [mock_result(request, self.fail_rate) for request in requests],
+            }
+        return self.describe(batch_id)
+
+    def ended(self, batch_id):
+        return time.time() - self.batches[batch_id]["created"] >= self.delay
+
+    def describe(self, batch_id):
+        batch = self.batches.get(batch_id)
+        if batch is None:
+            return None
+        ended = self.ended(batch_id)
+        results = batch["results"]
+        succeeded = sum(1 for line in results if line["result"]["type"] == "succeeded")
+        created = batch["created"]
+        return {
+            "id": batch_id,
+            "type": "message_batch",
+            "processing_status": "ended" if ended else "in_progress",
+            "request_counts": {
+                "processing": 0 if ended else len(results),
+                "succeeded": succeeded if ended else 0,
+                "errored": len(results) - succeeded if ended else 0,
+                "canceled": 0,
+                "expired": 0,
+            },
+            "created_at": _timestamp(created),
+            "expires_at": _timestamp(created + 24 * 3600),
+            "ended_at": _timestamp(created + self.delay) if ended else None,
+            "archived_at": None,
+            "cancel_initiated_at": None,
+            "results_url": f"{self.base_url}{BATCHES_PATH}/{batch_id}/results" if ended else None,
+        }
+
+    def results(self, batch_id):
+        if batch_id not in self.batches or not self.ended(batch_id):
+            return None
+        return "".join(json.dumps(line, ensure_ascii=False) + "\n" for line in self.batches[batch_id]["results"])
+
+
+def serve(port=8791, delay=5.0, fail_rate=0.0):
+    """モックサーバーを起動（Ctrl+Cで終了）"""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    store = MockBatchStore(f"http://127.0.0.1:{port}", delay, fail_rate)
+
+    class MockHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send(self, status, body, content_type="application/json"):
+            data = body.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _send_json(self, status, payload):
+            self._send(status, json.dumps(payload, ensure_ascii=False))
+
+        def _not_found(self):
+            self._send_json(404, {"type": "error", "error": {"type": "not_found_error", "message": self.path}})
+
+        def do_POST(self):
+            path = urlparse(self.path).path
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+            if path != BATCHES_PATH:
+                return self._not_found()
+            batch = store.create(body.get("requests", []))
+            print(f"📥 {batch['id']}: {len(body.get('requests', []))}件")
+            self._send_json(200, batch)
+
+        def do_GET(self):
+            parts = urlparse(self.path).path[len(BATCHES_PATH):].strip("/").split("/")
+            if not self.path.startswith(BATCHES_PATH) or not parts[0]:
+                return self._not_found()
+            if len(parts) == 2 and parts[1] == "results":
+                body = store.results(parts[0])
+                if body is None:
+                    return self._not_found()
+                return self._send(200, body, "application/binary")
+            batch = store.describe(parts[0])
+            if batch is None:
+                return self._not_found()
+            self._send_json(200, batch)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), MockHandler)
+    server.daemon_threads = True
+    print(f"🧪 Message Batches モック: http://127.0.0.1:{port} (完了まで {delay}秒, 失敗率 {fail_rate})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main():
+    args = sys.argv[1:]
+    port = int(args[args.index("--port") + 1]) if "--port" in args else 8791
+    delay = float(args[args.index("--delay") + 1]) if "--delay" in args else 5.0
+    fail_rate = float(args[args.index("--fail-rate") + 1]) if "--fail-rate" in args else 0.0
+    serve(port, delay, fail_rate)
+
+
+if __name__ == "__main__":
+    main()
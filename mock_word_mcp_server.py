@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Word MCP サーバーのローカルモック（stdio）
+
+stdio_mcp_bridge.py のツール使用ループを、Word MCPサーバーを導入せずに動作確認するためのサーバー。
+改行区切りのJSON-RPCで initialize / tools/list / tools/call に応答し、文書の作成・見出し・段落・
+表・保存をpython-docxで実際に行う。ツール呼び出しはリクエストごとのスレッドで処理し、
+--delay 秒の待ち時間を入れて、並行呼び出しで待ち時間が重なることを確認できる。
+--jitter 秒を指定すると呼び出しごとに 0〜jitter 秒の待ち時間を足し、応答の順序を入れ替える。
+
+    WORD_MCP_SERVER_COMMAND="python mock_word_mcp_server.py --delay 0.2" \\
+        python markdown_to_word_mcp.py meeting_minutes.md --word-mcp
+"""
+
+import sys
+import json
+import time
+import random
+import threading
+
+PROTOCOL_VERSION = "2024-11-05"
+
+TOOLS = [
+    {"name": "create_document", "description": "新しいWord文書を作成する",
+     "inputSchema": {"type": "object", "properties": {"filename": {"type": "string"}}, "required": ["filename"]}},
+    {"name": "add_heading", "description": "見出しを追加する",
+     "inputSchema": {"type": "object", "properties": {
+         "filename": {"type": "string"}, "text": {"type": "string"},
+         "level": {"type": "integer", "minimum": 1, "maximum": 6}}, "required": ["filename", "text"]}},
+    {"name": "add_paragraph", "description": "段落を追加する",
+     "inputSchema": {"type": "object", "properties": {
+         "filename": {"type": "string"}, "text": {"type": "string"}}, "required": ["filename", "text"]}},
+    {"name": "add_table", "description": "表を追加する（1行目は見出し行）",
+     "inputSchema": {"type": "object", "properties": {
+         "filename": {"type": "string"},
+         "rows": {"type": "array", "items": {"type": "array", "items": {"type": "string"}}}},
+         "required": ["filename", "rows"]}},
+    {"name": "save_document", "description": "文書を保存する",
+     "inputSchema": {"type": "object", "properties": {"filename": {"type": "string"}}, "required": ["filename"]}},
+]
+
+
+class MockWordServer:
+    """ファイル名ごとのpython-docx文書をメモリ上に持ち、ツール呼び出しを適用する"""
+
+    def __init__(self, delay=0.0, jitter=0.0):
+        self.delay = delay
+        self.jitter = jitter
+        self.documents = {}
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+
+    def _document(self, filename, create=False):
+        from docx import Document
+
+        with self._lock:
+            if create or filename not in self.documents:
+                if not create:
+                    raise KeyError(f"文書がありません: {filename}（先に create_document を呼んでください）")
+                self.documents[filename] = (Document(), threading.Lock())
+            return self.documents[filename]
+
+    def call_tool(self, name, arguments):
+        time.sleep(self.delay + random.uniform(0, self.jitter))
+        filename = arguments.get("filename", "")
+        if name == "create_document":
+            self._document(filename, create=True)
+            return f"作成しました: {filename}"
+        doc, lock = self._document(filename)
+        with lock:
+            if name == "add_heading":
+                doc.add_heading(arguments["text"], level=min(max(int(arguments.get("level", 1)), 1), 6))
+            elif name == "add_paragraph":
+                doc.add_paragraph(arguments["text"])
+            elif name == "add_table":
+                rows = arguments["rows"] or [[""]]
+                table = doc.add_table(rows=len(rows), cols=max(len(row) for row in rows))
+                table.style = "Table Grid"
+                for r, row in enumerate(rows):
+                    for c, value in enumerate(row):
+                        table.cell(r, c).text = str(value)
+            elif name == "save_document":
+                doc.save(filename)
+                return f"保存しました: {filename}"
+            else:
+                raise KeyError(f"未対応のツール: {name}")
+        return "OK"
+
+    def handle(self, message):
+        """1件のリクエストを処理して応答（通知なら None）を返す"""
+        method = message.get("method")
+        if "id" not in message:
+            return None
+        if method == "initialize":
+            result = {"protocolVersion": PROTOCOL_VERSION, "capabilities": {"tools": {}},
+                      "serverInfo": {"name": "mock-word-mcp", "version": "1.0"}}
+        elif method == "tools/list":
+            result = {"tools": TOOLS}
+        elif method == "tools/call":
+            params = message.get("params") or {}
+            try:
+                text = self.call_tool(params.get("name"), params.get("arguments") or {})
+                result = {"content": [{"type": "text", "text": text}], "isError": False}
+            except Exception as e:
+                result = {"content": [{"type": "text", "text": f"{type(e).__name__}: {e}"}], "isError": True}
+        else:
+            return {"jsonrpc": "2.0", "id": message["id"],
+                    "error": {"code": -32601, "message": f"Method not found: {method}"}}
+        return {"jsonrpc": "2.0", "id": message["id"], "result": result}
+
+    def respond(self, message):
+        response = self.handle(message)
+        if response is not None:
+            with self._write_lock:
+                sys.stdout.write(json.dumps(response, ensure_ascii=False) + "\n")
+                sys.stdout.flush()
+
+    def serve(self):
+        for line in sys.stdin:
+            if not line.strip():
+                continue
+            message = json.loads(line)
+            if message.get("method") == "tools/call":
+                threading.Thread(target=self.respond, args=(message,), daemon=True).start()
+            else:
+                self.respond(message)
+
+
+def main():
+    args = sys.argv[1:]
+    delay = float(args[args.index("--delay") + 1]) if "--delay" in args else 0.0
+    jitter = float(args[args.index("--jitter") + 1]) if "--jitter" in args else 0.0
+    sys.stdin.reconfigure(encoding="utf-8")
+    sys.stdout.reconfigure(encoding="utf-8")
+    print(f"🧪 モックWord MCPサーバー (stdio, ツール待ち時間 {delay}秒 + 0〜{jitter}秒)", file=sys.stderr)
+    MockWordServer(delay, jitter).serve()
+
+
+if __name__ == "__main__":
+    main()
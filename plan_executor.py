@@ -0,0 +1,225 @@
+import os
+import re
+
+from docx_renderer import (
+    meeting_fields, add_meeting_table, render_markdown_lines, DocxBlockRenderer, MEETING_TABLE_KEYS,
+)
+from markdown_blocks import Heading
+from structured_output import plan_commands
+from word_template import fill_placeholders
+
+INVALID_FILE_NAME_CHARS = re.compile(r'[\\/:*?"<>|\x00-\x1f]')
+DEFAULT_MARGINS_CM = {"top": 2.5, "bottom": 2.5, "left": 3.0, "right": 2.5}
+DEFAULT_FONT = {"name": "游明朝", "size": 11}
+DICT_KEYS = ("margins_cm", "font", "cover", "finishing")
+ARGUMENT_TYPES = {
+    "create_document": str, "set_page_margins": dict, "set_font_default": dict,
+    "add_title": str, "add_subtitle": str, "add_meeting_info": str, "add_heading1": str,
+    "set_header": str, "set_footer": str,
+}
+
+
+def default_plan(info=None):
+    """LLMのプランが無い場合に使う既定のプラン（表紙・会議概要・議事内容・決定事項・アクション）"""
+    fields = meeting_fields(info)
+    meeting_info = f"開催日時: {fields['開催日時']}" + (f" | 場所: {fields['場所']}" if fields['場所'] else "")
+    return {
+        "file_name": "",
+        "margins_cm": DEFAULT_MARGINS_CM,
+        "font": DEFAULT_FONT,
+        "cover": {"title": fields["会議名"], "subtitle": "議事録", "meeting_info": meeting_info},
+        "outline": [
+            {"heading": "1. 会議概要", "content": "meeting_table"},
+            {"heading": "2. 議事内容", "content": "minutes"},
+            {"heading": "3. 決定事項", "content": "decisions_table"},
+            {"heading": "4. アクションアイテム", "content": "action_items_table"},
+        ],
+        "finishing": {"page_numbers": True},
+    }
+
+
+def validate_plan(plan):
+    """プランを実行できるか検査し、問題点のリストを返す（空なら実行可能）"""
+    if not isinstance(plan, dict):
+        return ["プランが辞書ではありません"]
+    problems = [f"{key} が辞書ではありません: {plan[key]!r}" for key in DICT_KEYS
+                if plan.get(key) is not None and not isinstance(plan[key], dict)]
+    outline = plan.get("outline") or []
+    if not isinstance(outline, list) or not all(isinstance(item, dict) for item in outline):
+        problems.append(f"outline の各項目が辞書ではありません: {outline!r}")
+    if problems:
+        return problems  # 以降の展開（plan_commands）は辞書であることを前提にする
+    if not any(item.get("content") == "minutes" for item in outline):
+        problems.append("outline に議事内容（minutes）がありません")
+    for name, argument in plan_commands(plan):
+        if not hasattr(PlanExecutor, f"_cmd_{name}"):
+            problems.append(f"未対応のコマンド: {name}")
+        elif name in ARGUMENT_TYPES and not isinstance(argument, ARGUMENT_TYPES[name]):
+            problems.append(f"{name} の引数の型が不正です: {argument!r}")
+    for key, value in (plan.get("margins_cm") or {}).items():
+        if key not in DEFAULT_MARGINS_CM or not isinstance(value, (int, float)) or not 0 <= value <= 10:
+            problems.append(f"余白の指定が不正です: {key}={value!r}")
+    size = (plan.get("font") or {}).get("size")
+    if size is not None and (not isinstance(size, (int, float)) or not 6 <= size <= 72):
+        problems.append(f"フォントサイズが不正です: {size!r}")
+    return problems
+
+
+def safe_file_name(name):
+    """プランのファイル名を保存先に使える名前にする（ディレクトリ部分は捨てる。使えなければ空文字）"""
+    name = INVALID_FILE_NAME_CHARS.sub("_", os.path.basename((name or "").strip()))
+    if not name.strip("._ "):
+        return ""
+    return name if name.lower().endswith(".docx") else f"{name}.docx"
+
+
+class PlanExecutor:
+    """構造化された生成プランのコマンドを python-docx で順に適用する
+
+    Word MCP と同じ名前のコマンド（plan_commands）を1つずつ対応するメソッドに振り分ける。
+    同じプラン・同じ議事録からは常に同じ文書ができ、API呼び出しは行わない。
+    議事内容（add_minutes）は lines_factory が返す行イテラブルをストリーミングで描画する。
+    """
+
+    def __init__(self, lines_factory, info=None, analysis=None, template=None):
+        self.lines_factory = lines_factory
+        self.info = info
+        self.analysis = analysis or {}
+        self.template = template
+        self.fields = meeting_fields(info)
+        self.file_name = ""
+        self.doc = None
+        self._renderer = None
+
+    def execute(self, plan):
+        """プランを検査して適用し、(文書, 保存用ファイル名) を返す（不正なプランは ValueError）"""
+        problems = validate_plan(plan)
+        if problems:
+            raise ValueError(f"生成プランを実行できません: {'; '.join(problems)}")
+        for name, argument in plan_commands(plan):
+            getattr(self, f"_cmd_{name}")(argument)
+        return self.doc, self.file_name
+
+    def _paragraph(self, text, style=None, center=False):
+        from docx.enum.text import WD_ALIGN_PARAGRAPH
+
+        paragraph = self.doc.add_paragraph(text, style=style if style in self.doc.styles else None)
+        if center:
+            paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        return paragraph
+
+    def _field(self, paragraph, instruction, placeholder=""):
+        """段落にフィールド（PAGE・TOC など。Wordで開いたときに更新される）を追加"""
+        from docx.oxml import OxmlElement
+        from docx.oxml.ns import qn
+
+        field = OxmlElement("w:fldSimple")
+        field.set(qn("w:instr"), instruction)
+        run = OxmlElement("w:r")
+        text = OxmlElement("w:t")
+        text.text = placeholder
+        run.append(text)
+        field.append(run)
+        paragraph._p.append(field)
+
+    def _list_table(self, title, items):
+        if not items:
+            self._paragraph("（なし）")
+            return
+        table = self.doc.add_table(rows=len(items) + 1, cols=2)
+        table.style = "Table Grid" if "Table Grid" in self.doc.styles else None
+        table.cell(0, 0).text = "No."
+        table.cell(0, 1).text = title
+        for row, item in enumerate(items, 1):
+            table.cell(row, 0).text = str(row)
+            table.cell(row, 1).text = item if isinstance(item, str) else str(item)
+
+    def _items(self, name):
+        """決定事項・アクションアイテム（LLMの分析結果が無ければローカル解析の結果）"""
+        return self.analysis.get(name) or (getattr(self.info, name, None) or [])
+
+    def _cmd_create_document(self, file_name):
+        from docx import Document
+
+        if self.template is not None:
+            self.doc = self.template.new_document()
+            fill_placeholders(self.doc, self.fields)
+        else:
+            self.doc = Document()
+        self._renderer = DocxBlockRenderer(self.doc)
+        self.file_name = safe_file_name(file_name)
+
+    def _cmd_set_page_margins(self, margins):
+        from docx.shared import Cm
+
+        for section in self.doc.sections:
+            for key, value in margins.items():
+                setattr(section, f"{key}_margin", Cm(value))
+
+    def _cmd_set_font_default(self, font):
+        from docx.shared import Pt
+        from docx.oxml.ns import qn
+
+        style = self.doc.styles["Normal"]
+        if font.get("name"):
+            style.font.name = font["name"]
+            style.element.get_or_add_rPr().get_or_add_rFonts().set(qn("w:eastAsia"), font["name"])
+        if font.get("size"):
+            style.font.size = Pt(font["size"])
+
+    def _cmd_add_title(self, text):
+        self._paragraph(text or self.fields["会議名"], style="Title", center=True)
+
+    def _cmd_add_subtitle(self, text):
+        self._paragraph(text, style="Subtitle", center=True)
+
+    def _cmd_add_meeting_info(self, text):
+        self._paragraph(text, center=True)
+
+    def _cmd_add_page_break(self, _):
+        self.doc.add_page_break()
+
+    def _cmd_add_table_of_contents(self, _):
+        self._paragraph("目次", style="TOC Heading")
+        self._field(self._paragraph(""), 'TOC \\o "1-3" \\h \\z \\u', "（Wordで開いてF9キーで目次を更新）")
+
+    def _cmd_add_heading1(self, text):
+        self._renderer.render([Heading(1, text)])
+
+    def _cmd_add_meeting_table(self, _):
+        add_meeting_table(self.doc, self.fields,
+                          MEETING_TABLE_KEYS + ("場所",) if self.fields["場所"] else MEETING_TABLE_KEYS)
+
+    def _cmd_add_minutes(self, _):
+        render_markdown_lines(self.doc, self.lines_factory())
+
+    def _cmd_add_decisions_table(self, _):
+        self._list_table("決定事項", self._items("decisions"))
+
+    def _cmd_add_action_items_table(self, _):
+        self._list_table("アクションアイテム", self._items("action_items"))
+
+    def _cmd_set_header(self, text):
+        self._set_margin_text("header", text)
+
+    def _cmd_set_footer(self, text):
+        self._set_margin_text("footer", text)
+
+    def _set_margin_text(self, part, text):
+        """ヘッダー/フッターに文字を入れる（企業テンプレートの既存の内容は上書きしない）"""
+        for section in self.doc.sections:
+            container = getattr(section, part)
+            if any(paragraph.text.strip() for paragraph in container.paragraphs):
+                continue
+            container.paragraphs[0].text = text
+
+    def _cmd_add_page_numbers(self, _):
+        from docx.enum.text import WD_ALIGN_PARAGRAPH
+
+        for section in self.doc.sections:
+            paragraph = section.footer.add_paragraph()
+            paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
+            self._field(paragraph, "PAGE", "1")
+
+    def _cmd_save_document(self, _):
+        """保存は呼び出し側で行う（保存先の決定・上書き確認のため）"""
@@ -0,0 +1,99 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+
+class StageGraph:
+    """依存関係つきの処理ステージを必要な分だけ並行実行する小さなグラフ
+
+    各ステージ関数は依存ステージの結果をキーワード引数（ステージ名）で受け取る。
+    run() に渡した目標ステージから辿れないステージは実行しない。
+    """
+
+    def __init__(self):
+        self.stages = {}
+
+    def add(self, name, func, deps=()):
+        """ステージを登録"""
+        for dep in deps:
+            if dep not in self.stages:
+                raise ValueError(f"未登録の依存ステージです: {dep}")
+        self.stages[name] = (func, tuple(deps))
+        return self
+
+    def required(self, targets):
+        """目標ステージの実行に必要なステージ名の集合"""
+        needed = set()
+        pending = list(targets)
+        while pending:
+            name = pending.pop()
+            if name in needed:
+                continue
+            needed.add(name)
+            pending.extend(self.stages[name][1])
+        return needed
+
+    def run(self, targets, max_workers=4):
+        """目標ステージまでを実行し、(結果, 計測情報) を返す
+
+        計測情報は登録順に {name: {"status", "start", "duration", "error"}}。
+        status は done / failed / skipped（不要）/ blocked（依存が失敗）のいずれか。
+        """
+        needed = self.required(targets)
+        results = {}
+        report = {
+            name: {"status": "skipped", "start": None, "duration": None, "error": None}
+            for name in self.stages
+        }
+        origin = time.perf_counter()
+        remaining = set(needed)
+        running = {}
+
+        def execute(name):
+            func, deps = self.stages[name]
+            report[name]["start"] = time.perf_counter() - origin
+            started = time.perf_counter()
+            try:
+                return func(**{dep: results[dep] for dep in deps})
+            finally:
+                report[name]["duration"] = time.perf_counter() - started
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            while remaining or running:
+                for name in sorted(remaining, key=list(self.stages).index):
+                    deps = self.stages[name][1]
+                    if any(report[dep]["status"] in ("failed", "blocked") for dep in deps):
+                        report[name]["status"] = "blocked"
+                        remaining.discard(name)
+                    elif all(dep in results for dep in deps):
+                        running[pool.submit(execute, name)] = name
+                        remaining.discard(name)
+                if not running:
+                    break
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                        report[name]["status"] = "done"
+                    except Exception as e:
+                        report[name]["status"] = "failed"
+                        report[name]["error"] = f"{type(e).__name__}: {e}"
+
+        return results, report
+
+
+def print_stage_report(report, total):
+    """ステージごとの計測結果を表示"""
+    labels = {"done": "✅", "failed": "❌", "skipped": "⏭️ ", "blocked": "⛔"}
+    print("\n⏱️  ステージ計測")
+    print("-"*50)
+    for name, info in report.items():
+        mark = labels[info["status"]]
+        if info["duration"] is None:
+            print(f"  {mark} {name:<14} {info['status']}")
+        else:
+            print(f"  {mark} {name:<14} {info['duration']:7.2f}秒 (開始 +{info['start']:.2f}秒)")
+        if info["error"]:
+            print(f"      {info['error']}")
+    print(f"  合計: {total:.2f}秒")
+    print("-"*50)
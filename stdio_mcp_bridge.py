@@ -0,0 +1,301 @@
+import os
+import sys
+import json
+import time
+import shlex
+import atexit
+import threading
+import subprocess
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+
+MCP_PROTOCOL_VERSION = "2024-11-05"
+DEFAULT_START_TIMEOUT = 30      # サーバー起動〜initialize 応答までの秒数
+DEFAULT_CALL_TIMEOUT = 120      # 1回のツール呼び出しの秒数
+DEFAULT_MAX_TURNS = 20          # ツール使用ループの最大往復数
+STDERR_TAIL_LINES = 20
+# ツール引数のうち操作対象の文書を表すもの（同じ文書への呼び出しはモデルが出した順に1つずつ実行する）
+DOCUMENT_ARGUMENTS = ("filename", "document", "document_id", "doc_id", "path", "file_path")
+
+
+class MCPBridgeError(RuntimeError):
+    """stdio MCPサーバーの起動・通信の失敗、またはJSON-RPCのエラー応答"""
+
+
+def server_command(config):
+    """サーバー設定から起動コマンドを作る（環境変数 WORD_MCP_SERVER_COMMAND で差し替え可能）
+
+    command が "python" の場合は、実行中のPythonと同じインタープリタで起動する。
+    """
+    override = os.getenv("WORD_MCP_SERVER_COMMAND") if config.get("name") == "word-mcp" else None
+    command = shlex.split(override) if override else [config["command"], *config.get("args", [])]
+    if command[0] == "python":
+        command[0] = sys.executable
+    return command
+
+
+class StdioMCPSession:
+    """stdio で起動したMCPサーバーとの常駐セッション（改行区切りのJSON-RPC 2.0）
+
+    応答は読み取りスレッドがリクエストIDごとに振り分けるため、複数のツール呼び出しを
+    応答を待たずに続けて送れる（サーバーが並行処理できれば待ち時間が重なる）。
+    """
+
+    def __init__(self, command, name="mcp", env=None):
+        self.command = command
+        self.name = name
+        self.env = env
+        self.tools = []
+        self.server_info = {}
+        self._process = None
+        self._next_id = 0
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._stderr = deque(maxlen=STDERR_TAIL_LINES)
+        self._stderr_reader = None
+
+    @property
+    def alive(self):
+        return self._process is not None and self._process.poll() is None
+
+    def start(self, timeout=DEFAULT_START_TIMEOUT):
+        """サーバーを起動し、initialize とツール一覧の取得まで行う"""
+        started = time.perf_counter()
+        try:
+            self._process = subprocess.Popen(
+                self.command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                env={**os.environ, **(self.env or {})}, text=True, encoding="utf-8", bufsize=1,
+            )
+        except OSError as e:
+            raise MCPBridgeError(f"MCPサーバーを起動できません: {' '.join(self.command)} ({e})")
+        self._stderr_reader = threading.Thread(target=self._read_stderr, daemon=True)
+        self._stderr_reader.start()
+        threading.Thread(target=self._read_stdout, daemon=True).start()
+
+        try:
+            result = self.request("initialize", {
+                "protocolVersion": MCP_PROTOCOL_VERSION,
+                "capabilities": {},
+                "clientInfo": {"name": "mcp-business-suite", "version": "1.0"},
+            }, timeout=timeout)
+            self.server_info = result.get("serverInfo") or {}
+            self.notify("notifications/initialized")
+            self.tools = self.list_tools(timeout=timeout)
+        except Exception:
+            self.close()
+            raise
+        print(f"🔌 {self.name}: stdio MCPサーバーを起動 ({len(self.tools)}ツール, "
+              f"{time.perf_counter() - started:.2f}秒)")
+        return self
+
+    def _send(self, message):
+        if not self.alive:
+            raise MCPBridgeError(f"{self.name}: MCPサーバーが終了しています{self._stderr_hint()}")
+        with self._write_lock:
+            self._process.stdin.write(json.dumps(message, ensure_ascii=False) + "\n")
+            self._process.stdin.flush()
+
+    def request_async(self, method, params=None):
+        """リクエストを送信し、結果（result）を受け取る Future を返す"""
+        future = Future()
+        with self._lock:
+            self._next_id += 1
+            request_id = self._next_id
+            self._pending[request_id] = future
+        try:
+            self._send({"jsonrpc": "2.0", "id": request_id, "method": method, "params": params or {}})
+        except (OSError, MCPBridgeError) as e:
+            with self._lock:
+                self._pending.pop(request_id, None)
+            future.set_exception(e if isinstance(e, MCPBridgeError) else MCPBridgeError(str(e)))
+        return future
+
+    def request(self, method, params=None, timeout=DEFAULT_CALL_TIMEOUT):
+        future = self.request_async(method, params)
+        done, _ = wait([future], timeout=timeout)
+        if not done:
+            raise MCPBridgeError(f"{self.name}: {method} が{timeout}秒以内に応答しませんでした")
+        return future.result()
+
+    def notify(self, method, params=None):
+        self._send({"jsonrpc": "2.0", "method": method, **({"params": params} if params else {})})
+
+    def list_tools(self, timeout=DEFAULT_CALL_TIMEOUT):
+        """tools/list を最後のページまで取得"""
+        tools = []
+        cursor = None
+        while True:
+            result = self.request("tools/list", {"cursor": cursor} if cursor else {}, timeout=timeout)
+            tools.extend(result.get("tools") or [])
+            cursor = result.get("nextCursor")
+            if not cursor:
+                return tools
+
+    def call_tool_async(self, name, arguments):
+        return self.request_async("tools/call", {"name": name, "arguments": arguments or {}})
+
+    def _read_stdout(self):
+        for line in self._process.stdout:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                message = json.loads(line)
+            except json.JSONDecodeError:
+                self._stderr.append(f"(stdout) {line}")
+                continue
+            if "id" not in message or "method" in message:
+                continue  # サーバーからの通知・リクエストは扱わない
+            with self._lock:
+                future = self._pending.pop(message["id"], None)
+            if future is None:
+                continue
+            if "error" in message:
+                error = message["error"]
+                future.set_exception(MCPBridgeError(f"{self.name}: {error.get('message')} (code {error.get('code')})"))
+            else:
+                future.set_result(message.get("result") or {})
+        # サーバーが終了したら待っている呼び出しをすべて失敗させる（エラー出力を読み終えてから）
+        self._stderr_reader.join(timeout=1)
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for future in pending.values():
+            future.set_exception(MCPBridgeError(f"{self.name}: MCPサーバーが終了しました{self._stderr_hint()}"))
+
+    def _read_stderr(self):
+        for line in self._process.stderr:
+            self._stderr.append(line.rstrip())
+
+    def _stderr_hint(self):
+        return f"\n{chr(10).join(self._stderr)}" if self._stderr else ""
+
+    def close(self):
+        if self._process is None:
+            return
+        try:
+            self._process.stdin.close()
+            self._process.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            self._process.kill()
+        self._process = None
+
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(config):
+    """サーバー設定ごとに1つの常駐セッションを返す（終了していたら起動し直す）"""
+    command = server_command(config)
+    key = tuple(command)
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None or not session.alive:
+            session = StdioMCPSession(command, config.get("name", "mcp")).start()
+            _sessions[key] = session
+        return session
+
+
+@atexit.register
+def close_sessions():
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+
+def tool_definitions(session):
+    """MCPのツール一覧をMessages APIの tools パラメータにする"""
+    return [{
+        "name": tool["name"],
+        "description": tool.get("description", ""),
+        "input_schema": tool.get("inputSchema") or {"type": "object", "properties": {}},
+    } for tool in session.tools]
+
+
+def _tool_result(block, future):
+    """ツール呼び出しの結果を tool_result ブロックにする（失敗は is_error で返してモデルに任せる）"""
+    try:
+        result = future.result(timeout=0)  # 待ち時間を超えた呼び出しは TimeoutError
+        texts = [item.get("text", "") for item in result.get("content") or [] if item.get("type") == "text"]
+        return {"type": "tool_result", "tool_use_id": block.id,
+                "content": "\n".join(texts) or "OK", "is_error": bool(result.get("isError"))}
+    except Exception as e:
+        return {"type": "tool_result", "tool_use_id": block.id, "content": str(e), "is_error": True}
+
+
+def _document_key(arguments):
+    """ツール呼び出しの対象文書（文書を指定しない呼び出しは None にまとめる）"""
+    for name in DOCUMENT_ARGUMENTS:
+        if isinstance(arguments, dict) and arguments.get(name):
+            return str(arguments[name])
+    return None
+
+
+def call_tools(session, calls, timeout=DEFAULT_CALL_TIMEOUT):
+    """[(ツール名, 引数), ...] を実行し、呼び出しごとの Future を同じ順で返す
+
+    Word文書の作成→見出し→段落→保存のように順序に意味があるため、同じ文書への呼び出しは
+    モデルが出した順に前の応答を待ってから送る。別の文書への呼び出しの列だけを並行して進める。
+    待ち時間（timeout）を超えた列の残りの呼び出しは送らずに失敗とする。
+    """
+    deadline = time.monotonic() + timeout
+    groups = {}
+    for index, (_, arguments) in enumerate(calls):
+        groups.setdefault(_document_key(arguments), []).append(index)
+    futures = [None] * len(calls)
+
+    def run_group(indices):
+        for position, index in enumerate(indices):
+            name, arguments = calls[index]
+            futures[index] = session.call_tool_async(name, arguments)
+            done, _ = wait([futures[index]], timeout=max(0.0, deadline - time.monotonic()))
+            if not done:
+                for skipped in indices[position + 1:]:
+                    futures[skipped] = Future()
+                    futures[skipped].set_exception(MCPBridgeError(
+                        f"{session.name}: 前の呼び出しが{timeout}秒以内に終わらなかったため {calls[skipped][0]} を送りませんでした"))
+                return
+
+    if len(groups) == 1:
+        run_group(next(iter(groups.values())))
+    else:
+        with ThreadPoolExecutor(max_workers=len(groups)) as executor:
+            list(executor.map(run_group, groups.values()))
+    return futures
+
+
+def run_tool_loop(label, client, session, messages, max_turns=DEFAULT_MAX_TURNS,
+                  timeout=DEFAULT_CALL_TIMEOUT, **params):
+    """ツール使用ループ: モデルのツール呼び出しをローカルのMCPセッションで実行して結果を返す
+
+    1回の応答に含まれるツール呼び出しは、同じ文書へのものは順番に、別の文書へのものは並行して実行する。
+    (最終テキスト, 使用ツール名, 各往復のレスポンス) を返す。
+    """
+    from api_scheduler import get_scheduler
+    from cassette import to_plain
+
+    tools = tool_definitions(session)
+    messages = list(messages)
+    used_tools = []
+    responses = []
+    for _ in range(max_turns):
+        response = get_scheduler().call(label, client.messages.create, tools=tools, messages=messages, **params)
+        responses.append(response)
+        calls = [block for block in response.content if block.type == "tool_use"]
+        if not calls:
+            text = "".join(block.text for block in response.content if block.type == "text")
+            return text, used_tools, responses
+        started = time.perf_counter()
+        futures = call_tools(session, [(block.name, to_plain(block.input)) for block in calls], timeout)
+        results = [_tool_result(block, future) for block, future in zip(calls, futures)]
+        used_tools.extend(block.name for block in calls)
+        failed = sum(1 for result in results if result["is_error"])
+        print(f"🔧 [{session.name}] {', '.join(block.name for block in calls)} "
+              f"({time.perf_counter() - started:.2f}秒{f', 失敗 {failed}' if failed else ''})")
+        messages += [
+            {"role": "assistant", "content": [to_plain(block) for block in response.content]},
+            {"role": "user", "content": results},
+        ]
+    raise MCPBridgeError(f"{session.name}: ツール使用が{max_turns}往復で終わりませんでした")
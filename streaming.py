@@ -0,0 +1,56 @@
+import sys
+import time
+
+
+def stream_message(client, params, tool_prefix="🔧 [MCP Tool]"):
+    """beta.messages.stream でレスポンスを受信しながら表示する
+
+    テキスト差分と mcp_tool_use ブロックを届いた順に出力し、
+    (最終メッセージ, 最初のトークンまでの秒数, 合計秒数) を返す。
+    """
+    started = time.perf_counter()
+    state = {"first_token_at": None, "at_line_start": True, "content_started": False}
+    try:
+        message = _consume_stream(client, params, tool_prefix, state)
+    except Exception as e:
+        # 内容を受信し始めた後のエラーは、再試行すると同じ内容が二重に表示されるため再試行させない
+        if state["content_started"]:
+            e.stream_started = True
+            if not state["at_line_start"]:
+                print()
+        raise
+
+    if not state["at_line_start"]:
+        print()
+    finished = time.perf_counter()
+    ttft = (state["first_token_at"] or finished) - started
+    return message, ttft, finished - started
+
+
+def _consume_stream(client, params, tool_prefix, state):
+    """イベントを表示しながら受信し、最終メッセージを返す（表示状況は state に記録）"""
+    with client.beta.messages.stream(**params) as stream:
+        for event in stream:
+            if event.type.startswith("content_block_"):
+                state["content_started"] = True
+            if event.type == "content_block_start":
+                block = event.content_block
+                if block.type == "mcp_tool_use":
+                    if state["first_token_at"] is None:
+                        state["first_token_at"] = time.perf_counter()
+                    if not state["at_line_start"]:
+                        print()
+                    print(f"{tool_prefix} {block.name}", flush=True)
+                    state["at_line_start"] = True
+            elif event.type == "content_block_delta" and event.delta.type == "text_delta":
+                if state["first_token_at"] is None:
+                    state["first_token_at"] = time.perf_counter()
+                sys.stdout.write(event.delta.text)
+                sys.stdout.flush()
+                state["at_line_start"] = event.delta.text.endswith("\n")
+        return stream.get_final_message()
+
+
+def print_stream_timing(ttft, total):
+    """ストリーミングの計測結果を表示"""
+    print(f"⚡ 最初のトークンまで: {ttft:.2f}秒 / 合計: {total:.2f}秒")
@@ -0,0 +1,197 @@
+import json
+
+from cassette import to_plain
+from minutes_chunker import parse_partial_analysis
+
+# 構造分析の結果（チャンクごとの部分結果・統合結果も同じ形）
+ANALYSIS_TOOL = {
+    "name": "record_minutes_analysis",
+    "description": "議事録から抽出した構造情報を記録する。該当が無い項目は空文字・空配列にする。",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "meeting": {
+                "type": "object",
+                "properties": {
+                    "title": {"type": "string"},
+                    "date": {"type": "string"},
+                    "participants": {"type": "array", "items": {"type": "string"}},
+                    "duration": {"type": "string"},
+                    "location": {"type": "string"},
+                },
+                "required": ["title", "date", "participants", "duration"],
+            },
+            "sections": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "title": {"type": "string"},
+                        "summary": {"type": "string", "description": "40字以内の要約"},
+                    },
+                    "required": ["title", "summary"],
+                },
+            },
+            "decisions": {"type": "array", "items": {"type": "string"}},
+            "action_items": {"type": "array", "items": {"type": "string"}},
+            "discussion_points": {"type": "array", "items": {"type": "string"}, "maxItems": 5,
+                                  "description": "主な論点（最大5件）"},
+        },
+        "required": ["meeting", "sections", "decisions", "action_items", "discussion_points"],
+    },
+}
+
+# Word文書生成プラン（Word MCPへの指示とコマンド一覧の表示に使う）
+PLAN_TOOL = {
+    "name": "record_word_plan",
+    "description": "Word MCPサーバーで実行するWord文書生成プランを記録する。",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "file_name": {"type": "string", "description": "議事録_[会議名]_[日付].docx"},
+            "margins_cm": {
+                "type": "object",
+                "properties": {name: {"type": "number", "minimum": 0, "maximum": 10}
+                               for name in ("top", "bottom", "left", "right")},
+            },
+            "font": {
+                "type": "object",
+                "properties": {"name": {"type": "string"}, "size": {"type": "number", "minimum": 6, "maximum": 72}},
+            },
+            "cover": {
+                "type": "object",
+                "properties": {
+                    "title": {"type": "string"},
+                    "subtitle": {"type": "string"},
+                    "meeting_info": {"type": "string"},
+                },
+                "required": ["title"],
+            },
+            "outline": {
+                "type": "array",
+                "description": "本文の章立て（章見出しのみ。議題ごとの見出しは議事録の見出しをそのまま使う）",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "heading": {"type": "string"},
+                        "content": {"type": "string",
+                                    "enum": ["meeting_table", "minutes", "decisions_table", "action_items_table"]},
+                    },
+                    "required": ["heading", "content"],
+                },
+            },
+            "finishing": {
+                "type": "object",
+                "properties": {
+                    "header": {"type": "string"},
+                    "footer": {"type": "string"},
+                    "page_numbers": {"type": "boolean"},
+                    "toc": {"type": "boolean"},
+                },
+            },
+        },
+        "required": ["file_name", "cover", "outline"],
+    },
+}
+
+
+# 構造分析の出力上限（400行程度の議事録で2,000トークンを超えるため、チャンク予算の議事録でも切れない値）
+ANALYSIS_MAX_TOKENS = 8000
+
+
+def tool_params(tool):
+    """指定したツールの呼び出しを強制するリクエストパラメータ（スキーマに沿ったJSONだけが返る）"""
+    return {"tools": [tool], "tool_choice": {"type": "tool", "name": tool["name"]}}
+
+
+def tool_input(response, tool):
+    """レスポンスの tool_use ブロックから入力（辞書）を取り出す
+
+    tool_use が無い応答（以前のカセットなど）は本文中のJSONを読む。
+    出力上限で途中終了した応答や、入力が空の応答は ValueError（呼び出し側で失敗として扱う）。
+    """
+    if getattr(response, "stop_reason", None) == "max_tokens":
+        raise ValueError(f"{tool['name']} の出力が上限（max_tokens）で途中終了しました")
+    texts = []
+    result = None
+    for block in response.content:
+        if block.type == "tool_use" and block.name == tool["name"]:
+            result = to_plain(block.input)  # カセット再生時は SimpleNamespace
+            break
+        if block.type == "text":
+            texts.append(block.text)
+    else:
+        result = parse_partial_analysis("".join(texts))
+    if not result:
+        raise ValueError(f"{tool['name']} の結果が返されませんでした")
+    return result
+
+
+def compact_json(value):
+    """後続プロンプトに埋め込むための空白なしJSON"""
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def plan_context(analysis):
+    """プラン生成に渡す構造分析結果（章立てに必要な項目だけ。要約と論点は件数のみ）"""
+    analysis = analysis or {}
+    return {
+        "meeting": analysis.get("meeting") or {},
+        "sections": [section.get("title", "") if isinstance(section, dict) else section
+                     for section in analysis.get("sections") or []],
+        "decisions": analysis.get("decisions") or [],
+        "action_items": analysis.get("action_items") or [],
+        "discussion_point_count": len(analysis.get("discussion_points") or []),
+    }
+
+
+# outline の content と、その章に内容を入れるコマンドの対応
+CONTENT_COMMANDS = {
+    "meeting_table": "add_meeting_table",
+    "minutes": "add_minutes",
+    "decisions_table": "add_decisions_table",
+    "action_items_table": "add_action_items_table",
+}
+
+
+def plan_commands(plan):
+    """生成プランを Word MCP と同じ名前のコマンド列 [(コマンド, 引数), ...] に展開（引数なしは None）"""
+    cover = plan.get("cover") or {}
+    finishing = plan.get("finishing") or {}
+    commands = [("create_document", plan.get("file_name", ""))]
+    if plan.get("margins_cm"):
+        commands.append(("set_page_margins", plan["margins_cm"]))
+    if plan.get("font"):
+        commands.append(("set_font_default", plan["font"]))
+    commands.append(("add_title", cover.get("title", "")))
+    if cover.get("subtitle"):
+        commands.append(("add_subtitle", cover["subtitle"]))
+    if cover.get("meeting_info"):
+        commands.append(("add_meeting_info", cover["meeting_info"]))
+    commands.append(("add_page_break", None))
+    if finishing.get("toc"):
+        commands += [("add_table_of_contents", None), ("add_page_break", None)]
+    for item in plan.get("outline") or []:
+        commands.append(("add_heading1", item.get("heading", "")))
+        commands.append((CONTENT_COMMANDS.get(item.get("content"), item.get("content")), None))
+    if finishing.get("header"):
+        commands.append(("set_header", finishing["header"]))
+    if finishing.get("footer"):
+        commands.append(("set_footer", finishing["footer"]))
+    if finishing.get("page_numbers"):
+        commands.append(("add_page_numbers", None))
+    commands.append(("save_document", None))
+    return commands
+
+
+def format_plan(plan):
+    """生成プランを Word MCP のコマンド形式の一覧として表示用に整形"""
+    lines = ["## 🏗️ Word文書生成手順"]
+    for name, argument in plan_commands(plan):
+        if argument is None:
+            lines.append(name)
+        elif isinstance(argument, str):
+            lines.append(f"{name}: \"{argument}\"")
+        else:
+            lines.append(f"{name}: {compact_json(argument)}")
+    return "\n".join(lines)
@@ -0,0 +1,246 @@
+import os
+import sys
+import json
+import math
+import time
+import threading
+
+from cli_args import pop_option
+
+DEFAULT_TELEMETRY_PATH = os.path.join(
+    os.path.expanduser("~"), ".cache", "mcp_business_suite", "telemetry.ndjson"
+)
+
+# モデルごとの料金（USD / 100万トークン）: 入力, 出力, キャッシュ書き込み, キャッシュ読み込み
+PRICING = {
+    "claude-sonnet-4-20250514": (3.00, 15.00, 3.75, 0.30),
+    "claude-opus-4-20250514": (15.00, 75.00, 18.75, 1.50),
+    "claude-3-5-haiku-20241022": (0.80, 4.00, 1.00, 0.08),
+}
+
+TOKEN_FIELDS = ("input_tokens", "output_tokens", "cache_creation_input_tokens", "cache_read_input_tokens")
+
+_write_lock = threading.Lock()
+
+
+def telemetry_path():
+    return os.getenv("MCP_TELEMETRY_PATH", DEFAULT_TELEMETRY_PATH)
+
+
+def telemetry_enabled():
+    return os.getenv("MCP_TELEMETRY", "1") not in ("0", "false", "off")
+
+
+def estimate_cost(model, usage):
+    """トークン数から概算コスト(USD)を求める（料金表にないモデルはNone）"""
+    prices = PRICING.get(model)
+    if prices is None:
+        return None
+    return round(sum(usage.get(name, 0) * price for name, price in zip(TOKEN_FIELDS, prices)) / 1_000_000, 6)
+
+
+def usage_of(response):
+    """レスポンスの usage からトークン数の辞書を作る（プロンプトキャッシュの読み書きを含む）"""
+    usage = getattr(response, "usage", None)
+    return {name: getattr(usage, name, None) or 0 for name in TOKEN_FIELDS}
+
+
+def print_usage(response):
+    """1回の呼び出しのトークン数を表示"""
+    usage = usage_of(response)
+    print(f"🧮 トークン: 入力 {usage['input_tokens']:,} / 出力 {usage['output_tokens']:,} / "
+          f"キャッシュ書込 {usage['cache_creation_input_tokens']:,} / "
+          f"キャッシュ読込 {usage['cache_read_input_tokens']:,}")
+
+
+def record(label, model, latency, response=None, error=None, cost_factor=1.0, **extra):
+    """API呼び出し1回分の記録をNDJSONに追記し、記録した辞書を返す
+
+    label はユースケース名やパイプラインのステージ名。error には例外を渡す。
+    cost_factor は料金表に掛ける係数（Message Batches API は 0.5）。
+    """
+    usage = usage_of(response) if response is not None else {name: 0 for name in TOKEN_FIELDS}
+    cost = estimate_cost(model, usage)
+    entry = {
+        "ts": round(time.time(), 3),
+        "label": label,
+        "model": model,
+        "latency": round(latency, 4),
+        "status": "error" if error is not None else "ok",
+        "error": type(error).__name__ if error is not None else None,
+        "stop_reason": getattr(response, "stop_reason", None),
+        **usage,
+        "cost_usd": round(cost * cost_factor, 6) if cost is not None else None,
+    }
+    entry.update(extra)
+    if not telemetry_enabled():
+        return entry
+
+    path = telemetry_path()
+    line = json.dumps(entry, ensure_ascii=False) + "\n"
+    with _write_lock:
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(line)
+        except OSError as e:
+            print(f"⚠️  テレメトリを書き込めません: {e}")
+    return entry
+
+
+def load_records(path=None, since=None):
+    """NDJSONから記録を読み込む（since はUNIX時刻、壊れた行は読み飛ばす）"""
+    path = path or telemetry_path()
+    records = []
+    try:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if since is None or entry.get("ts", 0) >= since:
+                    records.append(entry)
+    except FileNotFoundError:
+        pass
+    return records
+
+
+def percentile(values, q):
+    """最近傍順位法でパーセンタイルを求める（値が無ければNone）"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def summarize(records):
+    """ラベル（ユースケース・ステージ）ごとに件数・レイテンシ・トークン・コストを集計"""
+    groups = {}
+    for entry in records:
+        groups.setdefault(entry.get("label") or "(unknown)", []).append(entry)
+
+    summary = {}
+    for label, entries in groups.items():
+        latencies = [entry["latency"] for entry in entries if entry.get("status") == "ok"]
+        costs = [entry.get("cost_usd") or 0 for entry in entries]
+        summary[label] = {
+            "calls": len(entries),
+            "errors": sum(1 for entry in entries if entry.get("status") != "ok"),
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "total_latency": round(sum(entry.get("latency", 0) for entry in entries), 3),
+            **{name: sum(entry.get(name, 0) for entry in entries) for name in TOKEN_FIELDS},
+            "cost_usd": round(sum(costs), 4),
+        }
+    return dict(sorted(summary.items(), key=lambda item: item[1]["cost_usd"], reverse=True))
+
+
+def print_stats(summary):
+    """集計結果を表示"""
+    print("📈 API呼び出しテレメトリ（ユースケース・ステージ別）")
+    print("="*96)
+    if not summary:
+        print("  記録がありません")
+        return
+    print(f"{'ラベル':<26} {'回数':>5} {'失敗':>4} {'p50':>8} {'p95':>8} "
+          f"{'入力':>9} {'出力':>8} {'C書込':>8} {'C読込':>9} {'USD':>9}")
+    print("-"*96)
+    totals = {"calls": 0, "cost_usd": 0.0}
+    for label, stats in summary.items():
+        p50 = f"{stats['p50']:.2f}s" if stats["p50"] is not None else "-"
+        p95 = f"{stats['p95']:.2f}s" if stats["p95"] is not None else "-"
+        print(f"{label:<26} {stats['calls']:>5} {stats['errors']:>4} {p50:>8} {p95:>8} "
+              f"{stats['input_tokens']:>9,} {stats['output_tokens']:>8,} "
+              f"{stats['cache_creation_input_tokens']:>8,} {stats['cache_read_input_tokens']:>9,} "
+              f"{stats['cost_usd']:>9.4f}")
+        totals["calls"] += stats["calls"]
+        totals["cost_usd"] += stats["cost_usd"]
+    print("-"*96)
+    print(f"合計: {totals['calls']}回 / 概算 ${totals['cost_usd']:.4f}")
+
+
+def _labels(**labels):
+    return ",".join(f'{key}="{str(value).replace(chr(34), chr(39))}"' for key, value in labels.items())
+
+
+def export_prometheus(records, output_path):
+    """Prometheusのテキスト形式（node_exporter の textfile collector 向け）で書き出す"""
+    calls = {}
+    tokens = {}
+    costs = {}
+    latencies = {}
+    for entry in records:
+        label = entry.get("label") or "(unknown)"
+        model = entry.get("model") or "(unknown)"
+        key = (label, model, entry.get("status", "ok"))
+        calls[key] = calls.get(key, 0) + 1
+        for name in TOKEN_FIELDS:
+            tokens[(label, model, name)] = tokens.get((label, model, name), 0) + entry.get(name, 0)
+        costs[(label, model)] = costs.get((label, model), 0.0) + (entry.get("cost_usd") or 0)
+        latencies.setdefault(label, []).append(entry.get("latency", 0))
+
+    lines = [
+        "# HELP mcp_llm_calls_total API呼び出し回数",
+        "# TYPE mcp_llm_calls_total counter",
+    ]
+    lines += [f"mcp_llm_calls_total{{{_labels(label=l, model=m, status=s)}}} {count}"
+              for (l, m, s), count in sorted(calls.items())]
+    lines += ["# HELP mcp_llm_tokens_total トークン数", "# TYPE mcp_llm_tokens_total counter"]
+    lines += [f"mcp_llm_tokens_total{{{_labels(label=l, model=m, type=t)}}} {count}"
+              for (l, m, t), count in sorted(tokens.items())]
+    lines += ["# HELP mcp_llm_cost_usd_total 概算コスト(USD)", "# TYPE mcp_llm_cost_usd_total counter"]
+    lines += [f"mcp_llm_cost_usd_total{{{_labels(label=l, model=m)}}} {cost:.6f}"
+              for (l, m), cost in sorted(costs.items())]
+    lines += ["# HELP mcp_llm_latency_seconds API呼び出しのレイテンシ", "# TYPE mcp_llm_latency_seconds summary"]
+    for label, values in sorted(latencies.items()):
+        for q in (0.5, 0.95):
+            lines.append(f"mcp_llm_latency_seconds{{{_labels(label=label, quantile=q)}}} "
+                         f"{percentile(values, q * 100):.4f}")
+        lines.append(f"mcp_llm_latency_seconds_sum{{{_labels(label=label)}}} {sum(values):.4f}")
+        lines.append(f"mcp_llm_latency_seconds_count{{{_labels(label=label)}}} {len(values)}")
+
+    temp_path = f"{output_path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    os.replace(temp_path, output_path)
+    return len(lines)
+
+
+def export_ndjson(records, output_path):
+    """記録をNDJSONとして書き出す（期間で絞り込んだ記録の受け渡し用）"""
+    with open(output_path, "w", encoding="utf-8") as f:
+        for entry in records:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    return len(records)
+
+
+def main(args=None):
+    args = list(sys.argv[1:] if args is None else args)
+    hours = pop_option(args, "--since", None, float)
+    since = time.time() - hours * 3600 if hours else None
+    prometheus_path = pop_option(args, "--prometheus")
+    ndjson_path = pop_option(args, "--ndjson")
+    records = load_records(since=since)
+
+    if args[:1] == ["stats"]:
+        print(f"📄 {telemetry_path()} ({len(records)}件{f', 直近{hours}時間' if hours else ''})")
+        print_stats(summarize(records))
+    elif args[:1] == ["export"] and (prometheus_path or ndjson_path):
+        if prometheus_path:
+            export_prometheus(records, prometheus_path)
+            print(f"✅ Prometheus形式で書き出しました: {prometheus_path} ({len(records)}件)")
+        if ndjson_path:
+            export_ndjson(records, ndjson_path)
+            print(f"✅ NDJSONで書き出しました: {ndjson_path} ({len(records)}件)")
+    else:
+        print("📖 telemetry.py - API呼び出しテレメトリ")
+        print("  python telemetry.py stats [--since 24]")
+        print("  python telemetry.py export --prometheus metrics.prom [--ndjson out.ndjson] [--since 24]")
+        print(f"💡 記録先は環境変数 MCP_TELEMETRY_PATH（デフォルト: {DEFAULT_TELEMETRY_PATH}）、MCP_TELEMETRY=0 で無効")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,17 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture(autouse=True)
+def isolated_state(tmp_path, monkeypatch):
+    """テレメトリ・キャッシュ・ヘルス記録をテストごとの一時ディレクトリに書き出す"""
+    monkeypatch.setenv("MCP_TELEMETRY_PATH", str(tmp_path / "telemetry.ndjson"))
+    monkeypatch.setenv("MCP_CACHE_PATH", str(tmp_path / "cache.sqlite3"))
+    monkeypatch.setenv("MCP_HEALTH_PATH", str(tmp_path / "health.json"))
+    monkeypatch.delenv("MCP_CASSETTE", raising=False)
+    monkeypatch.chdir(tmp_path)
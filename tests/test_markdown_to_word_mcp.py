@@ -0,0 +1,120 @@
+import json
+import os
+
+from fake_client import FakeAnthropic
+from markdown_to_word_mcp import MarkdownToWordMCP
+from structured_output import ANALYSIS_TOOL
+
+# 見出し・日時・参加者の無い議事録（ローカル解析の信頼度が低く、LLMでの構造分析が呼ばれる）
+LOW_CONFIDENCE_MINUTES = "予算について話し合った。\n来期の方針は次回までに整理する。\n"
+
+
+class FailingAnalysisClient(FakeAnthropic):
+    """構造分析（record_minutes_analysis の強制呼び出し）だけが失敗するフェイク"""
+
+    def __init__(self):
+        super().__init__(latency=0, jitter=0)
+        create = self.messages.create
+
+        def failing_create(**params):
+            if (params.get("tool_choice") or {}).get("name") == ANALYSIS_TOOL["name"]:
+                raise RuntimeError("analysis unavailable")
+            return create(**params)
+
+        self.messages.create = failing_create
+
+
+def test_document_is_written_when_analysis_call_fails(tmp_path):
+    source = tmp_path / "minutes.md"
+    source.write_text(LOW_CONFIDENCE_MINUTES, encoding="utf-8")
+    converter = MarkdownToWordMCP(client=FailingAnalysisClient())
+
+    output = converter.process_markdown_to_word(str(source), output_path=str(tmp_path / "out.docx"))
+
+    assert output == str(tmp_path / "out.docx")
+    assert os.path.isfile(output)
+
+
+def test_local_word_is_used_when_plan_execution_fails(tmp_path, monkeypatch):
+    source = tmp_path / "minutes.md"
+    source.write_text(LOW_CONFIDENCE_MINUTES, encoding="utf-8")
+    converter = MarkdownToWordMCP(client=FailingAnalysisClient())
+    monkeypatch.setattr(converter, "execute_plan_locally", lambda *args: None)
+
+    output = converter.process_markdown_to_word(str(source), output_path=str(tmp_path / "out.docx"))
+
+    assert output and os.path.isfile(output)
+
+
+
+# 見出し・日時・参加者がそろった議事録（ローカル解析の信頼度が十分）
+HIGH_CONFIDENCE_MINUTES = """# 定例会議
+- 日時: 2025年1月10日
+- 参加者: 田中、佐藤
+
+## 議題
+予算について話し合った。
+
+## 決定事項
+- 来期予算を承認
+
+## アクションアイテム
+- 田中: 見積もりを更新する
+"""
+
+
+def _document_texts(path):
+    from docx import Document
+
+    doc = Document(path)
+    cells = [cell.text for table in doc.tables for row in table.rows for cell in row.cells]
+    return [paragraph.text for paragraph in doc.paragraphs] + cells
+
+
+def _incremental_converter(monkeypatch, analysis):
+    converter = MarkdownToWordMCP(client=FakeAnthropic(latency=0, jitter=0))
+    calls = []
+
+    def analyze_chunk(chunk, total):
+        calls.append(chunk)
+        return analysis
+
+    monkeypatch.setattr(converter, "_analyze_chunk", analyze_chunk)
+    return converter, calls
+
+
+def test_incremental_analysis_fills_the_meeting_table(tmp_path, monkeypatch):
+    source = tmp_path / "minutes.md"
+    source.write_text(LOW_CONFIDENCE_MINUTES, encoding="utf-8")
+    output = str(tmp_path / "out.docx")
+    converter, calls = _incremental_converter(
+        monkeypatch, {"meeting": {"title": "予算会議", "participants": ["田中"]}})
+
+    assert converter.process_markdown_to_word_incremental(str(source), output_path=output) == output
+    assert len(calls) == 1
+    assert "予算会議" in _document_texts(output)
+    assert "田中" in _document_texts(output)
+
+    # 分析結果が変わったら、本文が同じでも文書を作り直す
+    converter, calls = _incremental_converter(
+        monkeypatch, {"meeting": {"title": "予算会議（改訂）", "participants": ["田中"]}})
+    with open(f"{output}.sections.json", encoding="utf-8") as manifest_file:
+        manifest = json.load(manifest_file)
+    manifest["analyses"] = {}
+    with open(f"{output}.sections.json", "w", encoding="utf-8") as manifest_file:
+        json.dump(manifest, manifest_file, ensure_ascii=False)
+
+    assert converter.process_markdown_to_word_incremental(str(source), output_path=output) == output
+    assert len(calls) == 1
+    assert "予算会議（改訂）" in _document_texts(output)
+
+
+def test_incremental_skips_llm_analysis_when_local_confidence_is_high(tmp_path, monkeypatch):
+    source = tmp_path / "minutes.md"
+    source.write_text(HIGH_CONFIDENCE_MINUTES, encoding="utf-8")
+    output = str(tmp_path / "out.docx")
+    converter, calls = _incremental_converter(monkeypatch, {"meeting": {"title": "使われない"}})
+
+    assert converter.process_markdown_to_word_incremental(str(source), output_path=output) == output
+    assert calls == []
+    assert "定例会議" in _document_texts(output)
@@ -0,0 +1,25 @@
+import pytest
+
+from mcp_service import MCPService
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setenv("MCP_CLIENT", "fake")
+    return MCPService()
+
+
+@pytest.mark.parametrize("request_body", [[1], "x", {"id": 1}, {"id": 1, "method": 5}])
+def test_request_that_is_not_an_object_with_a_method_is_invalid(service, request_body):
+    assert service.dispatch(request_body)["error"]["code"] == -32600
+
+
+def test_only_argument_binding_failures_are_invalid_params(service):
+    def broken():
+        raise TypeError("inside the method")
+
+    service.methods["broken"] = broken
+
+    assert service.dispatch({"id": 1, "method": "ping", "params": {"x": 1}})["error"]["code"] == -32602
+    assert service.dispatch({"id": 2, "method": "broken"})["error"]["code"] == -32000
+    assert service.dispatch({"id": 3, "method": "ping"})["result"]["pong"] is True
@@ -0,0 +1,23 @@
+from minutes_analyzer import analyze_minutes
+
+NESTED_MINUTES = """# 定例会議
+
+## 決定事項
+- 予算を承認
+  - 上限は500万円
+  - 四半期ごとに見直す
+- 次回は2月に開催
+
+## アクションアイテム
+- [ ] 田中: 見積もりを更新
+\t- 期限: 1/20
+- 佐藤: 資料を共有
+"""
+
+
+def test_indented_list_items_continue_their_parent_item():
+    info = analyze_minutes(NESTED_MINUTES.splitlines(keepends=True))
+
+    assert info.decisions == ["予算を承認 / 上限は500万円 / 四半期ごとに見直す", "次回は2月に開催"]
+    assert info.action_items == ["田中: 見積もりを更新 / 期限: 1/20", "佐藤: 資料を共有"]
+    assert [section["items"] for section in info.sections] == [2, 2]
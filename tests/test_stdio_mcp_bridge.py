@@ -0,0 +1,50 @@
+import os
+import sys
+from types import SimpleNamespace
+
+from docx import Document
+
+from stdio_mcp_bridge import StdioMCPSession, run_tool_loop
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class ScriptedMessages:
+    """決めておいたレスポンスを順に返す messages"""
+
+    def __init__(self, responses):
+        self.offline = True
+        self.responses = list(responses)
+
+    def create(self, **params):
+        return self.responses.pop(0)
+
+
+def _tool_use(index, name, **arguments):
+    return SimpleNamespace(type="tool_use", id=f"toolu_{index}", name=name, input=arguments)
+
+
+def test_calls_for_the_same_document_run_in_the_models_order(tmp_path):
+    session = StdioMCPSession([sys.executable, os.path.join(ROOT, "mock_word_mcp_server.py"), "--jitter", "0.05"],
+                              name="word").start()
+    try:
+        for attempt in range(3):
+            filename = str(tmp_path / f"order_{attempt}.docx")
+            calls = [
+                _tool_use(0, "create_document", filename=filename),
+                _tool_use(1, "add_heading", filename=filename, text="H1", level=1),
+                _tool_use(2, "add_paragraph", filename=filename, text="P1"),
+                _tool_use(3, "add_paragraph", filename=filename, text="P2"),
+                _tool_use(4, "save_document", filename=filename),
+            ]
+            client = SimpleNamespace(messages=ScriptedMessages([
+                SimpleNamespace(content=calls, stop_reason="tool_use"),
+                SimpleNamespace(content=[SimpleNamespace(type="text", text="done")], stop_reason="end_turn"),
+            ]))
+            text, used_tools, _ = run_tool_loop("test", client, session, [{"role": "user", "content": "go"}])
+
+            assert text == "done"
+            assert used_tools == [call.name for call in calls]
+            assert [p.text for p in Document(filename).paragraphs] == ["H1", "P1", "P2"]
+    finally:
+        session.close()
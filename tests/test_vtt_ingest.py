@@ -0,0 +1,24 @@
+from vtt_ingest import iter_cues
+
+# 空行を挟まずに2つ目のキュー（キューID付き）が続くブロック
+VTT_WITHOUT_BLANK_LINES = """WEBVTT
+
+1
+00:00:01.000 --> 00:00:03.000
+<v 田中 太郎>予算案を説明します。
+2
+00:00:03.500 --> 00:00:05.000
+<v 佐藤 花子>承知しました。
+00:00:05.000 --> 00:00:06.000
+<v 佐藤 花子>質問があります。
+"""
+
+
+def test_each_timing_line_starts_a_new_cue():
+    cues = list(iter_cues(VTT_WITHOUT_BLANK_LINES.splitlines()))
+
+    assert [(cue.start, cue.end, cue.speaker, cue.text) for cue in cues] == [
+        (1.0, 3.0, "田中 太郎", "予算案を説明します。"),
+        (3.5, 5.0, "佐藤 花子", "承知しました。"),
+        (5.0, 6.0, "佐藤 花子", "質問があります。"),
+    ]
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Teams などのWebVTT字幕を、話者ごとの発言録Markdownに圧縮する
+
+VTTの大半はタイムスタンプ・キューID・繰り返される話者タグのため、LLMに渡す前に
+キューを1つずつ読みながら同じ話者の連続したキューを1つの発言にまとめ、
+フィラー（えー・あのー・um など）と重複行を取り除く。
+
+    python vtt_ingest.py meeting.vtt [-o meeting_transcript.md]
+"""
+
+import os
+import re
+import sys
+from collections import namedtuple
+
+from minutes_chunker import estimate_tokens
+
+Cue = namedtuple("Cue", "start end speaker text")
+Turn = namedtuple("Turn", "speaker start end text")
+
+TIMING_PATTERN = re.compile(
+    r'^\s*((?:\d+:)?\d{1,2}:\d{2}[.,]\d{3})\s+-->\s+((?:\d+:)?\d{1,2}:\d{2}[.,]\d{3})')
+# キューID（"12"、Teams の "6b1d...-0/12-1" など数字を含む英数字の1語）
+CUE_ID_PATTERN = re.compile(r'^\s*(?=[^\s]*\d)[A-Za-z0-9_.-]+(?:/[A-Za-z0-9_.-]+)*\s*$')
+VOICE_PATTERN = re.compile(r'<v(?:\.[^\s>]*)?\s+([^>]+)>')
+TAG_PATTERN = re.compile(r'</?[^>]+>')
+SPEAKER_PREFIX_PATTERN = re.compile(r'^([^:：\s][^:：]{0,30}?)\s*[:：]\s+(?=\S)')
+# <v> タグの無い「名前: 発言」を話者とみなすのは、姓名のように空白で区切った2〜3語の場合だけ
+# （「議題: 」「Note: 」のような見出し語を話者にしない。<v> で一度出た名前は1語でも話者とみなす）
+NAME_WORD = r'(?:[A-Z][A-Za-z.\'-]*|[\u3040-\u30ff\u4e00-\u9fff々]+)'
+NAME_PATTERN = re.compile(rf'^{NAME_WORD}(?:[ 　]{NAME_WORD}){{1,2}}$')
+# 長音を含むフィラーは語中でもそのまま除き、普通の語にもなる「あの」「まあ」「うん」や英語は
+# 前後が句読点・空白のときだけ除く
+FILLER_PATTERN = re.compile(
+    r'(?:え[ーぇ]+と?|えっと|あ[ーぁ]+|あのー+|そのー+|うーん|ん[ーっ]+'
+    r'|(?:^|(?<=[、。,.!?！？\s]))(?:あの|まあ|うん|(?i:um+|uh+|erm|er|ah+|hmm+))(?=[、。,.!?！？…\s]|$))'
+    r'[、,。.…\s]*'
+)
+# これより短い発言は、直前の発言に含まれていても重複とみなさない（「はい」などの相づち）
+MIN_DUPLICATE_CHARS = 10
+# 前のキューの末尾と次のキューの先頭で重なる部分（字幕の区切りで繰り返された語）として除く最小の長さ
+MIN_OVERLAP_CHARS = 3
+ASCII_WORD = re.compile(r'[A-Za-z0-9]')
+SPACE_PATTERN = re.compile(r'\s+')
+SKIPPED_BLOCKS = ("WEBVTT", "NOTE", "STYLE", "REGION")
+UNKNOWN_SPEAKER = "(話者不明)"
+
+# 発言録Markdownの出力先の接尾辞（元の .vtt と同じ場所に作る）
+TRANSCRIPT_SUFFIX = "_transcript.md"
+
+
+def transcript_path_for(vtt_path):
+    return f"{os.path.splitext(vtt_path)[0]}{TRANSCRIPT_SUFFIX}"
+
+
+def parse_timestamp(value):
+    """'01:02:03.456' / '02:03.456' を秒に変換"""
+    *units, seconds = value.replace(",", ".").split(":")
+    total = 0
+    for unit in units:
+        total = total * 60 + int(unit)
+    return total * 60 + float(seconds)
+
+
+def format_timestamp(seconds):
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    return f"{hours}:{rest // 60:02d}:{rest % 60:02d}" if hours else f"{rest // 60}:{rest % 60:02d}"
+
+
+class VTTStats:
+    """取り込みの集計（入力・出力のバイト数とトークン数、除去した項目の数）"""
+
+    def __init__(self):
+        self.input_bytes = 0
+        self.input_tokens = 0
+        self.output_bytes = 0
+        self.output_tokens = 0
+        self.cues = 0
+        self.turns = 0
+        self.fillers = 0
+        self.duplicates = 0
+        self.speakers = []
+
+    def add_input(self, line):
+        self.input_bytes += len(line.encode("utf-8")) + 1
+        self.input_tokens += estimate_tokens(line) + 1
+
+    def add_output(self, line):
+        self.output_bytes += len(line.encode("utf-8")) + 1
+        self.output_tokens += estimate_tokens(line) + 1
+
+
+def iter_cues(lines, stats=None):
+    """VTTの行イテラブルからキューを1つずつ返す（キューID・NOTE/STYLE ブロックは読み飛ばす）"""
+    block = []
+    known_speakers = set()
+    for raw_line in lines:
+        line = raw_line.rstrip("\r\n").lstrip("﻿")
+        if stats is not None:
+            stats.add_input(line)
+        if line.strip():
+            block.append(line)
+            continue
+        yield from _parse_block(block, known_speakers)
+        block = []
+    yield from _parse_block(block, known_speakers)
+
+
+def _parse_block(block, known_speakers):
+    """空行で区切られたブロックのキューを返す
+
+    空行を挟まずにキューが続く字幕もあるため、タイミング行ごとに新しいキューとし、
+    タイミング行の直前のキューIDの行は本文に含めない。
+    """
+    if not block or block[0].split(" ", 1)[0].split("\t", 1)[0] in SKIPPED_BLOCKS:
+        return
+    timings = [index for index, line in enumerate(block) if TIMING_PATTERN.match(line)]
+    for position, index in enumerate(timings):
+        end = timings[position + 1] if position + 1 < len(timings) else len(block)
+        if end < len(block) and end - 1 > index and CUE_ID_PATTERN.match(block[end - 1]):
+            end -= 1
+        yield _parse_cue(TIMING_PATTERN.match(block[index]), block[index + 1:end], known_speakers)
+
+
+def _parse_cue(timing, lines, known_speakers):
+    raw_text = " ".join(lines)
+    voice = VOICE_PATTERN.search(raw_text)
+    speaker = voice.group(1).strip() if voice else ""
+    text = SPACE_PATTERN.sub(" ", TAG_PATTERN.sub("", raw_text)).strip()
+    if speaker:
+        known_speakers.add(speaker)
+    else:
+        prefix = SPEAKER_PREFIX_PATTERN.match(text)
+        name = prefix.group(1).strip() if prefix else ""
+        if name and (name in known_speakers or NAME_PATTERN.match(name)):
+            speaker, text = name, text[prefix.end():]
+    return Cue(parse_timestamp(timing.group(1)), parse_timestamp(timing.group(2)), speaker, text)
+
+
+def strip_fillers(text, stats=None):
+    """フィラーを取り除く（除いた数は stats.fillers に加算）"""
+    cleaned, count = FILLER_PATTERN.subn("", text)
+    if stats is not None:
+        stats.fillers += count
+    return SPACE_PATTERN.sub(" ", cleaned).strip(" 、,")
+
+
+def _overlap(last, text):
+    """last の末尾と text の先頭で重なる文字数（英単語の途中で切れる重なりは数えない）"""
+    for size in range(min(len(last), len(text) - 1), MIN_OVERLAP_CHARS - 1, -1):
+        if not last.endswith(text[:size]):
+            continue
+        if ASCII_WORD.match(text[size - 1]) and ASCII_WORD.match(text[size]):
+            continue
+        if size < len(last) and ASCII_WORD.match(last[-size - 1]) and ASCII_WORD.match(last[-size]):
+            continue
+        return size
+    return 0
+
+
+def merge_turns(cues, stats=None):
+    """同じ話者の連続したキューを1つの発言にまとめて返す
+
+    ロールアップ字幕のように前のキューを含む・前のキューに含まれるキューは重複として捨て、
+    前のキューの末尾と重なる先頭部分は取り除く。
+    """
+    speaker = None
+    start = end = 0.0
+    segments = []
+    for cue in cues:
+        if stats is not None:
+            stats.cues += 1
+        text = strip_fillers(cue.text, stats)
+        cue_speaker = cue.speaker or UNKNOWN_SPEAKER
+        if cue_speaker != speaker:
+            if segments:
+                yield Turn(speaker, start, end, " ".join(segments))
+            speaker, start, segments = cue_speaker, cue.start, []
+        end = cue.end
+        if not text:
+            continue
+        last = segments[-1] if segments else ""
+        if last and (text == last or (len(text) >= MIN_DUPLICATE_CHARS and text in last)):
+            if stats is not None:
+                stats.duplicates += 1
+        elif last and text.startswith(last):
+            segments[-1] = text
+            if stats is not None:
+                stats.duplicates += 1
+        else:
+            overlap = _overlap(last, text) if last else 0
+            if overlap:
+                text = text[overlap:].lstrip(" 、,")
+                if stats is not None:
+                    stats.duplicates += 1
+            if text:
+                segments.append(text)
+    if segments:
+        yield Turn(speaker, start, end, " ".join(segments))
+
+
+def ingest_vtt(vtt_path, output_path=None):
+    """VTTファイルを発言録Markdownに変換し、(出力パス, 集計) を返す
+
+    キューは1つずつ読み、発言は一時ファイルに書き出してから見出し・参加者と結合するため、
+    長時間の会議でも全キューをメモリに持たない。
+    """
+    output_path = output_path or transcript_path_for(vtt_path)
+    stats = VTTStats()
+    body_path = f"{output_path}.body.tmp"
+    first_start = last_end = None
+    speakers = {}
+    try:
+        with open(vtt_path, "r", encoding="utf-8") as source, \
+                open(body_path, "w", encoding="utf-8") as body:
+            for turn in merge_turns(iter_cues(source, stats), stats):
+                stats.turns += 1
+                speakers.setdefault(turn.speaker, None)
+                first_start = turn.start if first_start is None else first_start
+                last_end = turn.end
+                line = f"**{turn.speaker}** ({format_timestamp(turn.start)}) {turn.text}"
+                body.write(line + "\n\n")
+                stats.add_output(line)
+                stats.add_output("")
+
+        title = os.path.splitext(os.path.basename(vtt_path))[0]
+        stats.speakers = [name for name in speakers if name != UNKNOWN_SPEAKER]
+        header = [f"# {title}", ""]
+        if stats.speakers:
+            header.append(f"- 参加者: {'、'.join(stats.speakers)}")
+        if first_start is not None and last_end > first_start:
+            header.append(f"- 会議時間: {max(1, round((last_end - first_start) / 60))}分")
+        header += ["", "## 発言録", ""]
+        temp_path = f"{output_path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as output, open(body_path, "r", encoding="utf-8") as body:
+            for line in header:
+                output.write(line + "\n")
+                stats.add_output(line)
+            for line in body:
+                output.write(line)
+        os.replace(temp_path, output_path)
+    finally:
+        if os.path.exists(body_path):
+            os.remove(body_path)
+    return output_path, stats
+
+
+def _reduction(before, after):
+    return f"-{(before - after) / before * 100:.0f}%" if before else "-"
+
+
+def print_ingest_report(vtt_path, output_path, stats):
+    print(f"🎙️  VTT取り込み: {vtt_path} → {output_path}")
+    print(f"   キュー {stats.cues:,} → 発言 {stats.turns:,} (話者 {len(stats.speakers)}人, "
+          f"フィラー除去 {stats.fillers:,}, 重複除去 {stats.duplicates:,})")
+    print(f"📉 圧縮: {stats.input_bytes:,}バイト → {stats.output_bytes:,}バイト "
+          f"({_reduction(stats.input_bytes, stats.output_bytes)}) / "
+          f"約{stats.input_tokens:,}トークン → 約{stats.output_tokens:,}トークン "
+          f"({_reduction(stats.input_tokens, stats.output_tokens)})")
+
+
+def main():
+    args = sys.argv[1:]
+    output_path = args[args.index("-o") + 1] if "-o" in args else None
+    if not args or args[0].startswith("-"):
+        print("📖 使用方法:")
+        print("  python vtt_ingest.py <VTTファイル> [-o 出力.md]")
+        print(f"💡 出力先のデフォルトは <元ファイル名>{TRANSCRIPT_SUFFIX}")
+        return
+    vtt_path = args[0]
+    if not os.path.isfile(vtt_path):
+        print(f"❌ ファイルが見つかりません: {vtt_path}")
+        sys.exit(1)
+    print_ingest_report(vtt_path, *ingest_vtt(vtt_path, output_path))
+
+
+if __name__ == "__main__":
+    main()
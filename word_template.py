@@ -0,0 +1,65 @@
+import os
+import copy
+import threading
+
+PLACEHOLDER_FORMAT = "{{{{{}}}}}"  # {{会議名}} のような差し込み位置
+
+_templates = {}
+_templates_lock = threading.Lock()
+
+
+class WordTemplate:
+    """企業テンプレート(.docx)を1度だけ解析し、文書ごとに複製する
+
+    スタイル・ヘッダー/フッター・表紙などテンプレート本文はすべて複製に含まれる。
+    複製は解析済みのパッケージをコピーするため、zipの展開やXML解析は繰り返さない。
+    """
+
+    def __init__(self, path):
+        from docx import Document
+
+        self.path = path
+        self.mtime = os.path.getmtime(path)
+        self._document = Document(path)
+
+    def new_document(self):
+        """テンプレートの独立したコピーを返す"""
+        return copy.deepcopy(self._document)
+
+
+def load_template(path):
+    """テンプレートをプロセス内で共有（ファイルが更新された場合のみ再解析）"""
+    key = os.path.abspath(path)
+    with _templates_lock:
+        template = _templates.get(key)
+        if template is None or template.mtime != os.path.getmtime(key):
+            template = WordTemplate(key)
+            _templates[key] = template
+        return template
+
+
+def fill_placeholders(doc, values):
+    """本文・ヘッダー・フッター中の {{キー}} を値で置き換える
+
+    置き換えは w:t 要素単位で行うため、Word上で1つのランに収まっている
+    プレースホルダーのみが対象になる。
+    """
+    from docx.oxml.ns import qn
+
+    replacements = {PLACEHOLDER_FORMAT.format(key): value for key, value in values.items()}
+    roots = [doc.element.body]
+    for section in doc.sections:
+        for part in (section.header, section.first_page_header, section.even_page_header,
+                     section.footer, section.first_page_footer, section.even_page_footer):
+            if not part.is_linked_to_previous:
+                roots.append(part._element)
+
+    tag = qn('w:t')
+    for root in roots:
+        for node in root.iter(tag):
+            text = node.text
+            if not text or "{{" not in text:
+                continue
+            for placeholder, value in replacements.items():
+                text = text.replace(placeholder, value)
+            node.text = text